@@ -1,27 +1,70 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.requests import Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from ten_utils.log import Logger
 
 from .routers import api_router
+from .covers import CoverStaticFiles
+from .metrics import MetricsMiddleware, metrics_endpoint, register_cache_metrics
+from .staticfiles import RangeStaticFiles, ImmutableStaticFiles, HlsStaticFiles
+from service.music_track import (
+    music_track_count_cache,
+    music_track_cover_cache,
+    music_track_file_cache,
+    music_track_list_cache,
+)
+from service.music_track.ingest import IngestWorker
+from database import init_db
+from database.config import async_engine
 from common.constants import (
+    DATABASE_CREATE_ALL,
     DIR_STATIC,
     DIR_MUSIC,
     DIR_MUSIC_COVER,
+    DIR_MUSIC_HLS,
     API_CORS_ALLOW_METHODS,
     API_CORS_ALLOW_ORIGINS,
     API_CORS_ALLOW_CREDENTIALS,
     API_ALLOW_HOSTS,
+    METRICS_ENABLED,
 )
 
 logger = Logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create missing tables and start the background ingestion worker with the
+    application; on shutdown, stop it and the cover resize pool, and close the
+    async engine's pooled connections.
+    """
+    if DATABASE_CREATE_ALL:
+        await run_in_threadpool(init_db)
+
+    DIR_MUSIC_HLS.mkdir(exist_ok=True)
+
+    app.state.ingest_worker = IngestWorker()
+    await app.state.ingest_worker.start()
+
+    try:
+        yield
+
+    finally:
+        await app.state.ingest_worker.stop()
+        music_track_covers.shutdown()
+        await async_engine.dispose()
+
+
 # Create FastAPI application instance
 app = FastAPI(
     description="API for self-hosted player gv_music",
     version="0.0.5",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware to handle cross-origin requests
@@ -32,22 +75,43 @@ app.add_middleware(
     allow_methods=API_CORS_ALLOW_METHODS,
 )
 
+if METRICS_ENABLED:
+    # Added last, so it is the outermost middleware and times the others too.
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+
 # Mount static directories to serve media files
 app.mount(
     "/static",
-    StaticFiles(directory=DIR_STATIC),
+    RangeStaticFiles(directory=DIR_STATIC),
     name="static",
 )
 app.mount(
     "/music_tracks",
-    StaticFiles(directory=DIR_MUSIC),
+    ImmutableStaticFiles(directory=DIR_MUSIC),
     name="static_music_tracks",
 )
+music_track_covers = CoverStaticFiles(
+    directory=DIR_MUSIC_COVER,
+    cache=music_track_cover_cache,
+)
+if METRICS_ENABLED:
+    register_cache_metrics("track_count", music_track_count_cache)
+    register_cache_metrics("track_list", music_track_list_cache)
+    register_cache_metrics("track_file", music_track_file_cache)
+    register_cache_metrics("cover_resize", music_track_covers.cache)
+
 app.mount(
     "/music_track_covers",
-    StaticFiles(directory=DIR_MUSIC_COVER),
+    music_track_covers,
     name="static_music_track_covers",
 )
+app.mount(
+    "/music_track_hls",
+    # Created on startup, by `lifespan`.
+    HlsStaticFiles(directory=DIR_MUSIC_HLS, check_dir=False),
+    name="static_music_track_hls",
+)
 
 
 @app.get("/")
@@ -0,0 +1,106 @@
+"""
+Conditional GET handling (RFC 9110, section 13).
+
+Helpers to evaluate `If-None-Match` and `If-Modified-Since` against validators
+the caller already has, so a revalidation can be answered with `304 Not Modified`
+before any file is opened or stat'ed.
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse
+
+
+# Files named by UUID are written once and never change, so clients may keep them forever.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def http_date(value: datetime) -> str:
+    """
+    Format a datetime as an HTTP date. Naive datetimes are taken to be UTC.
+
+    Args:
+        value (datetime): The datetime to format.
+
+    Returns:
+        str: The date in IMF-fixdate format, e.g. `Sun, 06 Nov 1994 08:49:37 GMT`.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an `If-None-Match` header against an entity tag using weak comparison.
+
+    Args:
+        if_none_match (str): Value of the `If-None-Match` header.
+        etag (str): Current entity tag, quoted, optionally prefixed by `W/`.
+
+    Returns:
+        bool: True if any listed tag (or `*`) matches.
+    """
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_tag = etag.removeprefix("W/")
+
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag
+        for tag in if_none_match.split(",")
+    )
+
+
+def is_not_modified(
+        request_headers: Mapping[str, str],
+        etag: str | None,
+        last_modified: str | None,
+) -> bool:
+    """
+    Decide whether a GET/HEAD can be answered with `304 Not Modified`.
+
+    `If-None-Match` takes precedence; `If-Modified-Since` is only evaluated when
+    the request carries no `If-None-Match`.
+
+    Args:
+        request_headers (Mapping[str, str]): Request headers (case-insensitive mapping).
+        etag (str | None): Current `ETag` of the representation, if any.
+        last_modified (str | None): Current `Last-Modified` value, if any.
+
+    Returns:
+        bool: True if the client's cached copy is still valid.
+    """
+    if_none_match = request_headers.get("if-none-match")
+
+    if if_none_match is not None:
+        return etag is not None and etag_matches(if_none_match, etag)
+
+    if_modified_since = request_headers.get("if-modified-since")
+
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified_response(headers: Mapping[str, str]) -> Response:
+    """
+    Build a `304 Not Modified` response carrying the cache-related headers.
+
+    Args:
+        headers (Mapping[str, str]): Headers the full response would have had.
+
+    Returns:
+        Response: The 304 response.
+    """
+    return NotModifiedResponse(Headers(headers=dict(headers)))
@@ -0,0 +1,164 @@
+"""
+Cover images, at the pre-rendered sizes or resized on request.
+
+`/music_track_covers/<file>` serves the stored covers like any immutable static
+file. `/music_track_covers/<track id>?w=<width>&fmt=<webp|jpeg>` renders the
+cover at that width from the largest stored one. Renditions are kept in a
+size-bounded disk LRU; concurrent requests for the same missing rendition share
+a single resize, which runs in a process pool, off the event loop.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import PurePath
+import asyncio
+import multiprocessing
+import os
+import uuid
+
+from fastapi import HTTPException
+import anyio
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import Response
+from starlette.types import Scope
+
+from common.cache import DiskLRUCache, SingleFlight
+from common.constants import DIR_DATA, TRACK_COVER_MAX_WIDTH, TRACK_COVER_RESIZE_WORKERS
+from common.metrics import COVER_RESIZE_DURATION
+from database.config import AsyncSessionLocal
+from service.music_track import get_music_track_async
+from service.music_track.cover import COVER_FORMATS, resize_music_track_cover
+from .conditional import IMMUTABLE_CACHE_CONTROL, etag_matches, not_modified_response
+from .negotiation import parse_accept_header
+from .staticfiles import ImmutableStaticFiles
+
+
+class CoverStaticFiles(ImmutableStaticFiles):
+    """
+    `ImmutableStaticFiles` for the cover directory that also resizes covers on request.
+
+    Attributes:
+        cache (DiskLRUCache): Where resized covers are kept.
+        max_workers (int): Size of the resize process pool, created on first use.
+    """
+
+    def __init__(self, *, cache: DiskLRUCache, max_workers: int = TRACK_COVER_RESIZE_WORKERS, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.max_workers = max_workers
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._resizes = SingleFlight()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if PurePath(path).suffix or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        return await self.resized_response(path, scope)
+
+    async def resized_response(self, music_track_id: str, scope: Scope) -> Response:
+        """
+        Serve the cover of a track at the width asked for in the query string.
+
+        Args:
+            music_track_id (str): The last path segment, expected to be a track UUID.
+            scope (Scope): The ASGI scope of the request.
+
+        Returns:
+            Response: The resized cover, `304 Not Modified`, or `400` for invalid parameters.
+        """
+        try:
+            music_track_id = str(uuid.UUID(music_track_id))
+
+        except ValueError:
+            raise HTTPException(status_code=404)
+
+        request_headers = Headers(scope=scope)
+        query_params = QueryParams(scope["query_string"])
+
+        try:
+            width = int(query_params.get("w", ""))
+
+        except ValueError:
+            width = 0
+
+        if not 0 < width <= TRACK_COVER_MAX_WIDTH:
+            return Response(status_code=400, content="Invalid width")
+
+        headers = {"cache-control": IMMUTABLE_CACHE_CONTROL}
+        cover_format = query_params.get("fmt")
+
+        if cover_format is None:
+            accept = parse_accept_header(request_headers.get("accept", ""))
+            cover_format = "webp" if accept.get("image/webp", 0.0) > 0 else "jpeg"
+            headers["vary"] = "accept"
+
+        elif cover_format not in COVER_FORMATS:
+            return Response(status_code=400, content="Unknown format")
+
+        cover_name = f"{music_track_id}-{width}w-{cover_format}{COVER_FORMATS[cover_format]['extension']}"
+        headers["etag"] = self.name_etag(cover_name)
+
+        # The cache touches and evicts files, so it is used off the event loop.
+        path_to_cover = await anyio.to_thread.run_sync(self.cache.get, cover_name)
+
+        # A cached rendition means the track still exists: deleting it drops its renditions.
+        if_none_match = request_headers.get("if-none-match")
+        if path_to_cover is not None and if_none_match is not None and etag_matches(if_none_match, headers["etag"]):
+            return not_modified_response(headers)
+
+        if path_to_cover is None:
+            async with AsyncSessionLocal() as db:
+                music_track = await get_music_track_async(music_track_id, db)
+
+            if music_track is None or not music_track.cover_path:
+                raise HTTPException(status_code=404)
+
+            # The largest stored size (or, for older tracks, the full-size cover).
+            path_to_source = DIR_DATA / music_track.cover_path
+
+            resized = await self._resizes.run(
+                cover_name,
+                lambda: self.resize(path_to_source, cover_name, width, cover_format),
+            )
+            if not resized:
+                raise HTTPException(status_code=404)
+
+            path_to_cover = self.cache.path(cover_name)
+
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, path_to_cover)
+
+        except FileNotFoundError:
+            # Evicted by another worker sharing the directory in the meantime.
+            raise HTTPException(status_code=404)
+
+        response = self.file_response(path_to_cover, stat_result, scope)
+        response.headers.update({key: value for key, value in headers.items() if key != "etag"})
+        return response
+
+    async def resize(self, path_to_source: PurePath, cover_name: str, width: int, cover_format: str) -> bool:
+        if self._executor is None:
+            # "spawn" keeps the children free of the API process's threads and open connections.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        await anyio.to_thread.run_sync(lambda: self.cache.directory.mkdir(parents=True, exist_ok=True))
+
+        loop = asyncio.get_running_loop()
+        with COVER_RESIZE_DURATION.time():
+            resized = await loop.run_in_executor(
+                self._executor,
+                resize_music_track_cover, path_to_source, self.cache.path(cover_name), width, cover_format,
+            )
+
+        if resized:
+            await anyio.to_thread.run_sync(self.cache.add, cover_name)
+
+        return resized
@@ -0,0 +1,142 @@
+"""
+Request instrumentation and the `/metrics` endpoint.
+
+`MetricsMiddleware` times every HTTP request and counts the bytes of its
+response, labelled by route template (`/api/v1/tracks/{track_id}/`) or mount
+(`/music_tracks/{path}`), so label values stay few whatever the URLs requested.
+It is a plain ASGI middleware: no request objects are built, and streamed
+bodies pass through untouched.
+"""
+
+from time import perf_counter
+from typing import Any
+
+from anyio import to_thread
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common.metrics import (
+    CACHE_HITS,
+    CACHE_MISSES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_RESPONSE_BYTES,
+    HTTP_RESPONSES_IN_PROGRESS,
+    INGEST_WORKERS_BUSY,
+    INGEST_WORKERS_LIMIT,
+    PROMETHEUS_CONTENT_TYPE,
+    REGISTRY,
+    THREADPOOL_THREADS_BUSY,
+    THREADPOOL_THREADS_LIMIT,
+)
+from .responses import ZERO_COPY_SEND_EXTENSION
+
+
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+def get_route_name(scope: Scope, root_path: str) -> str:
+    """
+    Args:
+        scope (Scope): The request scope, after routing.
+        root_path (str): `root_path` of the scope before routing.
+
+    Returns:
+        str: The matched route's path template, the matched mount, or `unmatched`.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+
+    mount_path = scope.get("root_path", "")[len(root_path):]
+    if mount_path:
+        return f"{mount_path}/{{path}}"
+
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Records the duration, status and response size of every HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        root_path = scope.get("root_path", "")
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "OTHER"
+
+        status_code = 500
+        response_bytes = 0
+        responses_in_progress = None
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, response_bytes, responses_in_progress
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                responses_in_progress = HTTP_RESPONSES_IN_PROGRESS.labels(get_route_name(scope, root_path))
+                responses_in_progress.inc()
+
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+
+            elif message["type"] == ZERO_COPY_SEND_EXTENSION:
+                response_bytes += message["count"]
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+
+        finally:
+            route_name = get_route_name(scope, root_path)
+
+            if responses_in_progress is not None:
+                responses_in_progress.dec()
+
+            HTTP_REQUEST_DURATION.labels(method, route_name).observe(perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route_name, str(status_code)).inc()
+
+            if response_bytes:
+                HTTP_RESPONSE_BYTES.labels(route_name).inc(response_bytes)
+
+
+def register_cache_metrics(name: str, cache: Any) -> None:
+    """
+    Exposes the `hits` and `misses` counts of a cache as `cache_hits_total{cache=name}`
+    and `cache_misses_total{cache=name}`, copied at every scrape.
+    """
+    def collect() -> None:
+        CACHE_HITS.labels(name).set(cache.hits)
+        CACHE_MISSES.labels(name).set(cache.misses)
+
+    REGISTRY.add_collector(collect)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    Serve the metrics of this process in the Prometheus text format.
+
+    Args:
+        request (Request): FastAPI request object (used to reach the app state).
+
+    Returns:
+        Response: The metrics, as `text/plain; version=0.0.4`.
+    """
+    # The thread limiter belongs to the event loop, so it is read here rather than by a collector.
+    thread_limiter = to_thread.current_default_thread_limiter()
+    THREADPOOL_THREADS_BUSY.set(thread_limiter.borrowed_tokens)
+    THREADPOOL_THREADS_LIMIT.set(thread_limiter.total_tokens)
+
+    ingest_worker = getattr(request.app.state, "ingest_worker", None)
+    if ingest_worker is not None:
+        INGEST_WORKERS_BUSY.set(ingest_worker.busy_workers)
+        INGEST_WORKERS_LIMIT.set(ingest_worker.max_workers)
+
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,123 @@
+"""
+Content negotiation of track variants (RFC 9110, section 12.5.1).
+
+The `quality` query parameter picks the bitrate; the `Accept` header picks the
+codec among the variants of that quality.
+"""
+
+from typing import Iterable
+
+from service.music_track.transcode import VARIANT_CODECS
+
+
+def parse_accept_header(accept: str) -> dict[str, float]:
+    """
+    Parse an `Accept` header into media ranges and their weights.
+
+    Args:
+        accept (str): Value of the `Accept` header.
+
+    Returns:
+        dict[str, float]: Lower-cased media range mapped to its highest `q` value.
+
+    Example:
+        >>> parse_accept_header("audio/ogg;q=0.5, audio/*")
+        {'audio/ogg': 0.5, 'audio/*': 1.0}
+    """
+    media_ranges: dict[str, float] = {}
+
+    for media_range in accept.split(","):
+        media_type, *parameters = media_range.split(";")
+        media_type = media_type.strip().lower()
+        if not media_type:
+            continue
+
+        weight = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = min(max(float(value), 0.0), 1.0)
+
+                except ValueError:
+                    weight = 0.0
+
+        media_ranges[media_type] = max(weight, media_ranges.get(media_type, 0.0))
+
+    return media_ranges
+
+
+def preferred_variant_codecs(accept: str | None, codecs: Iterable[str]) -> list[str]:
+    """
+    Order the variant codecs by the client's preference.
+
+    Codecs the client names explicitly are ranked by their weight; wildcards
+    (`*/*`, `audio/*`) admit the others in server order. A weight of 0 excludes
+    a codec.
+
+    Args:
+        accept (str | None): Value of the `Accept` header, if any.
+        codecs (Iterable[str]): Available codecs in server preference order.
+
+    Returns:
+        list[str]: The acceptable codecs, most preferred first.
+    """
+    codecs = [codec for codec in codecs if codec in VARIANT_CODECS]
+
+    if not accept:
+        return codecs
+
+    media_ranges = parse_accept_header(accept)
+    wildcard_weight = max(media_ranges.get("*/*", 0.0), media_ranges.get("audio/*", 0.0))
+    weights = {}
+
+    for codec in codecs:
+        explicit_weights = [
+            media_ranges[media_type]
+            for media_type in VARIANT_CODECS[codec]["accept_types"]
+            if media_type in media_ranges
+        ]
+        weights[codec] = max(explicit_weights) if explicit_weights else wildcard_weight
+
+    # sorted() is stable, so equal weights keep the server order.
+    return sorted((codec for codec in codecs if weights[codec] > 0), key=lambda codec: -weights[codec])
+
+
+def preferred_media_type(accept: str | None, media_types: list[str]) -> str | None:
+    """
+    Pick the response format the client prefers among `media_types`.
+
+    Media types the client names explicitly are ranked by their weight;
+    wildcards (`*/*`, `type/*`) admit the others. Ties go to the server order.
+
+    Args:
+        accept (str | None): Value of the `Accept` header, if any.
+        media_types (list[str]): Available media types in server preference order.
+
+    Returns:
+        str | None: The preferred media type, the first one if there is no `Accept`
+            header, or None if the client accepts none of them.
+
+    Example:
+        >>> preferred_media_type("application/msgpack, */*;q=0.5", ["application/json", "application/msgpack"])
+        'application/msgpack'
+    """
+    if not accept:
+        return media_types[0]
+
+    media_ranges = parse_accept_header(accept)
+    weights = {}
+
+    for media_type in media_types:
+        if media_type in media_ranges:
+            weights[media_type] = media_ranges[media_type]
+
+        else:
+            weights[media_type] = max(
+                media_ranges.get("*/*", 0.0),
+                media_ranges.get(media_type.split("/", 1)[0] + "/*", 0.0),
+            )
+
+    best_media_type = max(media_types, key=lambda media_type: weights[media_type])
+
+    return best_media_type if weights[best_media_type] > 0 else None
@@ -0,0 +1,241 @@
+"""
+HTTP range requests (RFC 9110, section 14).
+
+This module turns the `Range` and `If-Range` request headers into the right
+file response:
+    - `200 OK` with the whole file when no (usable) range is requested;
+    - `206 Partial Content` with a single range;
+    - `206 Partial Content` with `multipart/byteranges` for several ranges;
+    - `416 Range Not Satisfiable` when no requested range overlaps the file.
+
+It is shared by the track stream endpoint and the static file mounts.
+"""
+
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+import re
+from typing import Callable, Mapping
+
+from starlette.responses import Response
+
+from .responses import FileRangeResponse, MultipartFileRangeResponse
+
+
+# More ranges than this after coalescing are served as the full representation,
+# as RFC 9110 allows, so a client can't make us seek all over a file.
+MAX_RANGES = 16
+
+RANGE_SPEC_PATTERN = re.compile(r"^([0-9]*)\s*-\s*([0-9]*)$")
+
+
+class MalformedRangeHeader(ValueError):
+    """Raised when a `Range` header can't be parsed; such a header is ignored."""
+
+
+class RangeNotSatisfiable(ValueError):
+    """
+    Raised when none of the requested ranges overlap the file.
+
+    Attributes:
+        file_size (int): Size of the file, reported back in `Content-Range: bytes */<size>`.
+    """
+
+    def __init__(self, file_size: int):
+        super().__init__(f"Range not satisfiable for a file of {file_size} bytes")
+        self.file_size = file_size
+
+
+def parse_range_header(range_header: str, file_size: int) -> list[tuple[int, int]]:
+    """
+    Parse a `Range` header into sorted, coalesced byte ranges.
+
+    Supports `a-b`, open-ended `a-` and suffix `-n` ranges. Ranges are clamped
+    to the end of the file; ranges starting past the end are dropped, and
+    overlapping or adjacent ranges are merged.
+
+    Args:
+        range_header (str): Value of the `Range` header, e.g. `bytes=0-499,-500`.
+        file_size (int): Size of the file in bytes.
+
+    Returns:
+        list[tuple[int, int]]: `(start, end)` pairs with `end` exclusive.
+
+    Raises:
+        MalformedRangeHeader: If the header is not a valid `bytes` range set.
+        RangeNotSatisfiable: If no range overlaps the file.
+
+    Example:
+        >>> parse_range_header("bytes=-128", 1000)
+        [(872, 1000)]
+    """
+    unit, _, range_set = range_header.partition("=")
+
+    if unit.strip().lower() != "bytes" or not range_set.strip():
+        raise MalformedRangeHeader(f"Unsupported range header: {range_header!r}")
+
+    ranges: list[tuple[int, int]] = []
+
+    for range_spec in range_set.split(","):
+        range_spec = range_spec.strip()
+        if not range_spec:
+            continue
+
+        match = RANGE_SPEC_PATTERN.match(range_spec)
+        if match is None or match.groups() == ("", ""):
+            raise MalformedRangeHeader(f"Invalid range: {range_spec!r}")
+
+        first, last = match.groups()
+
+        if not first:
+            # Suffix range: the last N bytes.
+            suffix_length = int(last)
+            if suffix_length == 0 or file_size == 0:
+                # Nothing to send: an empty file has no last bytes.
+                continue
+
+            ranges.append((max(file_size - suffix_length, 0), file_size))
+            continue
+
+        start = int(first)
+
+        if last and int(last) < start:
+            raise MalformedRangeHeader(f"Invalid range: {range_spec!r}")
+
+        if start >= file_size:
+            continue
+
+        end = min(int(last) + 1, file_size) if last else file_size
+        ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable(file_size)
+
+    ranges.sort()
+    coalesced = [ranges[0]]
+
+    for start, end in ranges[1:]:
+        last_start, last_end = coalesced[-1]
+
+        if start <= last_end:
+            coalesced[-1] = (last_start, max(last_end, end))
+
+        else:
+            coalesced.append((start, end))
+
+    return coalesced
+
+
+def if_range_matches(if_range: str, etag: str | None, last_modified: str | None) -> bool:
+    """
+    Evaluate an `If-Range` precondition against the current validators.
+
+    An entity tag must match strongly (weak tags never match). A date must be
+    exactly the `Last-Modified` value of the representation.
+
+    Args:
+        if_range (str): Value of the `If-Range` header.
+        etag (str | None): Current `ETag` of the representation, if any.
+        last_modified (str | None): Current `Last-Modified` value, if any.
+
+    Returns:
+        bool: True if the range request may be honoured.
+    """
+    if_range = if_range.strip()
+
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return etag is not None and not etag.startswith("W/") and if_range == etag
+
+    if last_modified is None:
+        return False
+
+    try:
+        return parsedate_to_datetime(if_range) == parsedate_to_datetime(last_modified)
+
+    except (TypeError, ValueError):
+        return False
+
+
+def range_file_response(
+        request_headers: Mapping[str, str],
+        method: str,
+        path: Path | str,
+        file_size: int,
+        media_type: str | None = None,
+        headers: Mapping[str, str] | None = None,
+        on_missing: Callable[[], None] | None = None,
+) -> Response:
+    """
+    Build the response for a GET/HEAD of a file, honouring `Range` and `If-Range`.
+
+    Args:
+        request_headers (Mapping[str, str]): Request headers (case-insensitive mapping).
+        method (str): Request method. Ranges only apply to GET.
+        path (Path | str): Path to the file on disk.
+        file_size (int): Size of the file in bytes.
+        media_type (str | None, optional): Content type of the file.
+        headers (Mapping[str, str] | None, optional): Extra response headers, e.g.
+            `etag` and `last-modified`, which are also used to evaluate `If-Range`.
+        on_missing (Callable[[], None] | None, optional): Called if the file turns out to be
+            gone when the response is sent; the response is then a 404.
+
+    Returns:
+        Response: A 200, 206 or 416 response.
+    """
+    headers = dict(headers or {})
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+
+    if (
+            range_header is None
+            or method.upper() != "GET"
+            or (if_range is not None and not if_range_matches(
+                if_range,
+                etag=headers.get("etag"),
+                last_modified=headers.get("last-modified"),
+            ))
+    ):
+        return FileRangeResponse(
+            path, file_size=file_size, headers=headers, media_type=media_type, on_missing=on_missing,
+        )
+
+    try:
+        ranges = parse_range_header(range_header, file_size)
+
+    except MalformedRangeHeader:
+        return FileRangeResponse(
+            path, file_size=file_size, headers=headers, media_type=media_type, on_missing=on_missing,
+        )
+
+    except RangeNotSatisfiable as exc:
+        # Caching headers are left out on purpose: a 416 must not be stored as the resource.
+        return Response(status_code=416, headers={
+            "content-range": f"bytes */{exc.file_size}",
+            "accept-ranges": "bytes",
+        })
+
+    if len(ranges) > MAX_RANGES:
+        return FileRangeResponse(
+            path, file_size=file_size, headers=headers, media_type=media_type, on_missing=on_missing,
+        )
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        return FileRangeResponse(
+            path,
+            file_size=file_size,
+            start=start,
+            end=end,
+            status_code=206,
+            headers=headers,
+            media_type=media_type,
+            on_missing=on_missing,
+        )
+
+    return MultipartFileRangeResponse(
+        path,
+        file_size=file_size,
+        ranges=ranges,
+        headers=headers,
+        media_type=media_type,
+        on_missing=on_missing,
+    )
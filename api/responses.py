@@ -0,0 +1,307 @@
+import os
+from pathlib import Path
+from secrets import token_hex
+from typing import Callable, Mapping
+
+import anyio
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+
+ZERO_COPY_SEND_EXTENSION = "http.response.zerocopysend"
+CHUNK_SIZE = 256 * 1024
+
+
+async def open_file(path: Path | str) -> int | None:
+    """
+    Opens a file for reading in a worker thread.
+
+    Responses open their file before sending the status line, so a file deleted
+    since its details were resolved gets a 404 instead of a broken response.
+
+    Returns:
+        int | None: The file descriptor, or None if the file does not exist.
+    """
+    try:
+        return await anyio.to_thread.run_sync(os.open, path, os.O_RDONLY)
+
+    except FileNotFoundError:
+        return None
+
+
+async def send_file_not_found(
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        on_missing: Callable[[], None] | None = None,
+) -> None:
+    """Send a 404 for a file that is gone, after calling `on_missing`."""
+    if on_missing is not None:
+        on_missing()
+
+    await Response(status_code=404, content="Not found")(scope, receive, send)
+
+
+async def send_file_range(
+        send: Send,
+        fd: int,
+        start: int,
+        end: int,
+        zero_copy: bool,
+        more_body: bool = False,
+        chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """
+    Send the bytes `[start, end)` of a file as ASGI body messages.
+
+    With `zero_copy` the file descriptor is handed to the server, which pushes
+    the bytes to the socket with `os.sendfile`. Otherwise the range is read in
+    `chunk_size` blocks through a worker thread.
+
+    Args:
+        send (Send): The ASGI send callable.
+        fd (int): Descriptor of the file, from `open_file`; left open.
+        start (int): The first byte to send.
+        end (int): The byte position to stop at (non-inclusive).
+        zero_copy (bool): Whether the server supports `http.response.zerocopysend`.
+        more_body (bool, optional): Whether more body messages follow this range.
+        chunk_size (int, optional): Read size for the buffered path.
+    """
+    if zero_copy:
+        await send({
+            "type": ZERO_COPY_SEND_EXTENSION,
+            "file": fd,
+            "offset": start,
+            "count": end - start,
+            "more_body": more_body,
+        })
+
+        return
+
+    position = start
+
+    async with await anyio.open_file(fd, mode="rb", closefd=False) as file:
+        await file.seek(position)
+
+        while position < end:
+            chunk = await file.read(min(chunk_size, end - position))
+            if not chunk:
+                break
+
+            position += len(chunk)
+            await send({
+                "type": "http.response.body",
+                "body": chunk,
+                "more_body": more_body or position < end,
+            })
+
+    if position < end and not more_body:
+        # The file was truncated underneath us; close the body cleanly.
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class FileRangeResponse(Response):
+    """
+    Response that sends a byte range of a file without a Python-level generator.
+
+    When the ASGI server advertises the `http.response.zerocopysend` extension,
+    the bytes go out through `os.sendfile` in the server. Otherwise the range is
+    read in large chunks through a worker thread, so a multi-megabyte track costs
+    a handful of reads instead of thousands of generator iterations.
+
+    Attributes:
+        path (Path | str): Path to the file on disk.
+        start (int): The first byte of the range to send.
+        end (int): The byte position to stop at (non-inclusive).
+        file_size (int): Total size of the file in bytes.
+        on_missing (Callable[[], None] | None): Called when the file turns out to be gone.
+    """
+
+    chunk_size = CHUNK_SIZE
+
+    def __init__(
+            self,
+            path: Path | str,
+            file_size: int,
+            start: int = 0,
+            end: int | None = None,
+            status_code: int = 200,
+            headers: Mapping[str, str] | None = None,
+            media_type: str | None = None,
+            background: BackgroundTask | None = None,
+            on_missing: Callable[[], None] | None = None,
+    ):
+        """
+        Args:
+            path (Path | str): Path to the file on disk.
+            file_size (int): Total size of the file in bytes.
+            start (int, optional): The first byte to send. Defaults to 0.
+            end (int | None, optional): The byte position to stop at (non-inclusive).
+                Defaults to the end of the file.
+            status_code (int, optional): HTTP status code. Use 206 for partial content.
+            headers (Mapping[str, str] | None, optional): Extra response headers.
+            media_type (str | None, optional): Value of the Content-Type header.
+            background (BackgroundTask | None, optional): Task to run after the response is sent.
+            on_missing (Callable[[], None] | None, optional): Called when the file no longer
+                exists, e.g. to evict cached details of it; a 404 is sent instead.
+        """
+        self.path = path
+        self.file_size = file_size
+        self.on_missing = on_missing
+        self.start = start
+        self.end = file_size if end is None else end
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = background
+        self.init_headers(headers)
+
+        self.headers["content-length"] = str(self.end - self.start)
+        self.headers.setdefault("accept-ranges", "bytes")
+
+        if status_code == 206:
+            self.headers["content-range"] = f"bytes {self.start}-{self.end - 1}/{self.file_size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        fd = await open_file(self.path)
+        if fd is None:
+            await send_file_not_found(scope, receive, send, self.on_missing)
+            return
+
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+
+            if scope["method"].upper() == "HEAD" or self.start >= self.end:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+            else:
+                await send_file_range(
+                    send,
+                    fd,
+                    self.start,
+                    self.end,
+                    zero_copy=ZERO_COPY_SEND_EXTENSION in scope.get("extensions", {}),
+                    chunk_size=self.chunk_size,
+                )
+
+        finally:
+            os.close(fd)
+
+        if self.background is not None:
+            await self.background()
+
+
+class MultipartFileRangeResponse(Response):
+    """
+    `206 Partial Content` response carrying several ranges of one file as `multipart/byteranges`.
+
+    Every part is sent through `send_file_range`, so the zero-copy path is used
+    for the file data when the server supports it.
+
+    Attributes:
+        path (Path | str): Path to the file on disk.
+        file_size (int): Total size of the file in bytes.
+        ranges (list[tuple[int, int]]): Sorted, non-overlapping `(start, end)` pairs, end exclusive.
+        boundary (str): The multipart boundary.
+        on_missing (Callable[[], None] | None): Called when the file turns out to be gone.
+    """
+
+    chunk_size = CHUNK_SIZE
+
+    def __init__(
+            self,
+            path: Path | str,
+            file_size: int,
+            ranges: list[tuple[int, int]],
+            headers: Mapping[str, str] | None = None,
+            media_type: str | None = None,
+            background: BackgroundTask | None = None,
+            on_missing: Callable[[], None] | None = None,
+    ):
+        """
+        Args:
+            path (Path | str): Path to the file on disk.
+            file_size (int): Total size of the file in bytes.
+            ranges (list[tuple[int, int]]): `(start, end)` pairs to send, end exclusive.
+            headers (Mapping[str, str] | None, optional): Extra response headers.
+            media_type (str | None, optional): Content type of the file, repeated in every part.
+            background (BackgroundTask | None, optional): Task to run after the response is sent.
+            on_missing (Callable[[], None] | None, optional): Called when the file no longer
+                exists, e.g. to evict cached details of it; a 404 is sent instead.
+        """
+        self.path = path
+        self.file_size = file_size
+        self.on_missing = on_missing
+        self.ranges = ranges
+        self.boundary = token_hex(13)
+        self.part_media_type = media_type or "application/octet-stream"
+        self.status_code = 206
+        self.media_type = f"multipart/byteranges; boundary={self.boundary}"
+        self.background = background
+        self.init_headers(headers)
+
+        content_length = len(self.closing_delimiter())
+        for start, end in ranges:
+            content_length += len(self.part_header(start, end)) + (end - start) + 2
+
+        self.headers["content-length"] = str(content_length)
+        self.headers.setdefault("accept-ranges", "bytes")
+
+    def part_header(self, start: int, end: int) -> bytes:
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.part_media_type}\r\n"
+            f"Content-Range: bytes {start}-{end - 1}/{self.file_size}\r\n"
+            "\r\n"
+        ).encode("latin-1")
+
+    def closing_delimiter(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        fd = await open_file(self.path)
+        if fd is None:
+            await send_file_not_found(scope, receive, send, self.on_missing)
+            return
+
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+
+            if scope["method"].upper() == "HEAD":
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+            else:
+                zero_copy = ZERO_COPY_SEND_EXTENSION in scope.get("extensions", {})
+
+                for start, end in self.ranges:
+                    await send({
+                        "type": "http.response.body",
+                        "body": self.part_header(start, end),
+                        "more_body": True,
+                    })
+                    await send_file_range(
+                        send,
+                        fd,
+                        start,
+                        end,
+                        zero_copy=zero_copy,
+                        more_body=True,
+                        chunk_size=self.chunk_size,
+                    )
+                    await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+
+                await send({"type": "http.response.body", "body": self.closing_delimiter(), "more_body": False})
+
+        finally:
+            os.close(fd)
+
+        if self.background is not None:
+            await self.background()
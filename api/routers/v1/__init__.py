@@ -2,8 +2,10 @@ from fastapi import APIRouter
 
 from . import (
     music_track,
+    ingest_job,
 )
 
 router = APIRouter(prefix="/v1", tags=["v1"])
 
 router.include_router(music_track.router)
+router.include_router(ingest_job.router)
@@ -0,0 +1,48 @@
+"""
+Ingestion jobs API router.
+
+This module provides endpoints to:
+- Retrieve the status and progress of a background ingestion job.
+
+Routes:
+    - GET /jobs/{job_id}
+"""
+
+from fastapi import (
+    APIRouter,
+    Depends,
+)
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from service.music_track.ingest import get_ingest_job
+from database import get_db
+from schemas.ingest_job import IngestJobSchema
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=IngestJobSchema)
+def ingest_job_get_status(
+    job_id: str,
+    db: Session = Depends(get_db),
+) -> IngestJobSchema | Response:
+    """
+    Retrieve the status of an ingestion job created by a track upload.
+
+    Args:
+        job_id (str): ID of the job.
+        db (Session): SQLAlchemy database session dependency.
+
+    Returns:
+        IngestJobSchema or Response: The job's status and progress, or 404 if not found.
+    """
+    job = get_ingest_job(
+        job_id=job_id,
+        db=db,
+    )
+
+    if job is None:
+        return Response(status_code=404, content="Not found ingest job")
+
+    return IngestJobSchema.model_validate(job)
@@ -2,173 +2,445 @@
 Tracks API router for handling music track operations.
 
 This module provides endpoints to:
-- Retrieve a paginated list of music tracks.
-- Stream an individual music track.
-- Upload a new music file to the server.
+- Retrieve a paginated list of music tracks (offset or cursor pagination).
+- Search music tracks by title and artist.
+- Stream an individual music track, or a lower-bitrate variant of it.
+- Retrieve the waveform preview and loudness of a music track.
+- Upload a new music file to the server (ingested in the background).
+- Delete a music track.
 
 Routes:
     - GET /tracks/
+    - GET /tracks/search
     - GET /tracks/{track_id}/
+    - GET /tracks/{track_id}/waveform
     - POST /tracks/
+    - DELETE /tracks/{track_id}/
 """
 
-import os
-from typing import Optional
+from functools import partial
 
 from fastapi import (
     APIRouter,
-    UploadFile,
-    File,
     Depends,
     Query,
     Request,
-    Form,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import (
     JSONResponse,
-    StreamingResponse,
     Response
 )
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from service.music_track  import (
-    get_music_track_list,
-    save_music_track,
-    get_music_track,
+    delete_music_track,
+    get_music_track_list_async,
+    get_music_track_page_async,
+    get_music_track_file,
+    get_music_track_waveform_async,
+    get_replay_gain,
+    invalidate_music_track_file,
+    music_track_list_cache,
+    music_track_list_cache_key_async,
+    music_track_to_json,
 )
-from ..utils import iter_file
-from database import get_db
-from schemas.music_track import MusicTrackListResponse
-from common.constants import DIR_DATA
+from service.music_track.ingest import enqueue_ingest_job
+from service.music_track.pagination import InvalidCursor
+from service.music_track.search import search_music_tracks
+from service.music_track.storage import FileTooLarge, StreamedFile
+from api.conditional import (
+    IMMUTABLE_CACHE_CONTROL,
+    http_date,
+    is_not_modified,
+    not_modified_response,
+)
+from api.negotiation import preferred_variant_codecs
+from api.serialization import encode_track_list, negotiate_track_list_media_type
+from api.ranges import range_file_response
+from api.uploads import MalformedMultipart, MultipartUploadParser
+from database import get_db, get_async_db
+from schemas.music_track import MusicTrackListResponse, MusicTrackSearchResponse, MusicTrackWaveformResponse
+from schemas.ingest_job import IngestJobCreatedResponse
+from common.constants import (
+    DIR_MUSIC,
+    UPLOAD_MAX_SIZE,
+    UPLOAD_COVER_MAX_SIZE,
+    URL_INGEST_JOB,
+    TRACK_VARIANT_CODECS,
+    TRACK_VARIANT_QUALITIES,
+)
+
+# Both files plus generous room for the form fields and multipart framing.
+UPLOAD_REQUEST_MAX_SIZE = UPLOAD_MAX_SIZE + UPLOAD_COVER_MAX_SIZE + 1024 * 1024
+# The cover plus the text fields, held in memory while the body is parsed.
+UPLOAD_BUFFERED_MAX_SIZE = UPLOAD_COVER_MAX_SIZE + 1024 * 1024
 
 router = APIRouter(prefix="/tracks", tags=["tracks"])
 
 
 @router.get("", response_model=MusicTrackListResponse)
-def get_music_tracks_list(
+async def get_music_tracks_list(
     request: Request,
     skip: int = Query(0, alias="offset"),
     limit: int = Query(100, alias="limit"),
-    db: Session = Depends(get_db),
-) -> JSONResponse:
+    cursor: str | None = Query(None, alias="cursor"),
+    with_total: bool = Query(True, alias="with_total"),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
     """
     Retrieve a paginated list of music tracks.
 
+    Passing `cursor` (empty for the first page, then the previous `next_cursor`)
+    switches to keyset pagination, whose latency does not grow with the page depth.
+    The total is a cached count; `with_total=false` skips it, so the page costs a
+    single indexed query. Encoded pages are cached until the library changes.
+
+    The page is JSON, or MessagePack for clients preferring `application/msgpack`
+    in their `Accept` header.
+
     Args:
         request (Request): FastAPI request object to extract base URL.
         skip (int): Number of items to skip for pagination (alias: offset).
         limit (int): Maximum number of items to return (alias: limit).
-        db (Session): SQLAlchemy database session dependency.
+        cursor (str | None): Opaque cursor for keyset pagination (alias: cursor).
+        with_total (bool): Whether to include the total number of tracks (alias: with_total).
+        db (AsyncSession): SQLAlchemy async database session dependency.
 
     Returns:
-        JSONResponse: List of music tracks along with pagination metadata.
+        Response: List of music tracks along with pagination metadata,
+        or 400 if the cursor is invalid.
     """
-    track_list, total_tracks = get_music_track_list(
-        db=db,
-        base_url=str(request.base_url),
-        offset=skip,
-        limit=limit
+    base_url = str(request.base_url)
+    media_type = negotiate_track_list_media_type(request)
+    headers = {"vary": "accept"}
+    cache_key = await music_track_list_cache_key_async(
+        base_url,
+        offset=skip if cursor is None else None,
+        cursor=cursor,
+        limit=limit,
+        with_total=with_total,
+        media_type=media_type,
     )
 
-    if total_tracks == 0 or not track_list:
-        return JSONResponse({
+    cached_content = await music_track_list_cache.get_async(cache_key)
+    if cached_content is not None:
+        return Response(content=cached_content, media_type=media_type, headers=headers)
+
+    if cursor is not None:
+        try:
+            track_list, total_tracks, next_cursor = await get_music_track_page_async(
+                db=db,
+                base_url=base_url,
+                cursor=cursor,
+                limit=limit,
+                with_total=with_total,
+            )
+
+        except InvalidCursor:
+            return Response(status_code=400, content="Invalid cursor")
+
+        content = encode_track_list({
+            "total": total_tracks,
+            "offset": None,
+            "limit": limit,
+            "tracks": track_list or None,
+            "next_offset": None,
+            "next_cursor": next_cursor,
+        }, media_type)
+
+    else:
+        track_list, total_tracks, next_offset = await get_music_track_list_async(
+            db=db,
+            base_url=base_url,
+            offset=skip,
+            limit=limit,
+            with_total=with_total,
+        )
+
+        content = encode_track_list({
             "total": total_tracks,
             "offset": skip,
             "limit": limit,
-            "tracks": None,
-            "next_offset": skip + limit if skip + limit < total_tracks else None,
-        })
+            "tracks": track_list or None,
+            "next_offset": next_offset,
+        }, media_type)
+
+    await music_track_list_cache.set_async(cache_key, content)
+
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+@router.get("/search", response_model=MusicTrackSearchResponse)
+def music_track_search(
+    request: Request,
+    query: str = Query(..., alias="q", min_length=1, max_length=200),
+    limit: int = Query(20, alias="limit", ge=1, le=100),
+    db: Session = Depends(get_db),
+) -> JSONResponse:
+    """
+    Search music tracks by title and artist.
+
+    Every word of the query must match the start of a word in the title or the
+    artist. Results are ranked by relevance where the database index supports it.
+
+    Args:
+        request (Request): FastAPI request object to extract base URL.
+        query (str): The search text (alias: q).
+        limit (int): Maximum number of items to return (alias: limit).
+        db (Session): SQLAlchemy database session dependency.
+
+    Returns:
+        JSONResponse: The matching tracks.
+    """
+    base_url = str(request.base_url)
+    music_tracks = search_music_tracks(db, query, limit=limit)
 
     return JSONResponse({
-        "total": total_tracks,
-        "offset": skip,
+        "query": query,
         "limit": limit,
-        "tracks": track_list,
-        "next_offset": skip + limit if skip + limit < total_tracks else None,
+        "tracks": [music_track_to_json(music_track, base_url) for music_track in music_tracks],
     })
 
 
 @router.get("/{track_id}/")
-def music_track_get_stream(
+async def music_track_get_stream(
     request: Request,
     track_id: str,
-    db: Session = Depends(get_db),
+    quality: str | None = Query(None, alias="quality"),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Response:
     """
-    Stream a specific track by its ID, with support for HTTP Range requests.
+    Stream a specific track by its ID, with support for HTTP Range and conditional requests.
+
+    With `quality` (e.g. `low`), a lower-bitrate variant is streamed instead of the
+    original upload, in the codec the `Accept` header prefers. Tracks without such
+    a variant are streamed as uploaded.
 
     Args:
         request (Request): FastAPI request object (used to extract headers and base URL).
         track_id (str): ID of the track to stream.
-        db (Session): SQLAlchemy database session dependency.
+        quality (str | None): Variant quality, or `original` (alias: quality).
+        db (AsyncSession): SQLAlchemy async database session dependency.
 
     Returns:
-        StreamingResponse or Response: Audio stream of the track, or 404 if not found.
+        Response: Audio stream of the track (200, 206 or 416), 304 if the client's copy
+            is still valid, 400 for an unknown quality, or 404 if not found.
     """
-    track = get_music_track(
+    if quality is not None and quality != "original" and quality not in TRACK_VARIANT_QUALITIES:
+        return Response(status_code=400, content="Unknown quality")
+
+    music_track_file = await get_music_track_file(
         track_id=track_id,
         db=db,
     )
-    range_header = request.headers.get("range")
 
-    if track is None:
+    if music_track_file is None:
         return Response(status_code=404, content="Not found music track")
 
-    path_to_track = DIR_DATA / track.path
-    file_size = os.path.getsize(path_to_track)
+    music_track_file = music_track_file.select_variant(
+        quality,
+        preferred_variant_codecs(request.headers.get("accept"), TRACK_VARIANT_CODECS),
+    )
 
-    if range_header:
-        # Handle partial content (HTTP 206)
-        range_value = range_header.replace("bytes=", "").split("-")
-        start = int(range_value[0]) if range_value[0] else 0
-        end = int(range_value[1]) if len(range_value) > 1 and range_value[1] else file_size - 1
+    # Validators come from the cached track details, so revalidations and range
+    # requests for a hot track touch neither the database nor the disk metadata.
+    headers = {
+        "cache-control": IMMUTABLE_CACHE_CONTROL,
+        "last-modified": http_date(music_track_file.created_at),
+    }
+    if music_track_file.etag:
+        headers["etag"] = f'"{music_track_file.etag}"'
 
-        response = StreamingResponse(
-            iter_file(path_to_track, start, end + 1),
-            status_code=206,
-            media_type="audio/mpeg"
-        )
-        response.headers.update({
-            "Content-Range": f"bytes {start}-{end}/{file_size}",
-            "Accept-Ranges": "bytes",
-            "Content-Length": str(end - start + 1)
-        })
-        return response
-
-    # Return full file if no range requested
-    return StreamingResponse(
-        iter_file(path_to_track, 0, file_size),
-        media_type="audio/mpeg"
+    if quality is not None:
+        # The codec of a variant depends on the Accept header.
+        headers["vary"] = "accept"
+
+    if is_not_modified(request.headers, headers.get("etag"), headers["last-modified"]):
+        return not_modified_response(headers)
+
+    return range_file_response(
+        request.headers,
+        method=request.method,
+        path=music_track_file.path,
+        file_size=music_track_file.size,
+        media_type=music_track_file.media_type,
+        headers=headers,
+        # Deleted by another process since its details were cached.
+        on_missing=partial(invalidate_music_track_file, track_id),
     )
 
 
-@router.post("/")
-def music_track_upload(
+@router.get("/{track_id}/waveform", response_model=MusicTrackWaveformResponse)
+async def music_track_get_waveform(
+    request: Request,
+    track_id: str,
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """
+    Retrieve the waveform preview and loudness of a track, computed at ingestion.
+
+    The analysis never changes for a track, so responses are cacheable forever
+    and revalidated by the track's ETag.
+
+    Args:
+        request (Request): FastAPI request object (used to extract headers).
+        track_id (str): ID of the track.
+        db (AsyncSession): SQLAlchemy async database session dependency.
+
+    Returns:
+        Response: The analysis as JSON, 304 if the client's copy is still valid,
+            or 404 if the track does not exist or was not analyzed.
+    """
+    music_track_waveform = await get_music_track_waveform_async(track_id, db)
+
+    if music_track_waveform is None:
+        return Response(status_code=404, content="Not found music track waveform")
+
+    headers = {
+        "cache-control": IMMUTABLE_CACHE_CONTROL,
+        "last-modified": http_date(music_track_waveform["created_at"]),
+    }
+    if music_track_waveform["etag"]:
+        headers["etag"] = f'"{music_track_waveform["etag"]}-waveform"'
+
+    if is_not_modified(request.headers, headers.get("etag"), headers["last-modified"]):
+        return not_modified_response(headers)
+
+    return JSONResponse({
+        "id": track_id,
+        "duration": music_track_waveform["duration"],
+        "loudness": music_track_waveform["loudness"],
+        "replay_gain": get_replay_gain(music_track_waveform["loudness"]),
+        "peak": music_track_waveform["peak"],
+        "waveform": list(music_track_waveform["waveform"]),
+    }, headers=headers)
+
+
+@router.post(
+    "/",
+    status_code=202,
+    response_model=IngestJobCreatedResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["music_track_file"],
+                        "properties": {
+                            "music_track_file": {"type": "string", "format": "binary"},
+                            "music_track_cover_file": {"type": "string", "format": "binary"},
+                            "music_track_title": {"type": "string"},
+                            "music_track_artist": {"type": "string"},
+                        },
+                    },
+                },
+            },
+        },
+    },
+)
+async def music_track_upload(
+        request: Request,
         db: Session = Depends(get_db),
-        music_track_file: UploadFile = File(...),
-        music_track_cover_file: Optional[UploadFile] = File(None),
-        music_track_title: Optional[str] = Form(None),
-        music_track_artist: Optional[str] = Form(None),
 ) -> Response:
     """
     Upload a new music file to the server.
 
+    The request body is parsed as it streams in: the music file is written in
+    chunks to a temporary file in `DIR_MUSIC` (hashed on the way and limited to
+    `UPLOAD_MAX_SIZE` bytes), so memory use doesn't depend on the file size.
+    Metadata extraction and cover transcoding then run as a background job;
+    poll the returned `status_url` for its progress.
+
+    Form fields:
+        music_track_file: The music file to upload.
+        music_track_cover_file: The cover of the new music track. Optional.
+        music_track_title: The name of the new music track. Optional.
+        music_track_artist: The author of the new music track. Optional.
+
     Args:
-        music_track_file (UploadFile): The music file to upload.
-        music_track_title (Optional[str]): The name of the new music track.
-        music_track_artist (Optional[str]): The author of the new music track.
-        music_track_cover_file (Optional[UploadFile]): The cover of the new music track.
+        request (Request): FastAPI request object, read as a stream.
         db (Session): SQLAlchemy database session dependency.
 
     Returns:
-        Response: HTTP 200 OK on success.
+        Response: HTTP 202 Accepted with the ingestion job id on success, 413 if a file
+            is too large, 400/422 if the form is malformed or the music file is missing.
     """
-    save_music_track(
-        db=db,
-        music_track_binary=music_track_file.file.read(),
-        music_track_cover_binary=music_track_cover_file.file.read() if music_track_cover_file else None,
-        music_track_title=music_track_title,
-        music_track_artist=music_track_artist,
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > UPLOAD_REQUEST_MAX_SIZE:
+        return Response(status_code=413, content="Music track upload is too large")
+
+    parser = MultipartUploadParser(
+        request.headers,
+        streamed_fields={
+            "music_track_file": lambda: StreamedFile(DIR_MUSIC, max_size=UPLOAD_MAX_SIZE),
+        },
+        buffered_fields={"music_track_cover_file", "music_track_title", "music_track_artist"},
+        max_part_size=UPLOAD_COVER_MAX_SIZE,
+        max_buffered_size=UPLOAD_BUFFERED_MAX_SIZE,
+        max_size=UPLOAD_REQUEST_MAX_SIZE,
     )
 
-    return Response(status_code=200, content="OK")
+    try:
+        await parser.parse(request.stream())
+
+    except FileTooLarge:
+        return Response(status_code=413, content="Music track upload is too large")
+
+    except MalformedMultipart as exc:
+        return Response(status_code=400, content=str(exc))
+
+    music_track_file = parser.streamed_files.get("music_track_file")
+    if music_track_file is None:
+        return Response(status_code=422, content="Field 'music_track_file' is required")
+
+    try:
+        job = await run_in_threadpool(
+            enqueue_ingest_job,
+            db=db,
+            music_track_file=music_track_file,
+            music_track_cover_binary=parser.files.get("music_track_cover_file") or None,
+            music_track_title=parser.fields.get("music_track_title") or None,
+            music_track_artist=parser.fields.get("music_track_artist") or None,
+        )
+
+    except BaseException:
+        music_track_file.discard()
+        raise
+
+    ingest_worker = getattr(request.app.state, "ingest_worker", None)
+    if ingest_worker is not None:
+        ingest_worker.notify()
+
+    return JSONResponse(status_code=202, content={
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"{request.base_url}{URL_INGEST_JOB}{job.id}",
+    })
+
+
+@router.delete("/{track_id}/")
+def music_track_delete(
+    track_id: str,
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    Delete a music track.
+
+    Its audio, cover and encodings are removed from disk only once no other
+    track (e.g. the same file uploaded by someone else) references them.
+
+    Args:
+        track_id (str): UUID of the track to delete.
+        db (Session): SQLAlchemy database session dependency.
+
+    Returns:
+        Response: HTTP 204 No Content, or 404 if the track does not exist.
+    """
+    if not delete_music_track(db, track_id):
+        return Response(status_code=404, content="Not found music track")
+
+    return Response(status_code=204)
@@ -0,0 +1,49 @@
+"""
+Encoding of track list bodies.
+
+Pages are encoded straight to bytes with orjson rather than through
+`JSONResponse` and the stdlib encoder; the declared response models only
+document them. Clients may ask for MessagePack instead, with
+`Accept: application/msgpack`: the same structure, smaller and cheaper to decode.
+"""
+
+from typing import Any
+
+from fastapi import Request
+import msgpack
+import orjson
+
+from api.negotiation import preferred_media_type
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# In server preference order: clients get JSON unless they prefer MessagePack.
+TRACK_LIST_MEDIA_TYPES = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+
+
+def negotiate_track_list_media_type(request: Request) -> str:
+    """
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        str: The media type to encode the page with; JSON if the client accepts neither.
+    """
+    return preferred_media_type(request.headers.get("accept"), TRACK_LIST_MEDIA_TYPES) or JSON_MEDIA_TYPE
+
+
+def encode_track_list(content: dict[str, Any], media_type: str) -> bytes:
+    """
+    Args:
+        content (dict[str, Any]): The page, as built by the router.
+        media_type (str): One of `TRACK_LIST_MEDIA_TYPES`.
+
+    Returns:
+        bytes: The encoded body.
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(content)
+
+    return orjson.dumps(content)
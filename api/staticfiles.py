@@ -0,0 +1,145 @@
+from email.utils import formatdate
+from mimetypes import guess_type
+from pathlib import PurePath
+import hashlib
+import os
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import PathLike
+from starlette.types import Scope
+
+from .conditional import (
+    IMMUTABLE_CACHE_CONTROL,
+    is_not_modified,
+    not_modified_response,
+)
+from .ranges import range_file_response
+
+
+def stat_validators(stat_result: os.stat_result) -> dict[str, str]:
+    """
+    Build the `etag` and `last-modified` headers of a file from its stat result.
+
+    Matches what Starlette's `FileResponse` sends, so caches keep validating
+    across the switch to `RangeStaticFiles`.
+
+    Args:
+        stat_result (os.stat_result): Result of `os.stat` on the file.
+
+    Returns:
+        dict[str, str]: The `etag` and `last-modified` headers.
+    """
+    etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+
+    return {
+        "etag": f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"',
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+
+
+class RangeStaticFiles(StaticFiles):
+    """
+    `StaticFiles` serving files through the shared range engine in `api.ranges`.
+
+    Adds suffix and multi-range support, `If-Range` evaluation and 416 answers
+    to the static mounts, and uses the same zero-copy capable file responses as
+    the track stream endpoint.
+    """
+
+    def file_headers(self, full_path: PathLike, stat_result: os.stat_result) -> dict[str, str]:
+        """
+        Return the validator and caching headers sent with a file.
+
+        Args:
+            full_path (PathLike): Absolute path of the file.
+            stat_result (os.stat_result): Result of `os.stat` on the file.
+
+        Returns:
+            dict[str, str]: Response headers, including `etag` and `last-modified`.
+        """
+        return stat_validators(stat_result)
+
+    def media_type(self, full_path: PathLike) -> str:
+        """
+        Return the content type a file is served with.
+
+        Args:
+            full_path (PathLike): Absolute path of the file.
+
+        Returns:
+            str: The media type, guessed from the file extension.
+        """
+        return guess_type(full_path)[0] or "text/plain"
+
+    def file_response(
+            self,
+            full_path: PathLike,
+            stat_result: os.stat_result,
+            scope: Scope,
+            status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = self.file_headers(full_path, stat_result)
+
+        if is_not_modified(request_headers, headers["etag"], headers["last-modified"]):
+            return not_modified_response(headers)
+
+        if status_code != 200:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        return range_file_response(
+            request_headers,
+            method=scope["method"],
+            path=full_path,
+            file_size=stat_result.st_size,
+            media_type=self.media_type(full_path),
+            headers=headers,
+        )
+
+
+class ImmutableStaticFiles(RangeStaticFiles):
+    """
+    `RangeStaticFiles` for directories of write-once files named by UUID.
+
+    A file name is never reused for different bytes, so the name itself is a
+    strong entity tag, and full responses carry `Cache-Control: immutable`.
+    Revalidations still look the file up, so a deleted file answers 404 rather
+    than `304 Not Modified`.
+    """
+
+    @staticmethod
+    def name_etag(path: PathLike) -> str:
+        return f'"{PurePath(path).stem}"'
+
+    def file_headers(self, full_path: PathLike, stat_result: os.stat_result) -> dict[str, str]:
+        return {
+            "etag": self.name_etag(full_path),
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "cache-control": IMMUTABLE_CACHE_CONTROL,
+        }
+
+
+class HlsStaticFiles(ImmutableStaticFiles):
+    """
+    `ImmutableStaticFiles` for HLS renditions, one directory per track.
+
+    Playlists and segments are written once, at ingestion, and moved into place
+    as a whole, so they are cached as immutable like the audio files. Segment
+    names repeat across tracks, so the entity tag also carries the track directory.
+    """
+
+    # `mimetypes` maps `.ts` to TypeScript/Qt sources.
+    media_types = {
+        ".m3u8": "application/vnd.apple.mpegurl",
+        ".ts": "video/mp2t",
+    }
+
+    @staticmethod
+    def name_etag(path: PathLike) -> str:
+        path = PurePath(path)
+        return f'"{path.parent.name}-{path.stem}"'
+
+    def media_type(self, full_path: PathLike) -> str:
+        return self.media_types.get(PurePath(full_path).suffix) or super().media_type(full_path)
@@ -0,0 +1,206 @@
+"""
+Streaming `multipart/form-data` parsing for large uploads.
+
+FastAPI's `UploadFile` spools the whole request body before the endpoint runs,
+so a size limit can only be checked afterwards and every byte is written twice.
+`MultipartUploadParser` instead feeds chosen file fields straight into a
+`StreamedFile` as the body arrives, and keeps the expected (small) fields in
+memory up to a per-part and a total limit. Parts with other names are skipped
+without being buffered, and the whole body is limited as it is read, so a
+chunked request without `Content-Length` is bounded too.
+"""
+
+from typing import AsyncIterator, Callable, Collection, Mapping
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.datastructures import Headers
+
+from service.music_track.storage import FileTooLarge, StreamedFile
+
+
+class MalformedMultipart(ValueError):
+    """Raised when the request body is not valid `multipart/form-data`."""
+
+
+class MultipartPart:
+    def __init__(self):
+        self.headers: list[tuple[bytes, bytes]] = []
+        self.field_name = ""
+        self.filename: str | None = None
+        self.data = bytearray()
+        self.streamed_file: StreamedFile | None = None
+        self.skipped = False
+
+
+class MultipartUploadParser:
+    """
+    Parse a `multipart/form-data` body as it streams in.
+
+    Attributes:
+        fields (dict[str, str]): Plain form fields.
+        files (dict[str, bytes]): Buffered file fields.
+        streamed_files (dict[str, StreamedFile]): File fields written to disk.
+    """
+
+    def __init__(
+            self,
+            headers: Headers,
+            streamed_fields: Mapping[str, Callable[[], StreamedFile]],
+            buffered_fields: Collection[str],
+            max_part_size: int,
+            max_buffered_size: int,
+            max_size: int,
+    ):
+        """
+        Args:
+            headers (Headers): Request headers.
+            streamed_fields (Mapping[str, Callable[[], StreamedFile]]): Field names to stream
+                to disk, each mapped to a factory creating its `StreamedFile`.
+            buffered_fields (Collection[str]): Field names kept in memory; other parts are skipped.
+            max_part_size (int): Size limit for every buffered part.
+            max_buffered_size (int): Size limit for all buffered parts together.
+            max_size (int): Size limit for the whole request body.
+        """
+        self.headers = headers
+        self.streamed_fields = streamed_fields
+        self.buffered_fields = buffered_fields
+        self.max_part_size = max_part_size
+        self.max_buffered_size = max_buffered_size
+        self.max_size = max_size
+
+        self.fields: dict[str, str] = {}
+        self.files: dict[str, bytes] = {}
+        self.streamed_files: dict[str, StreamedFile] = {}
+
+        self._part = MultipartPart()
+        self._header_name = b""
+        self._header_value = b""
+        self._pending_writes: list[tuple[StreamedFile, bytes]] = []
+        self._buffered_size = 0
+
+    def on_part_begin(self) -> None:
+        self._part = MultipartPart()
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._part.headers.append((self._header_name.lower(), self._header_value))
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        content_disposition = dict(self._part.headers).get(b"content-disposition")
+        _, options = parse_options_header(content_disposition)
+
+        if b"name" not in options:
+            raise MalformedMultipart('The Content-Disposition header field "name" must be provided.')
+
+        self._part.field_name = options[b"name"].decode("utf-8", errors="replace")
+
+        if b"filename" in options:
+            self._part.filename = options[b"filename"].decode("utf-8", errors="replace")
+
+            factory = self.streamed_fields.get(self._part.field_name)
+            if factory is not None and self._part.field_name not in self.streamed_files:
+                self._part.streamed_file = factory()
+                self.streamed_files[self._part.field_name] = self._part.streamed_file
+                return
+
+        if self._part.field_name not in self.buffered_fields:
+            self._part.skipped = True
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._part.streamed_file is not None:
+            self._pending_writes.append((self._part.streamed_file, data[start:end]))
+            return
+
+        if self._part.skipped:
+            return
+
+        if len(self._part.data) + (end - start) > self.max_part_size:
+            raise FileTooLarge(self.max_part_size)
+
+        # Repeated field names each get a part of their own, so the parts are also limited together.
+        self._buffered_size += end - start
+        if self._buffered_size > self.max_buffered_size:
+            raise FileTooLarge(self.max_buffered_size)
+
+        self._part.data += data[start:end]
+
+    def on_part_end(self) -> None:
+        if self._part.streamed_file is not None or self._part.skipped:
+            return
+
+        if self._part.filename is not None:
+            self.files[self._part.field_name] = bytes(self._part.data)
+
+        else:
+            self.fields[self._part.field_name] = self._part.data.decode("utf-8", errors="replace")
+
+    async def parse(self, stream: AsyncIterator[bytes]) -> None:
+        """
+        Consume the request body.
+
+        Streamed files are closed when parsing succeeds and discarded when it fails.
+
+        Args:
+            stream (AsyncIterator[bytes]): The request body, e.g. `request.stream()`.
+
+        Raises:
+            MalformedMultipart: If the body is not valid `multipart/form-data`.
+            FileTooLarge: If any part, the buffered parts or the whole body exceed their size limit.
+        """
+        content_type, params = parse_options_header(self.headers.get("content-type"))
+
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise MalformedMultipart("Expected a multipart/form-data body with a boundary.")
+
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        })
+
+        received_size = 0
+
+        try:
+            async for chunk in stream:
+                received_size += len(chunk)
+                if received_size > self.max_size:
+                    raise FileTooLarge(self.max_size)
+
+                try:
+                    parser.write(chunk)
+
+                except MultipartParseError as exc:
+                    raise MalformedMultipart(str(exc)) from exc
+
+                # The parser callbacks are synchronous, so writes are queued and awaited here.
+                for streamed_file, data in self._pending_writes:
+                    await streamed_file.write(data)
+
+                self._pending_writes.clear()
+
+            try:
+                parser.finalize()
+
+            except MultipartParseError as exc:
+                raise MalformedMultipart(str(exc)) from exc
+
+            for streamed_file in self.streamed_files.values():
+                await streamed_file.close()
+
+        except BaseException:
+            for streamed_file in self.streamed_files.values():
+                streamed_file.discard()
+
+            raise
@@ -0,0 +1,141 @@
+"""
+Backfill of the file details stored with each track.
+
+Tracks uploaded before their MIME type, size, bitrate, sample rate and codec
+were stored have these columns NULL (the migration only fills what it can
+without reading the files). This reads them with `MusicTrackMetadata`, as
+ingestion does, in a pool of worker processes, and writes them back in batches.
+Only rows with no size are read, so an interrupted backfill can simply be run
+again.
+
+Usage:
+    python backfill_tracks.py --workers 8 --batch-size 500
+"""
+
+from typing import Any
+import argparse
+import multiprocessing
+import os
+import time
+
+from sqlalchemy import select, update
+from ten_utils.log import Logger
+
+from common.constants import DIR_DATA
+from database.config import SessionLocal
+from database.models import Track
+from service.music_track import bump_library_version
+
+
+logger = Logger(__name__)
+
+
+def read_music_track_details(row: tuple[str, str]) -> dict[str, Any]:
+    """
+    Worker entry point: reads the file details of one track.
+
+    Args:
+        row (tuple[str, str]): The track's id and relative path.
+
+    Returns:
+        dict[str, Any]: `status` (`updated` or `failed`), `id`, plus `fields`
+            (the column values to update) or `error`.
+    """
+    from service.music_track.metadata import MusicTrackMetadata
+
+    music_track_id, path = row
+
+    try:
+        music_track_metadata = MusicTrackMetadata(DIR_DATA / path)
+
+    except Exception as exc:
+        return {"id": music_track_id, "status": "failed", "error": repr(exc)}
+
+    return {
+        "id": music_track_id,
+        "status": "updated",
+        "fields": {
+            "id": music_track_id,
+            "mime_type": music_track_metadata["mime_type"],
+            "size": music_track_metadata["size"],
+            "bitrate": music_track_metadata["bitrate"],
+            "sample_rate": music_track_metadata["sample_rate"],
+            "codec": music_track_metadata["codec"],
+        },
+    }
+
+
+def update_music_tracks(rows: list[dict[str, Any]]) -> None:
+    """Writes a batch of details with a single executemany and a single commit."""
+    if not rows:
+        return
+
+    with SessionLocal() as db:
+        db.execute(update(Track), rows)
+        db.commit()
+
+
+def backfill_tracks(workers: int, batch_size: int) -> dict[str, float]:
+    """
+    Fills in the file details of every track that has none.
+
+    Args:
+        workers (int): Number of worker processes.
+        batch_size (int): Number of tracks per bulk update.
+
+    Returns:
+        dict[str, float]: Counters of the run.
+    """
+    with SessionLocal() as db:
+        rows = db.execute(select(Track.id, Track.path).where(Track.size.is_(None)).order_by(Track.id)).all()
+
+    stats = {"tracks": len(rows), "updated": 0, "failed": 0}
+    batch: list[dict[str, Any]] = []
+    started = time.perf_counter()
+
+    # "spawn" so workers don't inherit the parent's database connections.
+    context = multiprocessing.get_context("spawn")
+
+    with context.Pool(processes=workers) as pool:
+        for result in pool.imap_unordered(read_music_track_details, [tuple(row) for row in rows], chunksize=16):
+            stats[result["status"]] += 1
+
+            if result["status"] == "updated":
+                batch.append(result["fields"])
+
+            else:
+                logger.warning(f"Failed to read track {result['id']}: {result['error']}")
+
+            if len(batch) >= batch_size:
+                update_music_tracks(batch)
+                batch.clear()
+
+    update_music_tracks(batch)
+
+    if stats["updated"]:
+        bump_library_version()
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill in the stored file details of existing tracks.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="Tracks per bulk update (default: 500).")
+    args = parser.parse_args()
+
+    stats = backfill_tracks(workers=args.workers, batch_size=args.batch_size)
+    logger.info(
+        f"{stats['tracks']} tracks ({stats['updated']} updated, {stats['failed']} failed) in {stats['seconds']}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Shared helpers for the benchmark scripts.
+
+The application reads its configuration from the environment at import time,
+so every benchmark calls `setup_environment` before importing anything from
+`api`, `database` or `service`.
+"""
+
+from pathlib import Path
+import os
+import random
+import resource
+import tempfile
+import time
+
+
+WORDS = (
+    "love night heart dream fire light rain summer blue city road home wild gold "
+    "river shadow ocean star moon girl boy dance time world sky storm ghost glass "
+    "silver winter echo paper velvet thunder neon electric lonely broken golden "
+    "midnight sunrise highway island desert forest garden kingdom empire crystal"
+).split()
+
+
+def setup_environment(dir_data: Path | None = None, database_url: str | None = None) -> Path:
+    """
+    Point the application at a throwaway data directory and database.
+
+    Values already present in the environment win, so a benchmark can be run
+    against a real deployment configuration by exporting `ENV` and friends.
+
+    Args:
+        dir_data (Path | None): Data directory to use. Defaults to a new temp directory.
+        database_url (str | None): Database URL. Defaults to a SQLite file inside `dir_data`.
+
+    Returns:
+        Path: The data directory in use.
+    """
+    dir_data = Path(os.environ.get("DIR_DATA") or dir_data or tempfile.mkdtemp(prefix="gv_music_bench_"))
+    (dir_data / "music").mkdir(parents=True, exist_ok=True)
+    (dir_data / "music_cover").mkdir(parents=True, exist_ok=True)
+
+    os.environ.setdefault("ENV", "prod")
+    os.environ.setdefault("DIR_DATA", str(dir_data))
+    os.environ.setdefault("DATABASE_URL", database_url or f"sqlite:///{dir_data / 'bench.sqlite3'}")
+    os.environ.setdefault("DATABASE_LOG", "false")
+    os.environ.setdefault("API_ALLOW_HOSTS", "*")
+    os.environ.setdefault("API_CORS_ALLOW_ORIGINS", "*")
+    os.environ.setdefault("API_CORS_ALLOW_METHODS", "*")
+    os.environ.setdefault("API_CORS_ALLOW_CREDENTIALS", "false")
+    os.environ.setdefault("LOG_LEVEL", "2")
+
+    return dir_data
+
+
+def populate_tracks(tracks: int, seed: int = 0) -> None:
+    """
+    Migrate the database to the latest revision and fill it with synthetic tracks.
+
+    Only rows are created, no audio files. A database that already holds
+    `tracks` rows is left as is, so repeated runs reuse the catalog.
+
+    Args:
+        tracks (int): Number of tracks the catalog should hold.
+        seed (int): Seed of the title and artist generator.
+    """
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import insert
+
+    from common.constants import BASE_DIR
+    from database.config import SessionLocal
+    from database.models import Track
+
+    command.upgrade(Config(str(BASE_DIR / "alembic.ini")), "head")
+
+    rng = random.Random(seed)
+
+    with SessionLocal() as db:
+        if db.query(Track).count() >= tracks:
+            return
+
+        for batch_start in range(0, tracks, 10_000):
+            db.execute(insert(Track), [
+                {
+                    "title": " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 4))),
+                    "artist": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS).capitalize()}{rng.randint(1, 999)}",
+                    "path": f"music/bench-{index}.mp3",
+                    "duration": rng.randint(60, 600),
+                    "mime_type": "audio/mpeg",
+                    "size": rng.randint(2_000_000, 15_000_000),
+                    "bitrate": 320,
+                    "sample_rate": 44100,
+                    "codec": "mp3",
+                }
+                for index in range(batch_start, min(batch_start + 10_000, tracks))
+            ])
+
+        db.commit()
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of `samples`, e.g. `fraction=0.99` for p99.
+    """
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def write_random_file(path: Path, size: int) -> Path:
+    """
+    Write `size` random bytes to `path`.
+
+    Args:
+        path (Path): Destination file.
+        size (int): Number of bytes to write.
+
+    Returns:
+        Path: The written file.
+    """
+    with open(path, "wb") as file:
+        remaining = size
+        while remaining:
+            block = os.urandom(min(remaining, 1024 * 1024))
+            file.write(block)
+            remaining -= len(block)
+
+    return path
+
+
+class Timer:
+    """
+    Context manager measuring wall-clock and process CPU time.
+
+    Attributes:
+        wall (float): Elapsed wall-clock seconds.
+        cpu (float): Elapsed user + system CPU seconds of this process.
+    """
+
+    def __enter__(self) -> "Timer":
+        self._wall = time.perf_counter()
+        self._cpu = self._cpu_time()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.wall = time.perf_counter() - self._wall
+        self.cpu = self._cpu_time() - self._cpu
+
+    @staticmethod
+    def _cpu_time() -> float:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_utime + usage.ru_stime
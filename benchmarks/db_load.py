@@ -0,0 +1,189 @@
+"""
+Compare requests/s of the sync and async database paths under concurrent load.
+
+A uvicorn server runs a small app exposing the same service calls twice:
+    - sync: `def` endpoints with `get_db`, run in Starlette's threadpool;
+    - async: `async def` endpoints with `get_async_db`, run on the event loop.
+
+Each path is loaded with `--concurrency` clients for `--duration` seconds,
+alternating track list pages (without the response cache) and single-track
+lookups. Point `DATABASE_URL` at MySQL to measure the production setup.
+
+Usage:
+    python -m benchmarks.db_load --tracks 20000 --concurrency 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from .common import percentile, populate_tracks, setup_environment
+
+
+def create_app():
+    from contextlib import asynccontextmanager
+
+    from fastapi import Depends, FastAPI, Request
+    from fastapi.responses import JSONResponse, Response
+
+    from database import get_async_db, get_db
+    from database.config import async_engine
+    from service.music_track import (
+        get_music_track,
+        get_music_track_async,
+        get_music_track_list,
+        get_music_track_list_async,
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await async_engine.dispose()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/sync/tracks")
+    def sync_list(request: Request, offset: int = 0, limit: int = 50, db=Depends(get_db)):
+        tracks, total, _ = get_music_track_list(db, str(request.base_url), offset=offset, limit=limit)
+        return JSONResponse({"total": total, "tracks": tracks})
+
+    @app.get("/async/tracks")
+    async def async_list(request: Request, offset: int = 0, limit: int = 50, db=Depends(get_async_db)):
+        tracks, total, _ = await get_music_track_list_async(db, str(request.base_url), offset=offset, limit=limit)
+        return JSONResponse({"total": total, "tracks": tracks})
+
+    @app.get("/sync/tracks/{track_id}")
+    def sync_get(track_id: str, db=Depends(get_db)):
+        track = get_music_track(track_id, db)
+        return Response(status_code=200 if track else 404, content=track.path if track else "")
+
+    @app.get("/async/tracks/{track_id}")
+    async def async_get(track_id: str, db=Depends(get_async_db)):
+        track = await get_music_track_async(track_id, db)
+        return Response(status_code=200 if track else 404, content=track.path if track else "")
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(url: str, timeout: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+
+                await asyncio.sleep(0.1)
+
+
+async def load(base_url: str, path: str, track_ids: list[str], tracks: int, concurrency: int, duration: float) -> dict:
+    import httpx
+
+    latencies: list[float] = []
+    errors = 0
+    rng = random.Random(0)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        deadline = time.monotonic() + duration
+
+        async def client_loop(index: int) -> None:
+            nonlocal errors
+            request_number = index
+
+            while time.monotonic() < deadline:
+                if request_number % 2:
+                    url = f"/{path}/tracks/{rng.choice(track_ids)}"
+                else:
+                    url = f"/{path}/tracks?offset={rng.randrange(0, min(tracks, 1000))}&limit=50"
+
+                request_number += 1
+                started = time.perf_counter()
+
+                try:
+                    response = await client.get(url)
+
+                except httpx.TransportError:
+                    errors += 1
+                    continue
+
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += response.status_code != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=20_000, help="Number of tracks in the catalog.")
+    parser.add_argument("--concurrency", type=int, default=200, help="Number of concurrent clients.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per path.")
+    parser.add_argument("--paths", default="sync,async", help="Comma-separated list of paths to run.")
+    args = parser.parse_args()
+
+    setup_environment()
+    populate_tracks(args.tracks)
+
+    from database.config import SessionLocal
+    from database.models import Track
+
+    with SessionLocal() as db:
+        track_ids = [track_id for track_id, in db.query(Track.id).limit(1000)]
+
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.db_load:create_app", "--factory",
+            "--port", str(port), "--log-level", "warning", "--no-access-log",
+        ],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        asyncio.run(wait_for_server(base_url + "/docs"))
+        results = [
+            asyncio.run(load(base_url, path, track_ids, args.tracks, args.concurrency, args.duration))
+            for path in args.paths.split(",")
+        ]
+
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Measure near-duplicate lookups against a large fingerprint index.
+
+Every synthetic track gets a random fingerprint, indexed like an ingested one.
+Queries are then run for:
+    - re-encodes: stored fingerprints with random bit flips and a small shift,
+      which must be found;
+    - new audio: fresh random fingerprints, which must not match anything.
+
+Usage:
+    python -m benchmarks.fingerprint_lookup --tracks 100000 --queries 500
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from .common import percentile, populate_tracks, setup_environment
+
+
+def populate_fingerprints(rng, words: int) -> None:
+    import numpy as np
+    from sqlalchemy import insert
+
+    from database.config import SessionLocal
+    from database.models import Track, TrackFingerprint, TrackFingerprintHash
+    from service.music_track.fingerprint import compute_fingerprint_hashes
+
+    with SessionLocal() as db:
+        if db.query(TrackFingerprint).count():
+            return
+
+        track_ids = [track_id for track_id, in db.query(Track.id).order_by(Track.id)]
+
+        for batch_start in range(0, len(track_ids), 5_000):
+            fingerprints, hashes = [], []
+
+            for track_id in track_ids[batch_start:batch_start + 5_000]:
+                fingerprint = rng.integers(0, 2 ** 32, words, dtype=np.uint32)
+                fingerprints.append({"track_id": track_id, "fingerprint": fingerprint.astype("<u4").tobytes()})
+                hashes.extend(
+                    {"hash": hash_value, "track_id": track_id}
+                    for hash_value in set(compute_fingerprint_hashes(fingerprint))
+                )
+
+            db.execute(insert(TrackFingerprint), fingerprints)
+            db.execute(insert(TrackFingerprintHash), hashes)
+
+        db.commit()
+
+
+def re_encode(rng, fingerprint, bit_error_rate: float, shift: int):
+    import numpy as np
+
+    flips = (rng.random((len(fingerprint), 32)) < bit_error_rate).astype(np.uint64)
+    noise = (flips << np.arange(32, dtype=np.uint64)).sum(axis=1).astype(np.uint32)
+
+    return (fingerprint ^ noise)[shift:]
+
+
+def run_queries(rng, queries: int, words: int, bit_error_rate: float) -> dict:
+    import numpy as np
+
+    from database.config import SessionLocal
+    from database.models import TrackFingerprint
+    from service.music_track.fingerprint import compute_fingerprint_hashes, find_near_duplicate
+
+    results = {"re-encode": [], "new": []}
+    found = false_matches = 0
+
+    with SessionLocal() as db:
+        sample = db.query(TrackFingerprint).order_by(TrackFingerprint.track_id).limit(queries).all()
+
+        for stored in sample:
+            for kind in results:
+                if kind == "re-encode":
+                    fingerprint = re_encode(rng, np.frombuffer(stored.fingerprint, dtype="<u4"), bit_error_rate, 2)
+
+                else:
+                    fingerprint = rng.integers(0, 2 ** 32, words, dtype=np.uint32)
+
+                query = {"fingerprint": fingerprint.tobytes(), "hashes": compute_fingerprint_hashes(fingerprint)}
+
+                started = time.perf_counter()
+                match = find_near_duplicate(db, query)
+                results[kind].append((time.perf_counter() - started) * 1000)
+
+                if kind == "re-encode":
+                    found += match == stored.track_id
+
+                else:
+                    false_matches += match is not None
+
+    return {
+        "queries": len(sample),
+        "recall": round(found / len(sample), 3),
+        "false_matches": false_matches,
+        **{
+            f"{kind}_{name}_ms": round(value, 3)
+            for kind, latencies in results.items()
+            for name, value in (
+                ("p50", percentile(latencies, 0.50)),
+                ("p99", percentile(latencies, 0.99)),
+                ("mean", statistics.fmean(latencies)),
+            )
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=100_000, help="Number of fingerprinted tracks.")
+    parser.add_argument("--words", type=int, default=650, help="Words per fingerprint (650 is ~30 s of audio).")
+    parser.add_argument("--queries", type=int, default=500, help="Number of queries of each kind.")
+    parser.add_argument("--bit-error-rate", type=float, default=0.08, help="Bit flips of the simulated re-encodes.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the catalog and query generator.")
+    args = parser.parse_args()
+
+    setup_environment()
+    populate_tracks(args.tracks, args.seed)
+
+    import numpy as np
+
+    rng = np.random.default_rng(args.seed)
+    populate_fingerprints(rng, args.words)
+
+    print(json.dumps({
+        "tracks": args.tracks,
+        "words": args.words,
+        "bit_error_rate": args.bit_error_rate,
+        **run_queries(rng, args.queries, args.words, args.bit_error_rate),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Generate a synthetic MP3 library.
+
+Files are MPEG-1 Layer III streams (128 kbit/s, 44.1 kHz, stereo) of seeded
+noise frames with ID3v2 title and artist tags, so mutagen parses them like
+real tracks and every file has its own content hash. A share of them embeds a
+JPEG cover in an APIC frame, the size of typical album art.
+
+The frames don't hold decodable audio: tools that decode (ffmpeg for the
+loudness analysis and fingerprints) reject or skip them, which keeps the
+benchmarks focused on the server's own work.
+
+Usage:
+    python -m benchmarks.library /tmp/library --tracks 1000 --seconds 180 --cover-ratio 0.5
+"""
+
+from pathlib import Path
+import argparse
+import io
+import json
+import random
+
+from .common import WORDS
+
+
+FRAME_HEADER = bytes((0xFF, 0xFB, 0x90, 0x64))  # MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, no padding
+FRAME_SIZE = 417
+FRAMES_PER_SECOND = 44100 / 1152
+
+
+def make_cover(size: int, seed: int = 0) -> bytes:
+    """
+    Render a JPEG cover: a coloured gradient with some grain, so it compresses like artwork, not like a flat fill.
+
+    Args:
+        size (int): Width and height in pixels.
+        seed (int): Seed of the colours.
+
+    Returns:
+        bytes: The JPEG data.
+    """
+    from PIL import Image
+
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient("L").resize((size, size))
+    channels = []
+
+    for _ in range(3):
+        shift = rng.randint(0, 255)
+        channel = gradient.rotate(rng.choice((0, 90, 180, 270)))
+        channels.append(channel.point(lambda value, shift=shift: (value + shift) % 256))
+
+    image = Image.blend(Image.merge("RGB", channels), Image.effect_noise((size, size), 48).convert("RGB"), 0.15)
+
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=90)
+
+    return output.getvalue()
+
+
+def write_synthetic_mp3(
+        path: Path,
+        seconds: float,
+        title: str | None = None,
+        artist: str | None = None,
+        cover_size: int | None = None,
+        seed: int = 0,
+) -> Path:
+    """
+    Write a synthetic MP3 file.
+
+    Args:
+        path (Path): Destination file.
+        seconds (float): Duration of the track; the file holds 16 KB per second.
+        title (str | None): TIT2 tag, if any.
+        artist (str | None): TPE1 tag, if any.
+        cover_size (int | None): Side of the embedded JPEG cover in pixels; no cover if None.
+        seed (int): Seed of the frame payloads and cover colours.
+
+    Returns:
+        Path: The written file.
+    """
+    from mutagen.id3 import ID3, APIC, TIT2, TPE1
+
+    rng = random.Random(seed)
+    frame_count = max(int(seconds * FRAMES_PER_SECOND), 1)
+    payload_size = FRAME_SIZE - len(FRAME_HEADER)
+
+    with open(path, "wb") as file:
+        for batch_start in range(0, frame_count, 1024):
+            batch = min(1024, frame_count - batch_start)
+            payloads = rng.randbytes(batch * payload_size)
+            file.write(b"".join(
+                FRAME_HEADER + payloads[index * payload_size:(index + 1) * payload_size]
+                for index in range(batch)
+            ))
+
+    tags = ID3()
+    if title:
+        tags.add(TIT2(encoding=3, text=title))
+
+    if artist:
+        tags.add(TPE1(encoding=3, text=artist))
+
+    if cover_size:
+        tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="Cover", data=make_cover(cover_size, seed)))
+
+    tags.save(str(path))
+
+    return path
+
+
+def generate_library(
+        directory: Path,
+        tracks: int,
+        seconds: float = 180.0,
+        cover_ratio: float = 0.5,
+        cover_size: int = 600,
+        seed: int = 0,
+) -> list[Path]:
+    """
+    Write a library of synthetic tracks, reusing files a previous call already wrote.
+
+    Args:
+        directory (Path): Destination directory, created if missing.
+        tracks (int): Number of files.
+        seconds (float): Duration of each track.
+        cover_ratio (float): Share of the files embedding a cover, 0 to 1.
+        cover_size (int): Side of the covers in pixels.
+        seed (int): Seed of the tags, payloads and covers.
+
+    Returns:
+        list[Path]: The files, in order.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+
+    for index in range(tracks):
+        title = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 4)))
+        artist = f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS).capitalize()}"
+        has_cover = rng.random() < cover_ratio
+        path = directory / f"{index:06d}{'-cover' if has_cover else ''}.mp3"
+
+        if not path.exists():
+            write_synthetic_mp3(path, seconds, title, artist, cover_size if has_cover else None, seed * 1_000_003 + index)
+
+        paths.append(path)
+
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", type=Path, help="Directory to write the library to.")
+    parser.add_argument("--tracks", type=int, default=1000, help="Number of tracks.")
+    parser.add_argument("--seconds", type=float, default=180.0, help="Duration of each track.")
+    parser.add_argument("--cover-ratio", type=float, default=0.5, help="Share of tracks embedding a cover.")
+    parser.add_argument("--cover-size", type=int, default=600, help="Side of the covers in pixels.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generator.")
+    args = parser.parse_args()
+
+    paths = generate_library(args.directory, args.tracks, args.seconds, args.cover_ratio, args.cover_size, args.seed)
+
+    print(json.dumps({
+        "directory": str(args.directory),
+        "tracks": len(paths),
+        "with_cover": sum(path.stem.endswith("-cover") for path in paths),
+        "total_mb": round(sum(path.stat().st_size for path in paths) / (1024 * 1024), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Measure `GET /api/v1/tracks` latency at increasing page depths.
+
+Requests go through the whole application (middleware, routing, the async
+database session and JSON encoding) in process, over httpx's ASGI transport,
+so the numbers exclude the network and the HTTP parser but nothing else.
+
+Modes:
+    - offset: `?offset=<depth>`, whose cost grows with the depth on every dialect.
+    - cursor: `?cursor=<cursor of the row at depth>`, keyset pagination.
+
+The encoded page cache is disabled (`TRACK_LIST_CACHE_SIZE=0`) unless `--cache`
+is passed, so every request reaches the database. `--accept application/msgpack`
+measures the MessagePack encoding instead of JSON. `cpu_ms` is the process CPU
+time per request, database driver threads included.
+
+Usage:
+    python -m benchmarks.list_latency --tracks 100000 --depths 0,1000,10000,90000 --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from .common import percentile, populate_tracks, setup_environment
+
+
+def get_cursors(depths: list[int]) -> dict[int, str]:
+    """
+    Returns:
+        dict[int, str]: For every depth, the cursor of the page starting at that row (empty for the first page).
+    """
+    from database.config import SessionLocal
+    from service.music_track import select_music_track_list
+    from service.music_track.pagination import encode_cursor
+
+    cursors = {}
+
+    with SessionLocal() as db:
+        for depth in depths:
+            if depth == 0:
+                cursors[depth] = ""
+                continue
+
+            music_track = db.execute(select_music_track_list(offset=depth - 1, limit=0)).first()
+            cursors[depth] = encode_cursor(music_track)
+
+    return cursors
+
+
+async def measure(
+        mode: str, depth: int, cursor: str, requests: int, limit: int, with_total: bool, accept: str,
+) -> dict:
+    import httpx
+
+    from api.app import app
+
+    params = {"limit": limit, "with_total": str(with_total).lower()}
+    if mode == "cursor":
+        params["cursor"] = cursor
+
+    else:
+        params["offset"] = depth
+
+    latencies = []
+    headers = {"accept": accept}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers,
+    ) as client:
+        # Warm up: imports, connection pool, statement caches.
+        for _ in range(3):
+            (await client.get("/api/v1/tracks", params=params)).raise_for_status()
+
+        cpu_started = time.process_time()
+
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await client.get("/api/v1/tracks", params=params)
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+        cpu = time.process_time() - cpu_started
+
+    return {
+        "mode": mode,
+        "depth": depth,
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "cpu_ms": round(cpu * 1000 / requests, 3),
+        "bytes": len(response.content),
+    }
+
+
+async def run(args: argparse.Namespace, depths: list[int], cursors: dict[int, str]) -> list[dict]:
+    from database.config import async_engine
+
+    results = []
+
+    try:
+        for mode in args.modes.split(","):
+            for depth in depths:
+                results.append({
+                    "tracks": args.tracks,
+                    "limit": args.limit,
+                    "accept": args.accept,
+                    **await measure(
+                        mode, depth, cursors[depth], args.requests, args.limit, args.with_total, args.accept,
+                    ),
+                })
+
+    finally:
+        await async_engine.dispose()
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=100_000, help="Number of tracks in the catalog.")
+    parser.add_argument("--depths", default="0,1000,10000,90000", help="Comma-separated list of page offsets.")
+    parser.add_argument("--requests", type=int, default=200, help="Number of requests per mode and depth.")
+    parser.add_argument("--limit", type=int, default=100, help="Tracks per page.")
+    parser.add_argument("--modes", default="offset,cursor", help="Comma-separated list of modes to run.")
+    parser.add_argument("--with-total", action="store_true", help="Ask for the total track count too.")
+    parser.add_argument("--cache", action="store_true", help="Keep the encoded page cache enabled.")
+    parser.add_argument("--accept", default="application/json", help="Accept header of the requests.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the catalog generator.")
+    args = parser.parse_args()
+
+    if not args.cache:
+        os.environ["TRACK_LIST_CACHE_SIZE"] = "0"
+
+    setup_environment()
+    populate_tracks(args.tracks, args.seed)
+
+    depths = sorted({min(int(depth), max(args.tracks - args.limit, 0)) for depth in args.depths.split(",")})
+    results = asyncio.run(run(args, depths, get_cursors(depths)))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measure how many files per second `MusicTrackMetadata` reads.
+
+The files come from a synthetic library (see `benchmarks.library`) and are
+split by whether they embed a cover, since reading a large APIC frame is most
+of the cost of a tagged file:
+    - tags: title and artist only.
+    - cover: title, artist and a JPEG cover of `--cover-size` pixels.
+
+`--analyze` also runs the loudness and waveform analysis, as ingestion does;
+it needs ffmpeg, and decodes nothing from the synthetic frames.
+
+Usage:
+    python -m benchmarks.metadata_throughput --files 500 --seconds 240 --cover-size 1000
+"""
+
+from pathlib import Path
+import argparse
+import json
+import statistics
+import time
+
+from .common import Timer, percentile, setup_environment
+from .library import generate_library
+
+
+def read_files(paths: list[Path], analyze_audio: bool) -> dict:
+    from service.music_track.metadata import MusicTrackMetadata
+
+    durations = []
+
+    with Timer() as timer:
+        for path in paths:
+            started = time.perf_counter()
+            MusicTrackMetadata(path, analyze_audio=analyze_audio)
+            durations.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "files": len(paths),
+        "files_per_s": round(len(paths) / timer.wall, 1),
+        "p50_ms": round(percentile(durations, 0.50), 3),
+        "p95_ms": round(percentile(durations, 0.95), 3),
+        "mean_ms": round(statistics.fmean(durations), 3),
+        "cpu_ms_per_file": round(timer.cpu * 1000 / len(paths), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500, help="Number of files per kind.")
+    parser.add_argument("--seconds", type=float, default=240.0, help="Duration of each track.")
+    parser.add_argument("--cover-size", type=int, default=1000, help="Side of the covers in pixels.")
+    parser.add_argument("--analyze", action="store_true", help="Run the audio analysis too.")
+    args = parser.parse_args()
+
+    dir_data = setup_environment()
+
+    # Loads the application modules, so their import isn't timed with the first file.
+    import service.music_track.metadata  # noqa: F401
+
+    results = []
+
+    for kind, cover_ratio in (("tags", 0.0), ("cover", 1.0)):
+        paths = generate_library(
+            dir_data / "library" / kind,
+            args.files,
+            seconds=args.seconds,
+            cover_ratio=cover_ratio,
+            cover_size=args.cover_size,
+        )
+        results.append({"kind": kind, "analyze": args.analyze, **read_files(paths, args.analyze)})
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
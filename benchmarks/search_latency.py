@@ -0,0 +1,85 @@
+"""
+Measure track search latency on a synthetic catalog.
+
+The catalog is created with the Alembic migrations, so the search index is the
+one production gets for the dialect (FTS5 on the default SQLite database). Each
+backend is then queried with random one- and two-word prefix queries.
+
+Backends:
+    - index: the dialect's full-text index (`fts5` or `fulltext`).
+    - like: the unindexed LIKE fallback, for comparison.
+
+Usage:
+    python -m benchmarks.search_latency --tracks 100000 --queries 2000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from .common import WORDS, percentile, populate_tracks, setup_environment
+
+
+def random_query(rng: random.Random) -> str:
+    words = rng.sample(WORDS, rng.randint(1, 2))
+    return " ".join(word[:rng.randint(2, len(word))] for word in words)
+
+
+def run_queries(backend: str, queries: list[str], limit: int) -> dict:
+    from database.config import SessionLocal, engine
+    from service.music_track import search as search_module
+
+    key = engine.url.render_as_string(hide_password=True)
+    search_module.search_backends.pop(key, None)
+
+    with SessionLocal() as db:
+        if backend == "like":
+            # Probed "in the future", so it isn't re-probed during the run.
+            search_module.search_backends[key] = ("like", float("inf"))
+
+        resolved_backend = search_module.get_search_backend(db)
+        latencies = []
+        results = 0
+
+        for query in queries:
+            started = time.perf_counter()
+            results += len(search_module.search_music_tracks(db, query, limit=limit))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "backend": resolved_backend,
+        "queries": len(queries),
+        "mean_results": round(results / len(queries), 1),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=100_000, help="Number of tracks in the catalog.")
+    parser.add_argument("--queries", type=int, default=2000, help="Number of queries per backend.")
+    parser.add_argument("--limit", type=int, default=20, help="Results per query.")
+    parser.add_argument("--backends", default="index,like", help="Comma-separated list of backends to run.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the catalog and query generator.")
+    args = parser.parse_args()
+
+    setup_environment()
+    populate_tracks(args.tracks, args.seed)
+
+    rng = random.Random(args.seed + 1)
+    queries = [random_query(rng) for _ in range(args.queries)]
+    results = [
+        {"tracks": args.tracks, **run_queries(backend, queries, args.limit)}
+        for backend in args.backends.split(",")
+    ]
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measure the cold start of an API worker.
+
+Every phase starts a new Python process, `--runs` times, and reports the
+median and fastest wall-clock time:
+    - import_models: `import database.models`, what Alembic and CLI tools pay.
+    - import_app: `import api.app`, what every worker pays before serving.
+    - first_response: a uvicorn worker started until it answers `GET /`, lifespan
+      startup (table creation, ingestion worker) included.
+
+`--no-create-all` starts the server with `DATABASE_CREATE_ALL=false`, as the
+Docker entrypoint does once Alembic has migrated the database.
+
+Usage:
+    python -m benchmarks.startup --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from .common import populate_tracks, setup_environment
+from .db_load import free_port
+
+
+def time_import(module: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True, env=os.environ.copy())
+
+    return time.perf_counter() - started
+
+
+def time_first_response() -> float:
+    import httpx
+
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "api.app:app",
+            "--port", str(port), "--log-level", "warning", "--no-access-log",
+        ],
+        env=os.environ.copy(),
+    )
+
+    try:
+        with httpx.Client() as client:
+            while True:
+                try:
+                    client.get(f"http://127.0.0.1:{port}/").raise_for_status()
+                    return time.perf_counter() - started
+
+                except httpx.TransportError:
+                    if server.poll() is not None:
+                        raise RuntimeError(f"The server exited with status {server.returncode}")
+
+                    time.sleep(0.01)
+
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def measure(phase: str, runs: int) -> dict:
+    if phase == "import_models":
+        durations = [time_import("database.models") for _ in range(runs)]
+
+    elif phase == "import_app":
+        durations = [time_import("api.app") for _ in range(runs)]
+
+    else:
+        durations = [time_first_response() for _ in range(runs)]
+
+    return {
+        "phase": phase,
+        "runs": runs,
+        "median_ms": round(statistics.median(durations) * 1000, 1),
+        "min_ms": round(min(durations) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Number of processes started per phase.")
+    parser.add_argument(
+        "--phases",
+        default="import_models,import_app,first_response",
+        help="Comma-separated list of phases to run.",
+    )
+    parser.add_argument("--no-create-all", action="store_true", help="Don't create tables on startup.")
+    args = parser.parse_args()
+
+    setup_environment()
+    populate_tracks(0)
+
+    if args.no_create_all:
+        os.environ["DATABASE_CREATE_ALL"] = "false"
+
+    results = [
+        {"create_all": not args.no_create_all, **measure(phase, args.runs)}
+        for phase in args.phases.split(",")
+    ]
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
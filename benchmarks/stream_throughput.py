@@ -0,0 +1,140 @@
+"""
+Compare throughput and CPU cost per stream of the track streaming strategies.
+
+Strategies:
+    - iter_file: `StreamingResponse` over the `api.routers.utils.iter_file` generator.
+    - buffered: `FileRangeResponse` without server support for zero-copy send.
+    - zerocopy: `FileRangeResponse` against a server stub that implements
+      `http.response.zerocopysend` with `os.sendfile` into /dev/null.
+
+With `--range-kb`, every stream answers a Range request for a random window of
+that size instead of the whole file, as players seeking through a track send.
+
+Usage:
+    python -m benchmarks.stream_throughput --size-mb 5 --streams 200
+    python -m benchmarks.stream_throughput --size-mb 5 --streams 200 --range-kb 256
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import random
+
+from .common import setup_environment, write_random_file, Timer
+
+
+def make_send(sink_fd: int):
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.zerocopysend":
+            offset, count = message["offset"], message["count"]
+            while count:
+                sent = os.sendfile(sink_fd, message["file"], offset, count)
+                if sent == 0:
+                    break
+
+                offset += sent
+                count -= sent
+
+        elif message["type"] == "http.response.body":
+            os.write(sink_fd, message["body"])
+
+    return send
+
+
+async def receive() -> dict:
+    # A client that stays connected: `StreamingResponse` listens for a disconnect
+    # while streaming and would stop at once if one came in.
+    await asyncio.Event().wait()
+
+
+def build_response(strategy: str, path: Path, size: int, start: int = 0, end: int | None = None):
+    from fastapi.responses import StreamingResponse
+
+    from api.responses import FileRangeResponse
+    from api.routers.utils import iter_file
+
+    end = size if end is None else end
+    status_code = 206 if (start, end) != (0, size) else 200
+
+    if strategy == "iter_file":
+        return StreamingResponse(iter_file(path, start, end), status_code=status_code, media_type="audio/mpeg")
+
+    return FileRangeResponse(
+        path, file_size=size, start=start, end=end, status_code=status_code, media_type="audio/mpeg",
+    )
+
+
+def get_ranges(size: int, streams: int, range_size: int | None, seed: int = 0) -> list[tuple[int, int]]:
+    """
+    Returns:
+        list[tuple[int, int]]: The `[start, end)` byte range of every stream; the whole file without `range_size`.
+    """
+    if not range_size or range_size >= size:
+        return [(0, size)] * streams
+
+    rng = random.Random(seed)
+    starts = (rng.randrange(0, size - range_size) for _ in range(streams))
+
+    return [(start, start + range_size) for start in starts]
+
+
+async def run_streams(strategy: str, path: Path, size: int, ranges: list[tuple[int, int]], sink_fd: int) -> None:
+    extensions = {"http.response.zerocopysend": {}} if strategy == "zerocopy" else {}
+    scope = {"type": "http", "method": "GET", "headers": [], "extensions": extensions}
+    send = make_send(sink_fd)
+
+    await asyncio.gather(*(
+        build_response(strategy, path, size, start, end)(scope, receive, send)
+        for start, end in ranges
+    ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=5.0, help="Size of the streamed file in MiB.")
+    parser.add_argument("--streams", type=int, default=50, help="Number of concurrent streams.")
+    parser.add_argument(
+        "--strategies",
+        default="iter_file,buffered,zerocopy",
+        help="Comma-separated list of strategies to run.",
+    )
+    parser.add_argument("--range-kb", type=int, default=None, help="Stream random ranges of this size (KiB).")
+    args = parser.parse_args()
+
+    dir_data = setup_environment()
+    size = int(args.size_mb * 1024 * 1024)
+    path = write_random_file(dir_data / "music" / "bench.mp3", size)
+    ranges = get_ranges(size, args.streams, args.range_kb * 1024 if args.range_kb else None)
+    streamed_size = sum(end - start for start, end in ranges)
+    sink_fd = os.open(os.devnull, os.O_WRONLY)
+    results = []
+
+    # Loads the application modules, so their import isn't timed with the first strategy.
+    build_response("buffered", path, size)
+
+    try:
+        for strategy in args.strategies.split(","):
+            with Timer() as timer:
+                asyncio.run(run_streams(strategy, path, size, ranges, sink_fd))
+
+            total_mb = streamed_size / (1024 * 1024)
+            results.append({
+                "strategy": strategy,
+                "streams": args.streams,
+                "file_mb": round(size / (1024 * 1024), 2),
+                "range_kb": args.range_kb,
+                "wall_s": round(timer.wall, 4),
+                "throughput_mb_s": round(total_mb / timer.wall, 1),
+                "cpu_ms_per_stream": round(timer.cpu * 1000 / args.streams, 3),
+            })
+
+    finally:
+        os.close(sink_fd)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Measure the time and memory of uploading and storing tracks.
+
+Operations:
+    - endpoint: `POST /api/v1/tracks/` with a multipart body, through the whole
+      application over httpx's ASGI transport: parsing, hashing, staging and
+      queueing the ingestion job (the ingestion itself is not started).
+    - save_music_track: the synchronous store of an already received file:
+      tags, embedded cover thumbnails, loudness analysis (with ffmpeg) and the
+      Track row.
+
+Both run over a synthetic library (see `benchmarks.library`) in which
+`--cover-ratio` of the files embed a cover. Timings come from a first pass;
+peak Python heap use per operation from a second pass over a few files under
+`tracemalloc`, which would otherwise slow the timed pass down.
+
+Usage:
+    python -m benchmarks.upload --files 50 --seconds 240 --cover-ratio 0.5
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import time
+import tracemalloc
+
+from .common import percentile, populate_tracks, setup_environment
+from .library import generate_library
+
+
+async def upload_files(paths: list[Path]) -> list[tuple[float, float]]:
+    import httpx
+
+    from api.app import app
+
+    durations = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for path in paths:
+            started, started_cpu = time.perf_counter(), time.process_time()
+
+            with open(path, "rb") as file:
+                response = await client.post(
+                    "/api/v1/tracks/",
+                    files={"music_track_file": (path.name, file, "audio/mpeg")},
+                )
+
+            durations.append((time.perf_counter() - started, time.process_time() - started_cpu))
+            response.raise_for_status()
+
+    return durations
+
+
+async def receive_file(path: Path):
+    """
+    Returns:
+        StreamedFile: `path` copied into `DIR_MUSIC` the way the upload endpoint receives it.
+    """
+    from common.constants import DIR_MUSIC, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_SIZE
+    from service.music_track.storage import StreamedFile
+
+    music_track_file = StreamedFile(DIR_MUSIC, max_size=UPLOAD_MAX_SIZE)
+
+    with open(path, "rb") as file:
+        while chunk := file.read(UPLOAD_CHUNK_SIZE):
+            await music_track_file.write(chunk)
+
+    await music_track_file.close()
+
+    return music_track_file
+
+
+def save_files(paths: list[Path]) -> list[tuple[float, float]]:
+    from database.config import SessionLocal
+    from service.music_track import save_music_track
+
+    durations = []
+
+    with SessionLocal() as db:
+        for path in paths:
+            music_track_file = asyncio.run(receive_file(path))
+
+            started, started_cpu = time.perf_counter(), time.process_time()
+            save_music_track(db, music_track_file)
+            durations.append((time.perf_counter() - started, time.process_time() - started_cpu))
+
+    return durations
+
+
+def run_operation(operation: str, paths: list[Path]) -> list[tuple[float, float]]:
+    """
+    Returns:
+        list[tuple[float, float]]: Wall-clock and CPU seconds of every file.
+    """
+    if operation == "endpoint":
+        return asyncio.run(upload_files(paths))
+
+    return save_files(paths)
+
+
+def measure(operation: str, paths: list[Path], memory_paths: list[Path]) -> dict:
+    durations, cpu_durations = zip(*run_operation(operation, paths))
+
+    peaks = []
+    for path in memory_paths:
+        tracemalloc.start()
+        run_operation(operation, [path])
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    total_mb = sum(path.stat().st_size for path in paths) / (1024 * 1024)
+
+    return {
+        "operation": operation,
+        "files": len(paths),
+        "file_mb": round(total_mb / len(paths), 2),
+        "p50_ms": round(percentile(durations, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(durations, 0.95) * 1000, 2),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 2),
+        "throughput_mb_s": round(total_mb / sum(durations), 1),
+        "cpu_ms_per_file": round(statistics.fmean(cpu_durations) * 1000, 2),
+        "peak_heap_mb": round(max(peaks) / (1024 * 1024), 2) if peaks else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=50, help="Number of files per operation.")
+    parser.add_argument("--seconds", type=float, default=240.0, help="Duration of each track (16 KB per second).")
+    parser.add_argument("--cover-ratio", type=float, default=0.5, help="Share of files embedding a cover.")
+    parser.add_argument("--cover-size", type=int, default=1000, help="Side of the covers in pixels.")
+    parser.add_argument("--memory-files", type=int, default=3, help="Files measured under tracemalloc.")
+    parser.add_argument(
+        "--operations",
+        default="endpoint,save_music_track",
+        help="Comma-separated list of operations to run.",
+    )
+    args = parser.parse_args()
+
+    dir_data = setup_environment()
+    populate_tracks(0)
+    results = []
+
+    # Loads the application, so its import isn't timed with the first upload.
+    import api.app  # noqa: F401
+
+    for seed, operation in enumerate(args.operations.split(",")):
+        # A library per operation: files stored by an earlier one would be deduplicated.
+        paths = generate_library(
+            dir_data / "library" / operation,
+            args.files + args.memory_files,
+            seconds=args.seconds,
+            cover_ratio=args.cover_ratio,
+            cover_size=args.cover_size,
+            seed=seed,
+        )
+        results.append(measure(operation, paths[:args.files], paths[args.files:]))
+
+    # Resident set size high-water mark of the whole run.
+    for result in results:
+        result["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+
+from anyio import to_thread
+
+
+T = TypeVar("T")
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with an optional time-to-live.
+
+    Endpoints run in a thread pool, so every operation takes a lock.
+
+    Attributes:
+        maxsize (int): Maximum number of entries; the least recently used one is evicted first.
+        ttl (float | None): Seconds an entry stays valid, or None to keep it until evicted.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that were not.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for `key`, or `default` if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or (self.ttl is not None and entry[0] <= time.monotonic()):
+                if entry is not None:
+                    del self._entries[key]
+
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheBackend:
+    """
+    Storage for pre-encoded responses, plus version counters used to invalidate them.
+
+    Cache keys embed the current version of the data they were built from, so
+    bumping the version makes every older entry unreachable at once.
+
+    Async code calls the `_async` variants: for backends whose methods do I/O
+    (`blocking`), they run in a worker thread instead of on the event loop.
+    """
+
+    blocking = False
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.blocking:
+            return await to_thread.run_sync(func, *args)
+
+        return func(*args)
+
+    async def get_async(self, key: str) -> bytes | None:
+        return await self.run(self.get, key)
+
+    async def set_async(self, key: str, value: bytes) -> None:
+        await self.run(self.set, key, value)
+
+    async def get_version_async(self, name: str) -> str:
+        return await self.run(self.get_version, name)
+
+    def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    def get_version(self, name: str) -> str:
+        raise NotImplementedError
+
+    def bump_version(self, name: str) -> str:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Per-process backend. Versions bumped by other processes are not seen, so
+    entries also expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.entries = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._versions: dict[str, int] = {}
+        self._lock = Lock()
+
+    @property
+    def hits(self) -> int:
+        return self.entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self.entries.misses
+
+    def get(self, key: str) -> bytes | None:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.entries.set(key, value)
+
+    def get_version(self, name: str) -> str:
+        return str(self._versions.get(name, 0))
+
+    def bump_version(self, name: str) -> str:
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            self.entries.clear()
+            return str(self._versions[name])
+
+
+class FileCacheBackend(CacheBackend):
+    """
+    Backend shared by every process using the same directory, e.g. several API
+    workers on one host. It stands in for a networked cache such as Redis, which
+    would implement the same four methods.
+
+    Versions are random tokens rather than counters, so concurrent bumps never
+    need a read-modify-write.
+    """
+
+    blocking = True
+
+    def __init__(self, directory: Path, ttl: float | None = None):
+        self.directory = directory
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.entry"
+
+    def _write_atomic(self, path: Path, value: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        temporary_path.write_bytes(value)
+        os.replace(temporary_path, path)
+
+    def get(self, key: str) -> bytes | None:
+        path = self._entry_path(key)
+
+        try:
+            if self.ttl is not None and path.stat().st_mtime + self.ttl <= time.time():
+                path.unlink(missing_ok=True)
+                raise FileNotFoundError
+
+            value = path.read_bytes()
+
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._write_atomic(self._entry_path(key), value)
+
+    def get_version(self, name: str) -> str:
+        try:
+            return (self.directory / f"{name}.version").read_text()
+
+        except FileNotFoundError:
+            return "0"
+
+    def bump_version(self, name: str) -> str:
+        version = uuid.uuid4().hex
+        self._write_atomic(self.directory / f"{name}.version", version.encode())
+
+        # Entries of older versions are unreachable now; reclaim their space.
+        for path in self.directory.glob("*.entry"):
+            path.unlink(missing_ok=True)
+
+        return version
+
+
+class DiskLRUCache:
+    """
+    Directory of derived files bounded to `max_bytes`, evicting the least recently used.
+
+    Callers write a file at `path(name)` and register it with `add`. Recency is
+    kept in memory and persisted as the files' mtimes, so a restart resumes with
+    roughly the same order. Processes sharing the directory may evict each other's
+    files; `get` then reports a miss.
+
+    Attributes:
+        directory (Path): Where the files live; created on first write.
+        max_bytes (int): Total size above which files are evicted.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that were not.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._sizes: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+        self._lock = Lock()
+
+    def _load(self) -> OrderedDict[str, int]:
+        # Caller holds the lock.
+        if self._sizes is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat_result = entry.stat()
+                    entries.append((stat_result.st_mtime, entry.name, stat_result.st_size))
+
+            self._sizes = OrderedDict((name, size) for _, name, size in sorted(entries))
+            self._total_bytes = sum(self._sizes.values())
+
+        return self._sizes
+
+    def path(self, name: str) -> Path:
+        return self.directory / name
+
+    def get(self, name: str) -> Path | None:
+        """
+        Returns the path of the cached file `name`, marking it as recently used, or None.
+        """
+        with self._lock:
+            sizes = self._load()
+
+            if name in sizes:
+                try:
+                    os.utime(self.path(name))
+
+                except FileNotFoundError:
+                    self._total_bytes -= sizes.pop(name)
+
+                else:
+                    sizes.move_to_end(name)
+                    self.hits += 1
+                    return self.path(name)
+
+            self.misses += 1
+            return None
+
+    def add(self, name: str) -> None:
+        """
+        Registers the file just written at `path(name)`, evicting older files to make room.
+        """
+        size = self.path(name).stat().st_size
+
+        with self._lock:
+            sizes = self._load()
+            self._total_bytes += size - sizes.pop(name, 0)
+            sizes[name] = size
+
+            while self._total_bytes > self.max_bytes and len(sizes) > 1:
+                evicted_name, evicted_size = sizes.popitem(last=False)
+                self.path(evicted_name).unlink(missing_ok=True)
+                self._total_bytes -= evicted_size
+
+    def discard_prefix(self, prefix: str) -> int:
+        """
+        Removes every file whose name starts with `prefix`, including files other
+        processes sharing the directory wrote; call when their source goes away.
+
+        Returns:
+            int: The number of files removed.
+        """
+        with self._lock:
+            sizes = self._load()
+            names = [entry.name for entry in os.scandir(self.directory) if entry.name.startswith(prefix)]
+
+            for name in names:
+                self.path(name).unlink(missing_ok=True)
+                self._total_bytes -= sizes.pop(name, 0)
+
+            return len(names)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one.
+
+    While a call for a key is running, later callers await its result instead of
+    starting their own, so a burst of requests for one missing cache entry does
+    the work once. A caller that is cancelled does not cancel the shared call.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        return await asyncio.shield(future)
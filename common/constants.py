@@ -26,16 +26,111 @@ else:
 DIR_DATA = env_loader.load("DIR_DATA", Path)
 DIR_MUSIC = DIR_DATA / "music"
 DIR_MUSIC_COVER = DIR_DATA / "music_cover"
+DIR_MUSIC_VARIANT = DIR_DATA / "music_variant"
+DIR_MUSIC_HLS = DIR_DATA / "music_hls"
+DIR_INGEST = DIR_DATA / "ingest"
+DIR_CACHE = DIR_DATA / "cache"
+DIR_MUSIC_COVER_CACHE = DIR_CACHE / "music_cover"
 DIR_STATIC = BASE_DIR / "static"
 
 # url
 URL_MUSIC = "music_tracks/"
 URL_MUSIC_COVER = "music_track_covers/"
+URL_MUSIC_HLS = "music_track_hls/"
 URL_MUSIC_STREAM = "api/v1/tracks/"
+URL_INGEST_JOB = "api/v1/jobs/"
 
 # database
 DATABASE_URL = env_loader.load("DATABASE_URL", str)
 DATABASE_LOG: bool = env_loader.load("DATABASE_LOG", bool)
+# Async driver URL; derived from DATABASE_URL (pymysql -> aiomysql, sqlite -> aiosqlite) when unset.
+DATABASE_ASYNC_URL = os.getenv("DATABASE_ASYNC_URL") or (
+    DATABASE_URL
+    .replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+    .replace("sqlite://", "sqlite+aiosqlite://", 1)
+)
+# Connection pool of each engine (sync and async). Not applied to SQLite.
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 10))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", 20))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", 30.0))
+# Seconds after which a connection is replaced; keep below MySQL's wait_timeout.
+DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", 1800))
+DATABASE_POOL_PRE_PING = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Create missing tables on application startup. Disable where Alembic migrates the
+# schema before the server starts, so workers don't inspect it on every start.
+DATABASE_CREATE_ALL = os.getenv("DATABASE_CREATE_ALL", "true").lower() in ("1", "true", "yes")
+
+# upload
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", 512 * 1024 * 1024))
+UPLOAD_COVER_MAX_SIZE = int(os.getenv("UPLOAD_COVER_MAX_SIZE", 16 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# ingest
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", max((os.cpu_count() or 2) // 2, 1)))
+INGEST_POLL_INTERVAL = float(os.getenv("INGEST_POLL_INTERVAL", 2.0))
+
+# track list
+# Seconds the total track count may be served from cache. It is kept with the
+# library version, so changes seen by the list cache invalidate it at once; the
+# TTL bounds staleness from other processes with the "memory" backend.
+TRACK_COUNT_CACHE_TTL = float(os.getenv("TRACK_COUNT_CACHE_TTL", 30.0))
+# Encoded list pages. "memory" caches per process; "file" shares pages and the
+# library version between processes through DIR_CACHE. `main.py` picks "file"
+# when it starts several workers and this is not set.
+TRACK_LIST_CACHE_BACKEND = os.getenv("TRACK_LIST_CACHE_BACKEND", "memory")
+TRACK_LIST_CACHE_SIZE = int(os.getenv("TRACK_LIST_CACHE_SIZE", 1024))
+TRACK_LIST_CACHE_TTL = float(os.getenv("TRACK_LIST_CACHE_TTL", 60.0))
+
+# track stream
+# Resolved file details of recently streamed tracks, so range requests skip the database.
+TRACK_FILE_CACHE_SIZE = int(os.getenv("TRACK_FILE_CACHE_SIZE", 4096))
+TRACK_FILE_CACHE_TTL = float(os.getenv("TRACK_FILE_CACHE_TTL", 300.0))
+
+# transcoding
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFMPEG_TIMEOUT = float(os.getenv("FFMPEG_TIMEOUT", 600.0))
+# Seconds without progress after which a processing ingest job is requeued. A job
+# reports progress between ffmpeg runs, so the longest silent stretch is one run
+# (bounded by FFMPEG_TIMEOUT) plus the CPU work around it.
+INGEST_JOB_TIMEOUT = float(os.getenv("INGEST_JOB_TIMEOUT", 2 * FFMPEG_TIMEOUT))
+# Lower-bitrate variants made at ingestion, as "<quality>:<kbps>" pairs; empty disables them.
+TRACK_VARIANT_QUALITIES: dict[str, int] = {
+    quality: int(bitrate)
+    for quality, _, bitrate in (
+        item.strip().partition(":") for item in os.getenv("TRACK_VARIANT_QUALITIES", "low:64,medium:128").split(",")
+    )
+    if quality
+}
+# Codecs of every variant, in order of preference when the client has none.
+TRACK_VARIANT_CODECS = tuple(
+    codec.strip() for codec in os.getenv("TRACK_VARIANT_CODECS", "opus,aac").split(",") if codec.strip()
+)
+
+# Cover thumbnail sizes (longest side, px) rendered at ingestion, as WebP and JPEG.
+TRACK_COVER_SIZES = tuple(sorted(
+    (int(size) for size in os.getenv("TRACK_COVER_SIZES", "64,256,1024").split(",") if size.strip()),
+    reverse=True,
+))
+TRACK_COVER_QUALITY = int(os.getenv("TRACK_COVER_QUALITY", 75))
+# Covers resized on request (`/music_track_covers/<id>?w=`), kept in a disk LRU.
+TRACK_COVER_MAX_WIDTH = int(os.getenv("TRACK_COVER_MAX_WIDTH", 2048))
+TRACK_COVER_CACHE_MAX_BYTES = int(os.getenv("TRACK_COVER_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+TRACK_COVER_RESIZE_WORKERS = int(os.getenv("TRACK_COVER_RESIZE_WORKERS", 2))
+
+# Acoustic fingerprints: seconds decoded per track, and the bit error rate under
+# which two fingerprints are the same recording.
+FINGERPRINT_MAX_SECONDS = int(os.getenv("FINGERPRINT_MAX_SECONDS", 120))
+FINGERPRINT_MATCH_BER = float(os.getenv("FINGERPRINT_MATCH_BER", 0.35))
+
+# Audio analysis: peak buckets of the waveform preview, and the loudness (LUFS)
+# ReplayGain values normalize to (-18 is ReplayGain 2.0's reference).
+WAVEFORM_BUCKETS = int(os.getenv("WAVEFORM_BUCKETS", 1000))
+LOUDNESS_REFERENCE = float(os.getenv("LOUDNESS_REFERENCE", -18.0))
+
+# HLS: fixed-length AAC segments plus a VOD playlist per track, made at ingestion.
+HLS_ENABLED = os.getenv("HLS_ENABLED", "false").lower() in ("1", "true", "yes")
+HLS_SEGMENT_DURATION = int(os.getenv("HLS_SEGMENT_DURATION", 6))
+HLS_BITRATE = int(os.getenv("HLS_BITRATE", 128))
 
 # api
 API_ALLOW_HOSTS = env_loader.load("API_ALLOW_HOSTS", tuple)
@@ -43,6 +138,31 @@ API_CORS_ALLOW_ORIGINS = env_loader.load("API_CORS_ALLOW_ORIGINS", tuple)
 API_CORS_ALLOW_METHODS = env_loader.load("API_CORS_ALLOW_METHODS", tuple)
 API_CORS_ALLOW_CREDENTIALS = env_loader.load("API_CORS_ALLOW_CREDENTIALS", bool)
 
+# server
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", 8000))
+# A single process reloading on code changes, for development. Otherwise the
+# production server below: `SERVER_WORKERS` processes sharing the port.
+SERVER_RELOAD = os.getenv("SERVER_RELOAD", str(ENV_MODE == "dev")).lower() in ("1", "true", "yes")
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", os.cpu_count() or 1))
+# Event loop and HTTP parser: "auto" picks uvloop and httptools when installed.
+SERVER_LOOP = os.getenv("SERVER_LOOP", "auto")
+SERVER_HTTP = os.getenv("SERVER_HTTP", "auto")
+# Pending connections the kernel queues per listening socket (capped by net.core.somaxconn).
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", 2048))
+# Idle keep-alive connections are closed after this many seconds; keep it above
+# the idle timeout of the load balancer in front (60 s on most), so it closes first.
+SERVER_KEEP_ALIVE_TIMEOUT = int(os.getenv("SERVER_KEEP_ALIVE_TIMEOUT", 65))
+# On SIGTERM, seconds given to requests in flight (audio streams included) to
+# finish before they are cancelled. Give the container at least as long to stop.
+SERVER_GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_SHUTDOWN_TIMEOUT", 30))
+# Connections per worker past which new requests get a 503; 0 for no limit.
+SERVER_LIMIT_CONCURRENCY = int(os.getenv("SERVER_LIMIT_CONCURRENCY", 0))
+SERVER_ACCESS_LOG = os.getenv("SERVER_ACCESS_LOG", "true").lower() in ("1", "true", "yes")
+
+# metrics: request, database and ingestion instrumentation, served at /metrics.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
 # log
 LoggerConfig().set_default_level_log(
     env_loader.load("LOG_LEVEL", int)
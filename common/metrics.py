@@ -0,0 +1,362 @@
+"""
+Process-local metrics, exposed in the Prometheus text format.
+
+Counters, gauges and histograms are plain Python objects behind a lock, cheap
+enough to update on every request (a dict lookup and a few additions). Values
+held elsewhere (cache hit counts, pool sizes) are copied in by collectors when
+the metrics are rendered, so they cost nothing between scrapes.
+
+Every API worker process has its own values; Prometheus tells workers apart
+by their scrape target. Work done in process pools (ingestion) is timed there
+with `capture_observations` and replayed into the API process's metrics with
+`replay_observations`.
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Iterator
+import math
+import time
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Observations made while `capture_observations` is active, as (metric name, label values, value).
+captured_observations: ContextVar[list[tuple[str, tuple[str, ...], float]] | None] = ContextVar(
+    "captured_observations", default=None,
+)
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def format_labels(labelnames: tuple[str, ...], labelvalues: tuple[str, ...]) -> str:
+    if not labelnames:
+        return ""
+
+    pairs = (f'{name}="{escape_label_value(value)}"' for name, value in zip(labelnames, labelvalues))
+    return "{" + ",".join(pairs) + "}"
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """
+    A metric family: one child per combination of label values.
+
+    Attributes:
+        name (str): Metric name, e.g. `http_requests_total`.
+        documentation (str): Help text.
+        labelnames (tuple[str, ...]): Label names; children are looked up by their values.
+    """
+
+    type_name = "untyped"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            registry: "Registry | None" = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._lock = Lock()
+
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *labelvalues: str):
+        """
+        Returns the child for the given label values (in `labelnames` order), creating it if needed.
+        """
+        child = self._children.get(labelvalues)
+
+        if child is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+
+            with self._lock:
+                child = self._children.get(labelvalues)
+
+                if child is None:
+                    child = self._children[labelvalues] = self.new_child(labelvalues)
+
+        return child
+
+    def new_child(self, labelvalues: tuple[str, ...]):
+        raise NotImplementedError
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return "\n".join((
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.samples(),
+        ))
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        """For totals counted elsewhere, copied in by a collector."""
+        self.value = value
+
+
+class Counter(Metric):
+    """A value that only goes up, e.g. requests served."""
+
+    type_name = "counter"
+
+    def new_child(self, labelvalues: tuple[str, ...]) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[str]:
+        for labelvalues, child in list(self._children.items()):
+            yield f"{self.name}{format_labels(self.labelnames, labelvalues)} {format_value(child.value)}"
+
+
+class GaugeChild(CounterChild):
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+
+class Gauge(Counter):
+    """A value that goes up and down, e.g. streams in progress."""
+
+    type_name = "gauge"
+
+    def new_child(self, labelvalues: tuple[str, ...]) -> GaugeChild:
+        return GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class HistogramChild:
+    def __init__(self, name: str, labelvalues: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.labelvalues = labelvalues
+        self.buckets = buckets
+        # Per-bucket (not cumulative) counts; the last one is +Inf.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+        observations = captured_observations.get()
+        if observations is not None:
+            observations.append((self.name, self.labelvalues, value))
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observes the duration of the `with` block, in seconds."""
+        started = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(Metric):
+    """
+    A distribution of values, e.g. request durations, counted in cumulative buckets.
+
+    Attributes:
+        buckets (tuple[float, ...]): Upper bounds of the buckets, ascending; +Inf is implied.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+            registry: "Registry | None" = None,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def new_child(self, labelvalues: tuple[str, ...]) -> HistogramChild:
+        return HistogramChild(self.name, labelvalues, self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def samples(self) -> Iterator[str]:
+        for labelvalues, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = format_labels((*self.labelnames, "le"), (*labelvalues, format_value(upper_bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+
+            labels = format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """The metrics of a process, plus the collectors refreshing values kept elsewhere."""
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+
+        self.metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Registers a callback run before every render, to copy values into metrics."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: All metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        for collector in self.collectors:
+            collector()
+
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@contextmanager
+def capture_observations() -> Iterator[list[tuple[str, tuple[str, ...], float]]]:
+    """
+    Collects the histogram observations made in the `with` block, e.g. in a process
+    pool worker, so they can be sent back and passed to `replay_observations`.
+    """
+    observations: list[tuple[str, tuple[str, ...], float]] = []
+    token = captured_observations.set(observations)
+
+    try:
+        yield observations
+
+    finally:
+        captured_observations.reset(token)
+
+
+def replay_observations(
+        observations: list[tuple[str, tuple[str, ...], float]],
+        registry: Registry | None = None,
+) -> None:
+    """Records observations captured by `capture_observations` in another process."""
+    metrics = (registry or REGISTRY).metrics
+
+    for name, labelvalues, value in observations:
+        metric = metrics.get(name)
+        if isinstance(metric, Histogram):
+            metric.labels(*labelvalues).observe(value)
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the end of its response.",
+    ("method", "route"),
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Requests served, by response status.",
+    ("method", "route", "status"),
+)
+HTTP_RESPONSE_BYTES = Counter(
+    "http_response_bytes_total",
+    "Response body bytes sent, files sent with zero-copy included.",
+    ("route",),
+)
+HTTP_RESPONSES_IN_PROGRESS = Gauge(
+    "http_responses_in_progress",
+    "Responses started but not finished, e.g. tracks being streamed.",
+    ("route",),
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing database statements, by statement type.",
+    ("engine", "operation"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out",
+    "Database connections in use.",
+    ("engine",),
+)
+INGEST_STAGE_DURATION = Histogram(
+    "ingest_stage_duration_seconds",
+    "Time spent in each step of ingesting a track.",
+    ("stage",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+INGEST_JOBS = Counter(
+    "ingest_jobs_total",
+    "Ingestion jobs finished, by outcome.",
+    ("status",),
+)
+THREADPOOL_THREADS_BUSY = Gauge(
+    "threadpool_threads_busy",
+    "Worker threads running sync endpoints and file I/O.",
+)
+THREADPOOL_THREADS_LIMIT = Gauge(
+    "threadpool_threads_limit",
+    "Maximum number of worker threads; requests queue once all are busy.",
+)
+INGEST_WORKERS_BUSY = Gauge(
+    "ingest_workers_busy",
+    "Ingestion jobs running in the process pool.",
+)
+INGEST_WORKERS_LIMIT = Gauge(
+    "ingest_workers_limit",
+    "Size of the ingestion process pool.",
+)
+COVER_RESIZE_DURATION = Histogram(
+    "cover_resize_duration_seconds",
+    "Time to render a cover at a requested width, queueing in the resize pool included.",
+)
+CACHE_HITS = Counter("cache_hits_total", "Lookups served from a cache.", ("cache",))
+CACHE_MISSES = Counter("cache_misses_total", "Lookups not served from a cache.", ("cache",))
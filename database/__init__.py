@@ -1,18 +1,16 @@
-from .config import Base, engine, SessionLocal
+from .config import Base, engine, SessionLocal, async_engine, AsyncSessionLocal
 
 
 def init_db():
     """
     Initializes the database by creating all tables defined in the metadata.
 
-    This function should be called once during application startup to ensure
-    that all models mapped to the SQLAlchemy `Base` are created in the database.
+    Called by the application's lifespan on startup (unless `DATABASE_CREATE_ALL`
+    is off), not on import: Alembic, CLI tools and process pool workers importing
+    the models don't connect to the database or inspect the schema.
     """
     Base.metadata.create_all(engine)
 
-# Initialize the database when the module is imported
-init_db()
-
 
 def get_db():
     """
@@ -41,3 +39,27 @@ def get_db():
 
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency function for retrieving an async database session.
+
+    Unlike `get_db`, queries made through this session don't hold one of
+    Starlette's threadpool slots while they wait on the database.
+
+    Yields:
+        AsyncSession: A SQLAlchemy async database session object.
+
+    Example:
+        Usage in FastAPI endpoint:
+
+        from fastapi import Depends
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        @app.get("/items/")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            return (await db.scalars(select(Item))).all()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,12 +1,97 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from common.constants import (
     DATABASE_URL,
+    DATABASE_ASYNC_URL,
     DATABASE_LOG,
+    DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_PRE_PING,
+    METRICS_ENABLED,
 )
+from common.metrics import DB_POOL_CHECKED_OUT, DB_QUERY_DURATION, REGISTRY
+
+# Statement types timed separately; anything else is counted as "other".
+TIMED_OPERATIONS = frozenset(("select", "insert", "update", "delete"))
+
+
+def get_engine_options(url: str) -> dict:
+    """
+    Returns the connection pool options for an engine.
+
+    SQLite connections are local files, so the pool sizing is left to SQLAlchemy's
+    defaults there; every other database gets the configured pool.
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        dict: Keyword arguments for `create_engine` / `create_async_engine`.
+    """
+    engine_options = {"echo": DATABASE_LOG, "pool_pre_ping": DATABASE_POOL_PRE_PING}
+
+    if not url.startswith("sqlite"):
+        engine_options.update(
+            pool_size=DATABASE_POOL_SIZE,
+            max_overflow=DATABASE_MAX_OVERFLOW,
+            pool_timeout=DATABASE_POOL_TIMEOUT,
+            pool_recycle=DATABASE_POOL_RECYCLE,
+        )
+
+    return engine_options
+
 
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Times every statement executed by an engine, and reports its pool usage.
 
-engine = create_engine(DATABASE_URL, echo=DATABASE_LOG)
+    Each statement costs two event callbacks and a histogram update.
+
+    Args:
+        engine (Engine): The engine (for an async engine, its `sync_engine`).
+        name (str): Value of the `engine` label.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        started_at = connection.info["query_started_at"].pop()
+        operation = statement.lstrip()[:6].lower()
+
+        DB_QUERY_DURATION.labels(name, operation if operation in TIMED_OPERATIONS else "other").observe(
+            time.perf_counter() - started_at
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            started_at = exception_context.connection.info.get("query_started_at")
+            if started_at:
+                started_at.pop()
+
+    def collect() -> None:
+        # NullPool and StaticPool keep no count.
+        if hasattr(engine.pool, "checkedout"):
+            DB_POOL_CHECKED_OUT.labels(name).set(engine.pool.checkedout())
+
+    REGISTRY.add_collector(collect)
+
+
+engine = create_engine(DATABASE_URL, **get_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+async_engine = create_async_engine(DATABASE_ASYNC_URL, **get_engine_options(DATABASE_ASYNC_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+if METRICS_ENABLED:
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
@@ -1,6 +1,21 @@
+from datetime import datetime, timezone
 import uuid
 
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import deferred
 
 from .config import Base
 
@@ -50,10 +65,28 @@ class Track(Base):
         artist (str, optional): Artist or band name.
         path (str): Relative path to the audio file on the server.
         cover_path (str, optional): Path to the cover image file (if available).
+        cover_sizes (str, optional): Comma-separated sizes of the cover thumbnails, largest first.
         duration (int): Duration of the track in seconds.
+        etag (str, optional): Strong entity tag of the audio file, computed once at upload.
+        created_at (datetime): Upload time (UTC), served as `Last-Modified`.
+        sha256 (str, optional): SHA-256 digest of the audio file, used to skip re-imports.
+        hls_path (str, optional): Relative path of the HLS playlist, if the track was segmented.
+        loudness (float, optional): Integrated loudness (LUFS, ITU-R BS.1770), if the track was analyzed.
+        peak (float, optional): Sample peak, 1.0 for 0 dBFS, if the track was analyzed.
+        waveform (bytes, optional): Peak waveform, one byte per bucket; loaded only when accessed.
+        mime_type (str, optional): Content type the audio file is served with.
+        size (int, optional): Size of the audio file in bytes.
+        bitrate (int, optional): Average bitrate of the audio in kbit/s.
+        sample_rate (int, optional): Sample rate of the audio in Hz.
+        codec (str, optional): Audio codec of the file, e.g. `mp3`.
+        cover_name (str, optional): Path of the cover under the cover URL, e.g. `ab/cd/<sha256>-1024.jpg`.
     """
 
     __tablename__ = 'tracks'
+    __table_args__ = (
+        # Sort key of the track list; keyset pagination seeks on it.
+        Index('ix_tracks_created_at_id', 'created_at', 'id'),
+    )
 
     id = Column(
         String(36),
@@ -81,8 +114,327 @@ class Track(Base):
         nullable=True,
         doc="Optional relative path to the cover image file (usually .jpg)."
     )
+    cover_sizes = Column(
+        String(64),
+        nullable=True,
+        doc="Comma-separated sizes (px) of the WebP and JPEG cover thumbnails. NULL for covers stored at full size only."
+    )
     duration = Column(
         Integer,
         nullable=False,
         doc="Track duration in seconds."
     )
+    etag = Column(
+        String(64),
+        nullable=True,
+        doc="Entity tag of the audio file: track id plus a SHA-256 prefix of its content (unquoted)."
+    )
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        server_default=func.now(),
+        doc="Time (UTC) the track was uploaded. Audio files never change afterwards."
+    )
+    sha256 = Column(
+        String(64),
+        nullable=True,
+        index=True,
+        doc="SHA-256 digest of the audio file, used to detect content already in the library."
+    )
+    hls_path = Column(
+        String(255),
+        nullable=True,
+        doc="Relative path of the HLS playlist; its segments sit next to it."
+    )
+    loudness = Column(
+        Float,
+        nullable=True,
+        doc="Integrated loudness in LUFS. NULL for silent or unanalyzed tracks."
+    )
+    peak = Column(
+        Float,
+        nullable=True,
+        doc="Highest sample amplitude, 1.0 for 0 dBFS. NULL for unanalyzed tracks."
+    )
+    # Deferred: track lists never need the waveform.
+    waveform = deferred(Column(
+        LargeBinary,
+        nullable=True,
+        doc="Peak of each of up to WAVEFORM_BUCKETS equal spans of the track, 0-255 for 0 dBFS."
+    ))
+    # Read from the file once at ingestion, so serving a track needs no stat or MIME lookup.
+    mime_type = Column(
+        String(64),
+        nullable=True,
+        doc="Content type the audio file is served with."
+    )
+    size = Column(
+        BigInteger,
+        nullable=True,
+        doc="Size of the audio file in bytes. NULL until backfilled for tracks uploaded before it was stored."
+    )
+    bitrate = Column(
+        Integer,
+        nullable=True,
+        doc="Average bitrate of the audio in kbit/s."
+    )
+    sample_rate = Column(
+        Integer,
+        nullable=True,
+        doc="Sample rate of the audio in Hz."
+    )
+    codec = Column(
+        String(16),
+        nullable=True,
+        doc="Audio codec of the file, e.g. mp3."
+    )
+    cover_name = Column(
+        String(255),
+        nullable=True,
+        doc="Path of the cover relative to the cover directory and URL, in POSIX form."
+    )
+
+
+class TrackVariant(Base):
+    """
+    SQLAlchemy ORM model for the `track_variants` table.
+
+    Represents a lower-bitrate encoding of a track, made at ingestion for clients
+    on slow links. The original upload stays the `Track` itself.
+
+    Fields:
+        id (str): UUID of the variant (primary key).
+        track_id (str): Id of the track this is a variant of.
+        quality (str): Quality name clients ask for, e.g. `low` or `medium`.
+        codec (str): Audio codec, `opus` or `aac`.
+        bitrate (int): Target bitrate in kbit/s.
+        media_type (str): Content type the file is served with.
+        path (str): Relative path to the audio file on the server.
+        size (int): Size of the audio file in bytes.
+        etag (str): Strong entity tag of the audio file (unquoted).
+        created_at (datetime): Time (UTC) the variant was made.
+    """
+
+    __tablename__ = 'track_variants'
+    __table_args__ = (
+        UniqueConstraint('track_id', 'quality', 'codec', name='uq_track_variants_track_id_quality_codec'),
+    )
+
+    id = Column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+        doc="UUID (v4) used as the primary key for the variant."
+    )
+    track_id = Column(
+        String(36),
+        ForeignKey('tracks.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True,
+        doc="Id of the track this is a variant of."
+    )
+    quality = Column(
+        String(16),
+        nullable=False,
+        doc="Quality name clients ask for, e.g. low or medium."
+    )
+    codec = Column(
+        String(16),
+        nullable=False,
+        doc="Audio codec: opus or aac."
+    )
+    bitrate = Column(
+        Integer,
+        nullable=False,
+        doc="Target bitrate in kbit/s."
+    )
+    media_type = Column(
+        String(64),
+        nullable=False,
+        doc="Content type the file is served with."
+    )
+    path = Column(
+        String(255),
+        nullable=False,
+        doc="Relative file path to the audio file on the server."
+    )
+    size = Column(
+        BigInteger,
+        nullable=False,
+        doc="Size of the audio file in bytes."
+    )
+    etag = Column(
+        String(64),
+        nullable=False,
+        doc="Entity tag of the audio file: track id plus a SHA-256 prefix of its content (unquoted)."
+    )
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        doc="Time (UTC) the variant was made."
+    )
+
+
+class TrackFingerprint(Base):
+    """
+    SQLAlchemy ORM model for the `track_fingerprints` table.
+
+    Holds the acoustic fingerprint of a track (see `service.music_track.fingerprint`),
+    compared bit by bit against the candidates found through `TrackFingerprintHash`.
+
+    Fields:
+        track_id (str): Id of the track (primary key).
+        fingerprint (bytes): Little-endian 32-bit words, one per audio frame.
+    """
+
+    __tablename__ = 'track_fingerprints'
+
+    track_id = Column(
+        String(36),
+        ForeignKey('tracks.id', ondelete='CASCADE'),
+        primary_key=True,
+        doc="Id of the fingerprinted track."
+    )
+    fingerprint = Column(
+        LargeBinary,
+        nullable=False,
+        doc="Fingerprint words (uint32, little-endian), one per 46 ms frame."
+    )
+
+
+class TrackFingerprintHash(Base):
+    """
+    SQLAlchemy ORM model for the `track_fingerprint_hashes` table.
+
+    The locality-sensitive hash index of the fingerprints: every track has one
+    row per MinHash value. Tracks sharing a value are near-duplicate candidates.
+
+    Fields:
+        hash (int): MinHash value, tagged with the index of its hash function.
+        track_id (str): Id of the track.
+    """
+
+    __tablename__ = 'track_fingerprint_hashes'
+
+    hash = Column(
+        Integer,
+        primary_key=True,
+        autoincrement=False,
+        doc="MinHash value of the track's fingerprint, tagged with its hash function index."
+    )
+    track_id = Column(
+        String(36),
+        ForeignKey('tracks.id', ondelete='CASCADE'),
+        primary_key=True,
+        index=True,
+        doc="Id of the track."
+    )
+
+
+class IngestJob(Base):
+    """
+    SQLAlchemy ORM model for the `ingest_jobs` table.
+
+    Represents an uploaded track waiting for (or going through) background ingestion:
+    metadata extraction and cover transcoding. Jobs live in the database, so queued
+    uploads survive a restart.
+
+    Fields:
+        id (str): UUID of the job, reused as the id of the resulting track.
+        status (str): One of `queued`, `processing`, `done`, `failed`.
+        progress (int): Completion percentage, 0-100.
+        upload_path (str): Relative path of the staged audio file.
+        upload_sha256 (str): SHA-256 digest of the staged audio file.
+        cover_upload_path (str, optional): Relative path of the staged cover, if one was uploaded.
+        title (str, optional): Title given with the upload.
+        artist (str, optional): Artist given with the upload.
+        track_id (str, optional): Id of the created track, once done.
+        duplicate_of (str, optional): Id of an existing track with the same audio, if any.
+        error (str, optional): Failure reason, if the job failed.
+        claim_token (str, optional): Token of the worker processing the job.
+        created_at (datetime): Time (UTC) the job was queued.
+        updated_at (datetime): Time (UTC) of the last status or progress change.
+    """
+
+    __tablename__ = 'ingest_jobs'
+
+    id = Column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+        doc="UUID (v4) used as the primary key; also the id of the resulting track."
+    )
+    status = Column(
+        String(16),
+        nullable=False,
+        default="queued",
+        index=True,
+        doc="Job status: queued, processing, done or failed."
+    )
+    progress = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        doc="Completion percentage, 0-100."
+    )
+    upload_path = Column(
+        String(255),
+        nullable=False,
+        doc="Relative path of the staged audio file."
+    )
+    upload_sha256 = Column(
+        String(64),
+        nullable=False,
+        doc="SHA-256 digest of the staged audio file, computed while it streamed in."
+    )
+    cover_upload_path = Column(
+        String(255),
+        nullable=True,
+        doc="Relative path of the staged cover file, if one was uploaded."
+    )
+    title = Column(
+        String(60),
+        nullable=True,
+        doc="Title given with the upload. Optional."
+    )
+    artist = Column(
+        String(60),
+        nullable=True,
+        doc="Artist given with the upload. Optional."
+    )
+    track_id = Column(
+        String(36),
+        nullable=True,
+        doc="Id of the created track, once the job is done."
+    )
+    duplicate_of = Column(
+        String(36),
+        nullable=True,
+        doc="Id of a track already in the library with the same audio (identical, or another encode)."
+    )
+    error = Column(
+        Text,
+        nullable=True,
+        doc="Failure reason, if the job failed."
+    )
+    claim_token = Column(
+        String(36),
+        nullable=True,
+        doc="Token of the worker processing the job. A requeued job is claimed under a new one, "
+            "so a worker that lost its claim can't complete or fail it."
+    )
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        doc="Time (UTC) the job was queued."
+    )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        doc="Time (UTC) of the last status or progress change; stale while processing if the worker died."
+    )
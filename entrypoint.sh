@@ -5,6 +5,8 @@ echo "⏳ Waiting for database at $DB_HOST:$DB_PORT..."
 
 echo "📦 Running Alembic migrations..."
 alembic upgrade head
+# The schema is up to date: workers needn't inspect it on startup.
+export DATABASE_CREATE_ALL="${DATABASE_CREATE_ALL:-false}"
 
 echo "🚀 Starting FastAPI app..."
 exec python main.py
\ No newline at end of file
@@ -0,0 +1,298 @@
+"""
+Bulk import of a music library from a directory tree.
+
+Walks a directory, runs the same metadata extraction as uploads
+(`MusicTrackMetadata`, via `ingest_music_track_file`) in a pool of worker
+processes and writes `Track` rows with batched bulk inserts. Files whose content
+hash is already in the library are skipped, so an interrupted import can simply
+be run again. Files that sound like a track already imported (another encode of
+the same song, by acoustic fingerprint) are imported and reported.
+
+Usage:
+    python import_library.py /path/to/music --workers 8 --batch-size 500
+"""
+
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterator
+import argparse
+import hashlib
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+
+from sqlalchemy import insert
+from ten_utils.log import Logger
+
+from common.constants import DIR_DATA, DIR_INGEST
+from database.config import SessionLocal
+from database.models import Track
+from service.music_track import bump_library_version, ingest_music_track_file
+from service.music_track.fingerprint import (
+    add_music_track_fingerprint,
+    find_near_duplicate,
+    make_music_track_fingerprint,
+)
+
+
+logger = Logger(__name__)
+
+MUSIC_TRACK_EXTENSIONS = (".mp3",)
+HASH_CHUNK_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 5.0
+
+# Imported tracks get an id derived from their content hash, so re-running an
+# interrupted import overwrites its own files instead of leaving orphans behind.
+IMPORT_NAMESPACE = uuid.UUID("55cdfcc8-7500-47b4-b10d-141fd7034829")
+
+# Hashes already in the library; set in every worker by `init_worker`.
+known_hashes: frozenset[str] = frozenset()
+
+
+def iter_music_files(root: Path) -> Iterator[Path]:
+    """
+    Yields the music files under `root`, in a stable order.
+
+    Args:
+        root (Path): Directory to walk.
+
+    Yields:
+        Path: Path of each file with a supported extension.
+    """
+    for directory, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+
+        for file_name in sorted(file_names):
+            if file_name.lower().endswith(MUSIC_TRACK_EXTENSIONS):
+                yield Path(directory) / file_name
+
+
+def hash_file(path: Path) -> tuple[str, int]:
+    """
+    Computes the SHA-256 digest and size of a file.
+
+    Args:
+        path (Path): The file to hash.
+
+    Returns:
+        tuple[str, int]: The hex digest and the size in bytes.
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+
+    return digest.hexdigest(), size
+
+
+def init_worker(library_hashes: frozenset[str]) -> None:
+    global known_hashes
+    known_hashes = library_hashes
+
+
+def import_music_track_file(path: str, link: bool = False) -> dict[str, Any]:
+    """
+    Worker entry point: imports one file into the library, unless its content is already there.
+
+    Args:
+        path (str): Path of the file to import.
+        link (bool, optional): Hard-link the file into the library instead of copying it.
+
+    Returns:
+        dict[str, Any]: `status` (`imported`, `skipped` or `failed`), `path`, `size`,
+            plus `fields` (the Track column values) and `fingerprint`, or `error`.
+    """
+    music_track_sha256, size = hash_file(Path(path))
+    result = {"path": path, "size": size}
+
+    if music_track_sha256 in known_hashes:
+        return {**result, "status": "skipped"}
+
+    music_track_id = str(uuid.uuid5(IMPORT_NAMESPACE, music_track_sha256))
+    path_to_staged_file = DIR_INGEST / f"{music_track_id}.import"
+
+    try:
+        if link:
+            try:
+                os.link(path, path_to_staged_file)
+
+            except FileExistsError:
+                pass
+
+            except OSError:
+                shutil.copyfile(path, path_to_staged_file)
+
+        else:
+            shutil.copyfile(path, path_to_staged_file)
+
+        music_track_fields = ingest_music_track_file(
+            music_track_id=music_track_id,
+            path_to_music_track_file=path_to_staged_file,
+            music_track_sha256=music_track_sha256,
+        )
+        music_track_fingerprint = make_music_track_fingerprint(str(DIR_DATA / music_track_fields["path"]))
+
+    except Exception as exc:
+        path_to_staged_file.unlink(missing_ok=True)
+        return {**result, "status": "failed", "error": repr(exc)}
+
+    return {**result, "status": "imported", "fields": music_track_fields, "fingerprint": music_track_fingerprint}
+
+
+def insert_music_tracks(rows: list[dict[str, Any]], fingerprints: dict[str, dict[str, Any]]) -> int:
+    """
+    Inserts a batch of tracks with a single executemany and a single commit.
+
+    Their fingerprints are checked against the library (including the tracks of
+    this batch inserted before them) and indexed in the same transaction.
+
+    Args:
+        rows (list[dict[str, Any]]): Track column values.
+        fingerprints (dict[str, dict[str, Any]]): Fingerprints of the tracks, by track id.
+
+    Returns:
+        int: Number of tracks that sound like a track already in the library.
+    """
+    if not rows:
+        return 0
+
+    near_duplicates = 0
+
+    with SessionLocal() as db:
+        db.execute(insert(Track), rows)
+
+        for row in rows:
+            music_track_fingerprint = fingerprints.get(row["id"])
+            if music_track_fingerprint is None:
+                continue
+
+            duplicate_of = find_near_duplicate(db, music_track_fingerprint)
+            if duplicate_of is not None:
+                near_duplicates += 1
+                logger.info(f"{row['title'] or row['path']} ({row['id']}) sounds like track {duplicate_of}")
+
+            add_music_track_fingerprint(db, row["id"], music_track_fingerprint)
+
+        db.commit()
+
+    bump_library_version()
+
+    return near_duplicates
+
+
+def import_library(root: Path, workers: int, batch_size: int, link: bool = False) -> dict[str, float]:
+    """
+    Imports every music file under `root`.
+
+    Args:
+        root (Path): Directory to import.
+        workers (int): Number of worker processes.
+        batch_size (int): Number of tracks per bulk insert.
+        link (bool, optional): Hard-link files into the library instead of copying them.
+            Only safe if the source files are never modified in place.
+
+    Returns:
+        dict[str, float]: Counters and throughput of the run.
+    """
+    DIR_INGEST.mkdir(exist_ok=True)
+
+    with SessionLocal() as db:
+        library_hashes = frozenset(
+            sha256 for sha256, in db.query(Track.sha256).filter(Track.sha256.isnot(None))
+        )
+
+    stats = {"files": 0, "imported": 0, "skipped": 0, "failed": 0, "near_duplicates": 0, "bytes": 0}
+    seen_hashes: set[str] = set()
+    batch: list[dict[str, Any]] = []
+    fingerprints: dict[str, dict[str, Any]] = {}
+    started = last_report = time.perf_counter()
+
+    # "spawn" so workers don't inherit the parent's database connections.
+    context = multiprocessing.get_context("spawn")
+
+    with context.Pool(processes=workers, initializer=init_worker, initargs=(library_hashes,)) as pool:
+        results = pool.imap_unordered(
+            partial(import_music_track_file, link=link),
+            (str(path) for path in iter_music_files(root)),
+            chunksize=4,
+        )
+
+        for result in results:
+            stats["files"] += 1
+            stats["bytes"] += result["size"]
+
+            if result["status"] == "imported" and result["fields"]["sha256"] in seen_hashes:
+                # The same content twice in this run: both landed on the same files.
+                result["status"] = "skipped"
+
+            stats[result["status"]] += 1
+
+            if result["status"] == "imported":
+                seen_hashes.add(result["fields"]["sha256"])
+                batch.append(result["fields"])
+
+                if result["fingerprint"] is not None:
+                    fingerprints[result["fields"]["id"]] = result["fingerprint"]
+
+            elif result["status"] == "failed":
+                logger.warning(f"Failed to import {result['path']}: {result['error']}")
+
+            if len(batch) >= batch_size:
+                stats["near_duplicates"] += insert_music_tracks(batch, fingerprints)
+                batch.clear()
+                fingerprints.clear()
+
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                logger.info(format_stats(stats, now - started))
+
+    stats["near_duplicates"] += insert_music_tracks(batch, fingerprints)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["files_per_second"] = round(stats["files"] / elapsed, 1) if elapsed else 0.0
+    stats["mb_per_second"] = round(stats["bytes"] / elapsed / 1024 / 1024, 1) if elapsed else 0.0
+
+    return stats
+
+
+def format_stats(stats: dict[str, float], elapsed: float) -> str:
+    return (
+        f"{stats['files']} files ({stats['imported']} imported, {stats['skipped']} skipped, "
+        f"{stats['failed']} failed, {stats['near_duplicates']} near-duplicates) in {elapsed:.1f}s: "
+        f"{stats['files'] / elapsed:.1f} files/s, {stats['bytes'] / elapsed / 1024 / 1024:.1f} MB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a directory tree of music files into the library.")
+    parser.add_argument("directory", type=Path, help="Directory to scan for music files.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="Tracks per bulk insert (default: 500).")
+    parser.add_argument(
+        "--link",
+        action="store_true",
+        help="Hard-link files into the library instead of copying them (sources must never be edited in place).",
+    )
+    args = parser.parse_args()
+
+    if not args.directory.is_dir():
+        parser.error(f"{args.directory} is not a directory")
+
+    stats = import_library(args.directory, workers=args.workers, batch_size=args.batch_size, link=args.link)
+    logger.info(format_stats(stats, stats["seconds"] or 1e-9))
+
+
+if __name__ == "__main__":
+    main()
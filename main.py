@@ -1,8 +1,75 @@
+import os
+
 import uvicorn
+from ten_utils.log import Logger
+
+from common.constants import (
+    INGEST_WORKERS,
+    SERVER_ACCESS_LOG,
+    SERVER_BACKLOG,
+    SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+    SERVER_HOST,
+    SERVER_HTTP,
+    SERVER_KEEP_ALIVE_TIMEOUT,
+    SERVER_LIMIT_CONCURRENCY,
+    SERVER_LOOP,
+    SERVER_PORT,
+    SERVER_RELOAD,
+    SERVER_WORKERS,
+    TRACK_LIST_CACHE_BACKEND,
+)
+
+
+logger = Logger(__name__)
+
+
+def get_server_options() -> dict:
+    """
+    Returns:
+        dict: Keyword arguments of `uvicorn.run`: the reloader in development, a tuned
+            multi-process server otherwise (see the `SERVER_*` settings).
+    """
+    if SERVER_RELOAD:
+        return {"reload": True}
+
+    return {
+        "workers": SERVER_WORKERS,
+        "loop": SERVER_LOOP,
+        "http": SERVER_HTTP,
+        "backlog": SERVER_BACKLOG,
+        "timeout_keep_alive": SERVER_KEEP_ALIVE_TIMEOUT,
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+        "limit_concurrency": SERVER_LIMIT_CONCURRENCY or None,
+        "access_log": SERVER_ACCESS_LOG,
+    }
 
 
 def run_server():
-    uvicorn.run(app="api.app:app", host="0.0.0.0", port=8000, reload=True)
+    server_options = get_server_options()
+
+    workers = server_options.get("workers", 1)
+    if workers > 1 and "INGEST_WORKERS" not in os.environ:
+        # Every worker runs its own ingestion pool, all claiming from the same queue:
+        # split the default pool size between them rather than multiplying it.
+        os.environ["INGEST_WORKERS"] = str(max(INGEST_WORKERS // workers, 1))
+
+    if workers > 1:
+        # Each worker caches list pages, the track count and resolved stream files, and
+        # invalidates them by bumping the library version. With the "memory" backend that
+        # version is per process: a track added or deleted through one worker is missing
+        # from (or still served by) the others until their entries expire. The "file"
+        # backend shares the version and the pages through DIR_CACHE, at the cost of a
+        # small file read per list or stream request.
+        if "TRACK_LIST_CACHE_BACKEND" not in os.environ:
+            os.environ["TRACK_LIST_CACHE_BACKEND"] = "file"
+
+        elif TRACK_LIST_CACHE_BACKEND == "memory":
+            logger.warning(
+                f"TRACK_LIST_CACHE_BACKEND=memory with {workers} workers: "
+                "workers may serve stale track lists until their cache entries expire"
+            )
+
+    uvicorn.run(app="api.app:app", host=SERVER_HOST, port=SERVER_PORT, **server_options)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+"""
+SQLite search index statements, shared by the migrations.
+
+`tracks_fts` is kept in sync with `tracks` by triggers, which SQLite drops along
+with the table. A batch migration recreating `tracks` (e.g. to drop a column)
+must call `restore_sqlite_search_index` after its batch block.
+"""
+
+from alembic import op
+
+
+SQLITE_CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE tracks_fts USING fts5("
+    "track_id UNINDEXED, title, artist, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+SQLITE_CREATE_TRIGGERS = (
+    "CREATE TRIGGER tracks_fts_insert AFTER INSERT ON tracks BEGIN "
+    "INSERT INTO tracks_fts (track_id, title, artist) VALUES (new.id, new.title, new.artist); "
+    "END",
+    "CREATE TRIGGER tracks_fts_delete AFTER DELETE ON tracks BEGIN "
+    "DELETE FROM tracks_fts WHERE track_id = old.id; "
+    "END",
+    "CREATE TRIGGER tracks_fts_update AFTER UPDATE OF id, title, artist ON tracks BEGIN "
+    "UPDATE tracks_fts SET track_id = new.id, title = new.title, artist = new.artist "
+    "WHERE track_id = old.id; "
+    "END",
+)
+
+SQLITE_DROP_TRIGGERS = (
+    "DROP TRIGGER IF EXISTS tracks_fts_update",
+    "DROP TRIGGER IF EXISTS tracks_fts_delete",
+    "DROP TRIGGER IF EXISTS tracks_fts_insert",
+)
+
+SQLITE_FILL_TABLE = "INSERT INTO tracks_fts (track_id, title, artist) SELECT id, title, artist FROM tracks"
+
+
+def restore_sqlite_search_index() -> None:
+    """
+    Recreates the `tracks_fts` triggers and re-fills the table from `tracks`,
+    after a batch migration recreated `tracks`. Does nothing on other dialects.
+    """
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for statement in SQLITE_DROP_TRIGGERS + SQLITE_CREATE_TRIGGERS:
+        op.execute(statement)
+
+    op.execute("DELETE FROM tracks_fts")
+    op.execute(SQLITE_FILL_TABLE)
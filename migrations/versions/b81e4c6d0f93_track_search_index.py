@@ -0,0 +1,63 @@
+"""track search index
+
+Revision ID: b81e4c6d0f93
+Revises: a3d9f1c2b7e4
+Create Date: 2026-10-18 13:52:37.118406
+
+The index depends on the dialect: a FULLTEXT index on MySQL, an FTS5 table kept
+in sync by triggers on SQLite. Other databases get no index and are searched
+with LIKE (see `service.music_track.search`).
+
+Note for SQLite: a batch migration that recreates `tracks` drops the triggers;
+such a migration must call `search_index.restore_sqlite_search_index` afterwards.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e4c6d0f93'
+down_revision: Union[str, None] = 'a3d9f1c2b7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_UPGRADE = (
+    search_index.SQLITE_CREATE_TABLE,
+    *search_index.SQLITE_CREATE_TRIGGERS,
+    search_index.SQLITE_FILL_TABLE,
+)
+
+SQLITE_DOWNGRADE = (
+    *search_index.SQLITE_DROP_TRIGGERS,
+    "DROP TABLE IF EXISTS tracks_fts",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "mysql":
+        op.create_index('ix_tracks_title_artist_ft', 'tracks', ['title', 'artist'], mysql_prefix='FULLTEXT')
+
+    elif dialect == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "mysql":
+        op.drop_index('ix_tracks_title_artist_ft', table_name='tracks')
+
+    elif dialect == "sqlite":
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
@@ -1 +1,2 @@
 from .music_track import *
+from .ingest_job import *
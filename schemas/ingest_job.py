@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, UUID4, HttpUrl
+
+
+class IngestJobSchema(BaseModel):
+    """
+    Schema representing the state of a background ingestion job.
+
+    Attributes:
+        id (UUID4): Unique identifier of the job.
+        status (Literal["queued", "processing", "done", "failed"]): Current status of the job.
+        progress (int): Completion percentage, 0-100.
+        track_id (Optional[UUID4]): Id of the created track, once the job is done.
+        duplicate_of (Optional[UUID]): Id of a track already in the library with the same
+            audio (an identical file or another encode of it), if one was found.
+        error (Optional[str]): Failure reason, if the job failed.
+        created_at (datetime): Time (UTC) the job was queued.
+        updated_at (datetime): Time (UTC) of the last status change.
+    """
+
+    id: UUID4
+    status: Literal["queued", "processing", "done", "failed"]
+    progress: int
+    track_id: Optional[UUID4] = None
+    # Any UUID version: bulk-imported tracks have name-based (v5) ids.
+    duplicate_of: Optional[UUID] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True  # Allows loading from ORM or objects with attributes.
+
+
+class IngestJobCreatedResponse(BaseModel):
+    """
+    Schema representing the response to an accepted upload.
+
+    Attributes:
+        job_id (UUID4): Id of the queued ingestion job.
+        status (str): Status of the job, always `queued`.
+        status_url (HttpUrl): URL to poll for the job's progress.
+    """
+
+    job_id: UUID4
+    status: str
+    status_url: HttpUrl
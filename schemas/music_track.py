@@ -13,7 +13,19 @@ class MusicTrackSchema(BaseModel):
         artist (Optional[str]): Name of the artist or performer. Optional.
         url (HttpUrl): URL pointing to the audio file of the track.
         cover_url (Optional[HttpUrl]): URL to the cover image of the track. Optional.
+        cover_urls (Optional[dict[str, dict[str, HttpUrl]]]): Cover thumbnails: size in pixels
+            mapped to one URL per format (`webp`, `jpeg`). Optional.
+        hls_url (Optional[HttpUrl]): URL of the track's HLS playlist. Optional.
         duration (int): Duration of the track in seconds.
+        mime_type (Optional[str]): Content type of the audio file. Optional.
+        size (Optional[int]): Size of the audio file in bytes. Optional.
+        bitrate (Optional[int]): Average bitrate of the audio in kbit/s. Optional.
+        sample_rate (Optional[int]): Sample rate of the audio in Hz. Optional.
+        codec (Optional[str]): Audio codec of the file, e.g. `mp3`. Optional.
+        loudness (Optional[float]): Integrated loudness in LUFS. Optional.
+        replay_gain (Optional[float]): Gain in dB normalizing the track to the reference loudness. Optional.
+        peak (Optional[float]): Highest sample amplitude, 1.0 for 0 dBFS. Optional.
+        waveform_url (Optional[HttpUrl]): URL of the track's waveform preview. Optional.
     """
 
     id: UUID4
@@ -21,7 +33,18 @@ class MusicTrackSchema(BaseModel):
     artist: Optional[str] = None
     url: HttpUrl
     cover_url: Optional[HttpUrl] = None
+    cover_urls: Optional[dict[str, dict[str, HttpUrl]]] = None
+    hls_url: Optional[HttpUrl] = None
     duration: int
+    mime_type: Optional[str] = None
+    size: Optional[int] = None
+    bitrate: Optional[int] = None
+    sample_rate: Optional[int] = None
+    codec: Optional[str] = None
+    loudness: Optional[float] = None
+    replay_gain: Optional[float] = None
+    peak: Optional[float] = None
+    waveform_url: Optional[HttpUrl] = None
 
     class Config:
         from_attributes = True  # Allows loading from ORM or objects with attributes.
@@ -31,16 +54,57 @@ class MusicTrackListResponse(BaseModel):
     """
     Schema representing a paginated response for a list of music tracks.
 
+    Two pagination modes are supported: offset mode (`offset`/`next_offset`) and
+    cursor mode (`cursor`/`next_cursor`), whose cost does not grow with the page depth.
+
     Attributes:
-        total (int): Total number of tracks available.
-        offset (int): The current offset in pagination.
+        total (Optional[int]): Total number of tracks available. None if the client passed `with_total=false`.
+        offset (Optional[int]): The current offset in pagination. None in cursor mode.
         limit (int): The maximum number of items returned in one page.
         tracks (Optional[List[MusicTrackSchema]]): List of music tracks in the current page.
         next_offset (Optional[int]): Offset value to fetch the next page of results. Optional.
+        next_cursor (Optional[str]): Opaque cursor to fetch the next page in cursor mode. Optional.
     """
 
-    total: int
-    offset: int
+    total: Optional[int] = None
+    offset: Optional[int] = None
     limit: int
     tracks: Optional[List[MusicTrackSchema]] = None
     next_offset: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class MusicTrackSearchResponse(BaseModel):
+    """
+    Schema representing the results of a track search.
+
+    Attributes:
+        query (str): The search text, as received.
+        limit (int): The maximum number of items returned.
+        tracks (List[MusicTrackSchema]): Matching tracks, best matches first.
+    """
+
+    query: str
+    limit: int
+    tracks: List[MusicTrackSchema]
+
+
+class MusicTrackWaveformResponse(BaseModel):
+    """
+    Schema representing the waveform preview and loudness of a track.
+
+    Attributes:
+        id (UUID4): Unique identifier of the track.
+        duration (int): Duration of the track in seconds.
+        loudness (Optional[float]): Integrated loudness in LUFS. None for silence.
+        replay_gain (Optional[float]): Gain in dB normalizing the track to the reference loudness.
+        peak (float): Highest sample amplitude, 1.0 for 0 dBFS.
+        waveform (List[int]): Peak of each equal span of the track, 0-255 for 0 dBFS.
+    """
+
+    id: UUID4
+    duration: int
+    loudness: Optional[float] = None
+    replay_gain: Optional[float] = None
+    peak: float
+    waveform: List[int]
@@ -1,31 +1,423 @@
+from datetime import datetime
 from uuid import uuid4
 from pathlib import Path
-import mimetypes
+from typing import Any, Iterable, NamedTuple, Sequence
+import hashlib
+import os
 
+from anyio import to_thread
+from sqlalchemy import Row, Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ten_utils.log import Logger
 
 from common.constants import (
+    DIR_DATA,
     DIR_MUSIC,
     DIR_MUSIC_COVER,
+    DIR_MUSIC_HLS,
+    DIR_MUSIC_VARIANT,
     URL_MUSIC_STREAM,
     URL_MUSIC_COVER,
+    URL_MUSIC_HLS,
+    DIR_CACHE,
+    DIR_MUSIC_COVER_CACHE,
+    TRACK_COVER_CACHE_MAX_BYTES,
+    TRACK_COUNT_CACHE_TTL,
+    TRACK_LIST_CACHE_BACKEND,
+    TRACK_LIST_CACHE_SIZE,
+    TRACK_LIST_CACHE_TTL,
+    TRACK_FILE_CACHE_SIZE,
+    TRACK_FILE_CACHE_TTL,
+    LOUDNESS_REFERENCE,
 )
+from common.cache import CacheBackend, DiskLRUCache, FileCacheBackend, LRUCache, MemoryCacheBackend
 from common.helpers import get_relative_path
-from database.models import Track
+from database.models import Track, TrackFingerprint, TrackFingerprintHash, TrackVariant
 from database.config import SessionLocal
-from .metadata import MusicTrackMetadata
+from .cover import (
+    COVER_FORMATS,
+    get_music_track_cover_path,
+    get_music_track_cover_sha256,
+    make_music_track_covers,
+)
+from .pagination import decode_cursor, encode_cursor
+from .storage import StreamedFile, get_content_path, release_content_path, store_content_file
 
 
 logger = Logger(__name__)
 
 
+def create_music_track_list_cache() -> CacheBackend:
+    """
+    Creates the cache of encoded track list pages selected by `TRACK_LIST_CACHE_BACKEND`.
+
+    Returns:
+        CacheBackend: A per-process (`memory`) or shared (`file`) backend.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if TRACK_LIST_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(maxsize=TRACK_LIST_CACHE_SIZE, ttl=TRACK_LIST_CACHE_TTL)
+
+    elif TRACK_LIST_CACHE_BACKEND == "file":
+        return FileCacheBackend(DIR_CACHE / "track_list", ttl=TRACK_LIST_CACHE_TTL)
+
+    raise ValueError(f"Unknown TRACK_LIST_CACHE_BACKEND: {TRACK_LIST_CACHE_BACKEND!r}")
+
+
+class MusicTrackFile(NamedTuple):
+    """
+    Everything needed to stream a track, resolved once and cached.
+
+    Attributes:
+        path (Path): Absolute path of the audio file.
+        size (int): Size of the audio file in bytes.
+        media_type (str): MIME type of the audio file.
+        etag (str | None): Entity tag of the audio file (unquoted), if known.
+        created_at (datetime): Upload time (UTC) of the file, served as `Last-Modified`.
+        quality (str): `original`, or the quality name of a variant.
+        codec (str | None): Codec of a variant; None for the original.
+        variants (tuple[MusicTrackFile, ...]): Lower-bitrate variants of the original.
+    """
+
+    path: Path
+    size: int
+    media_type: str
+    etag: str | None
+    created_at: datetime
+    quality: str = "original"
+    codec: str | None = None
+    variants: tuple["MusicTrackFile", ...] = ()
+
+    def select_variant(self, quality: str | None, codecs: list[str]) -> "MusicTrackFile":
+        """
+        Picks the variant of `quality` in the first of `codecs` that exists.
+
+        Args:
+            quality (str | None): Requested quality; None or `original` for the original.
+            codecs (list[str]): Acceptable codecs, most preferred first.
+
+        Returns:
+            MusicTrackFile: The variant, or the original if there is no match.
+        """
+        if quality is None or quality == "original":
+            return self
+
+        variants = {(variant.quality, variant.codec): variant for variant in self.variants}
+
+        for codec in codecs:
+            if (quality, codec) in variants:
+                return variants[(quality, codec)]
+
+        return self
+
+
+music_track_count_cache = LRUCache(maxsize=1, ttl=TRACK_COUNT_CACHE_TTL)
+music_track_list_cache = create_music_track_list_cache()
+# Track id mapped to the library version and the `MusicTrackFile` resolved at it.
+music_track_file_cache = LRUCache(maxsize=TRACK_FILE_CACHE_SIZE, ttl=TRACK_FILE_CACHE_TTL)
+# Covers resized on request, named `<track id>-<width>w-<format><extension>`.
+music_track_cover_cache = DiskLRUCache(DIR_MUSIC_COVER_CACHE, max_bytes=TRACK_COVER_CACHE_MAX_BYTES)
+
+# `hls_path` is relative to `DIR_DATA`; its URL is relative to `DIR_MUSIC_HLS`.
+HLS_PATH_PREFIX = f"{DIR_MUSIC_HLS.name}/"
+
+# What `music_track_to_json` reads, plus the sort key for cursors. Pages select these
+# columns only, as plain rows: no ORM objects are built and no unused column is fetched.
+MUSIC_TRACK_LIST_COLUMNS = (
+    Track.id,
+    Track.title,
+    Track.artist,
+    Track.cover_name,
+    Track.cover_sizes,
+    Track.hls_path,
+    Track.duration,
+    Track.mime_type,
+    Track.size,
+    Track.bitrate,
+    Track.sample_rate,
+    Track.codec,
+    Track.loudness,
+    Track.peak,
+    Track.created_at,
+)
+
+
+def get_replay_gain(music_track_loudness: float | None) -> float | None:
+    """
+    Args:
+        music_track_loudness (float | None): Integrated loudness of a track in LUFS.
+
+    Returns:
+        float | None: Gain in dB bringing the track to `LOUDNESS_REFERENCE`, or None if unknown.
+    """
+    if music_track_loudness is None:
+        return None
+
+    return round(LOUDNESS_REFERENCE - music_track_loudness, 2)
+
+
+def music_track_to_json(music_track: Track, base_url: str) -> dict[str, str | int]:
+    """
+    Serializes a track for the track list.
+
+    Args:
+        music_track (Track): The track to serialize.
+        base_url (str): The base URL used to generate absolute URLs for audio and cover files.
+
+    Returns:
+        dict[str, str | int]: The track as a JSON-compatible dictionary.
+    """
+    music_track_row = tuple(getattr(music_track, column.key) for column in MUSIC_TRACK_LIST_COLUMNS)
+
+    return music_track_rows_to_json([music_track_row], base_url)[0]
+
+
+def music_track_rows_to_json(music_track_rows: Sequence[Row | tuple], base_url: str) -> list[dict[str, str | int]]:
+    """
+    Serializes a page of tracks for the track list.
+
+    Rows are unpacked as plain tuples: attribute access on a `Row` costs more
+    than the rest of the serialization, and a page can hold thousands of them.
+
+    Args:
+        music_track_rows (Sequence[Row | tuple]): Rows of `MUSIC_TRACK_LIST_COLUMNS`.
+        base_url (str): The base URL used to generate absolute URLs for audio and cover files.
+
+    Returns:
+        list[dict[str, str | int]]: The tracks as JSON-compatible dictionaries.
+    """
+    music_track_stream_url = f"{base_url}{URL_MUSIC_STREAM}"
+    music_track_cover_url_prefix = f"{base_url}{URL_MUSIC_COVER}"
+    music_track_hls_url_prefix = f"{base_url}{URL_MUSIC_HLS}"
+    music_track_list_json = []
+
+    for (
+        music_track_id, title, artist, cover_name, cover_sizes, hls_path, duration,
+        mime_type, size, bitrate, sample_rate, codec, loudness, peak, _created_at,
+    ) in music_track_rows:
+        if cover_name:
+            music_track_cover_url = music_track_cover_url_prefix + cover_name
+
+        else:
+            music_track_cover_url = None
+
+        if cover_sizes:
+            # Thumbnails are named like the largest JPEG but for the size: `ab/cd/<sha256>-<size><extension>`.
+            music_track_cover_stem = music_track_cover_url_prefix + cover_name.rsplit("-", 1)[0]
+
+            # Size mapped to one URL per format, e.g. {"64": {"webp": ..., "jpeg": ...}}, for `srcset`.
+            music_track_cover_urls = {
+                cover_size: {
+                    cover_format: f"{music_track_cover_stem}-{cover_size}{cover_format_info['extension']}"
+                    for cover_format, cover_format_info in COVER_FORMATS.items()
+                }
+                for cover_size in cover_sizes.split(",")
+            }
+
+        else:
+            music_track_cover_urls = None
+
+        if hls_path:
+            music_track_hls_url = music_track_hls_url_prefix + hls_path.removeprefix(HLS_PATH_PREFIX)
+
+        else:
+            music_track_hls_url = None
+
+        music_track_list_json.append({
+            "id": music_track_id,
+            "title": title,
+            "artist": artist,
+            "url": music_track_stream_url + music_track_id,
+            "cover_url": music_track_cover_url,
+            "cover_urls": music_track_cover_urls,
+            "hls_url": music_track_hls_url,
+            "duration": duration,
+            "mime_type": mime_type,
+            "size": size,
+            "bitrate": bitrate,
+            "sample_rate": sample_rate,
+            "codec": codec,
+            "loudness": loudness,
+            "replay_gain": get_replay_gain(loudness),
+            "peak": peak,
+            # `peak` is stored along with the waveform, which is not loaded with the track.
+            "waveform_url": f"{music_track_stream_url}{music_track_id}/waveform" if peak is not None else None,
+        })
+
+    return music_track_list_json
+
+
+def select_music_track_count() -> Select:
+    """Builds the query counting the tracks, shared by the sync and async services."""
+    return select(func.count()).select_from(Track)
+
+
+def get_cached_music_track_count(library_version: str) -> int | None:
+    """
+    Args:
+        library_version (str): The current library version.
+
+    Returns:
+        int | None: The cached track count, or None if it was counted at another version.
+    """
+    cached = music_track_count_cache.get("total")
+
+    if cached is not None and cached[0] == library_version:
+        return cached[1]
+
+    return None
+
+
+def cache_music_track_count(library_version: str, total_music_tracks: int) -> int:
+    """Caches the track count counted at `library_version`, and returns it."""
+    music_track_count_cache.set("total", (library_version, total_music_tracks))
+
+    return total_music_tracks
+
+
+def count_music_tracks(db: SessionLocal) -> int:
+    """
+    Returns the total number of tracks, cached for `TRACK_COUNT_CACHE_TTL` seconds.
+
+    `COUNT(*)` scans a whole index on InnoDB, so it is not run on every list request.
+    The value is kept with the library version it was counted at, so a
+    `bump_library_version` in any process sharing the list cache invalidates it.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+
+    Returns:
+        int: The number of tracks in the database.
+    """
+    library_version = music_track_list_cache.get_version("library")
+    total_music_tracks = get_cached_music_track_count(library_version)
+
+    if total_music_tracks is None:
+        total_music_tracks = cache_music_track_count(library_version, db.scalar(select_music_track_count()))
+
+    return total_music_tracks
+
+
+async def count_music_tracks_async(db: AsyncSession) -> int:
+    """
+    Async variant of `count_music_tracks`, sharing its cache.
+
+    Args:
+        db (AsyncSession): The active SQLAlchemy async database session.
+
+    Returns:
+        int: The number of tracks in the database.
+    """
+    library_version = await music_track_list_cache.get_version_async("library")
+    total_music_tracks = get_cached_music_track_count(library_version)
+
+    if total_music_tracks is None:
+        total_music_tracks = cache_music_track_count(library_version, await db.scalar(select_music_track_count()))
+
+    return total_music_tracks
+
+
+def bump_library_version() -> None:
+    """
+    Invalidates everything derived from the track table: the cached count and
+    every cached list page. Call after adding or removing tracks.
+    """
+    music_track_count_cache.clear()
+    music_track_list_cache.bump_version("library")
+
+
+async def music_track_list_cache_key_async(base_url: str, **params: Any) -> str:
+    """
+    Builds the cache key of a track list page.
+
+    The key embeds the current library version, so pages cached before the
+    last `bump_library_version` are never served.
+
+    Args:
+        base_url (str): The base URL the page's URLs are built from.
+        **params (Any): The pagination parameters of the request.
+
+    Returns:
+        str: The cache key.
+    """
+    version = await music_track_list_cache.get_version_async("library")
+    query = "&".join(f"{name}={value}" for name, value in sorted(params.items()))
+
+    return f"tracks:{version}:{base_url}?{query}"
+
+
+def select_music_track_list(offset: int = 0, limit: int = 100, get_all: bool = False) -> Select:
+    """
+    Builds the query of an offset page, shared by the sync and async services.
+
+    One extra row is selected: it tells whether there is a next page without counting.
+    """
+    statement = select(*MUSIC_TRACK_LIST_COLUMNS).order_by(Track.created_at, Track.id)
+
+    if not get_all:
+        statement = statement.offset(offset).limit(limit + 1)
+
+    return statement
+
+
+def select_music_track_page(cursor: str | None = None, limit: int = 100) -> Select:
+    """
+    Builds the query of a keyset page, shared by the sync and async services.
+
+    One extra row is selected: it tells whether there is a next page.
+
+    Raises:
+        InvalidCursor: If `cursor` is malformed.
+    """
+    statement = select(*MUSIC_TRACK_LIST_COLUMNS)
+
+    if cursor:
+        created_at, music_track_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            Track.created_at > created_at,
+            and_(Track.created_at == created_at, Track.id > music_track_id),
+        ))
+
+    return statement.order_by(Track.created_at, Track.id).limit(limit + 1)
+
+
+def music_track_rows_to_page(
+        music_track_rows: Sequence[Row],
+        base_url: str,
+        limit: int | None,
+) -> tuple[list[dict[str, str | int]], Row | None]:
+    """
+    Turns the rows selected by `select_music_track_list` or `select_music_track_page` into a page.
+
+    Args:
+        music_track_rows (Sequence[Row]): The selected rows, including the extra one.
+        base_url (str): The base URL used to generate absolute URLs for audio and cover files.
+        limit (int | None): The page size; None for a page of every track.
+
+    Returns:
+        tuple[list[dict[str, str | int]], Row | None]: The tracks of the page, and its last
+            row if there is a next page, else None.
+    """
+    if limit is not None and len(music_track_rows) > limit:
+        music_track_rows = music_track_rows[:limit]
+        last_music_track_row = music_track_rows[-1]
+
+    else:
+        last_music_track_row = None
+
+    return music_track_rows_to_json(music_track_rows, base_url), last_music_track_row
+
+
 def get_music_track_list(
         db: SessionLocal,
         base_url: str,
         offset: int = 0,
         limit: int = 100,
         get_all: bool = False,
-) -> tuple[list[dict[str, str | int]], int]:
+        with_total: bool = True,
+) -> tuple[list[dict[str, str | int]], int | None, int | None]:
     """
     Retrieves a paginated list of music tracks from the database and returns it as a list of dictionaries.
 
@@ -35,42 +427,122 @@ def get_music_track_list(
         offset (int, optional): Offset for pagination. Defaults to 0.
         limit (int, optional): Maximum number of items to return. Defaults to 100.
         get_all (bool, optional): If True, ignores pagination and returns all tracks.
+        with_total (bool, optional): If False, skips counting the tracks. Defaults to True.
 
     Returns:
-        tuple[list[dict[str, str | int]], int]:
+        tuple[list[dict[str, str | int]], int | None, int | None]:
             - A list of dictionaries representing music tracks.
-            - The total number of tracks in the database.
+            - The total number of tracks in the database, or None if `with_total` is False.
+            - The offset of the next page, or None on the last page.
     """
-    if not get_all:
-        music_track_list = db.query(Track).offset(offset).limit(limit).all()
+    music_track_list = db.execute(select_music_track_list(offset, limit, get_all)).all()
+    total_music_tracks = count_music_tracks(db) if with_total else None
+    music_track_list_json, last_music_track_row = music_track_rows_to_page(
+        music_track_list, base_url, None if get_all else limit,
+    )
+    next_offset = None if last_music_track_row is None else offset + limit
 
-    else:
-        music_track_list = db.query(Track).all()
+    return music_track_list_json, total_music_tracks, next_offset
 
-    total_music_tracks = db.query(Track).count()
-    music_track_list_json = []
 
-    for music_track in music_track_list:
-        if music_track.cover_path:
-            music_track_cover_path = Path(music_track.cover_path)
-            music_track_cover_url = f"{base_url + URL_MUSIC_COVER + music_track_cover_path.name}"
+async def get_music_track_list_async(
+        db: AsyncSession,
+        base_url: str,
+        offset: int = 0,
+        limit: int = 100,
+        get_all: bool = False,
+        with_total: bool = True,
+) -> tuple[list[dict[str, str | int]], int | None, int | None]:
+    """
+    Async variant of `get_music_track_list`.
 
-        else:
-            music_track_cover_url = None
+    Args:
+        db (AsyncSession): The active SQLAlchemy async database session.
+        base_url (str): The base URL used to generate absolute URLs for audio and cover files.
+        offset (int, optional): Offset for pagination. Defaults to 0.
+        limit (int, optional): Maximum number of items to return. Defaults to 100.
+        get_all (bool, optional): If True, ignores pagination and returns all tracks.
+        with_total (bool, optional): If False, skips counting the tracks. Defaults to True.
 
-        mime_type, _ = mimetypes.guess_type(music_track.path)
+    Returns:
+        tuple[list[dict[str, str | int]], int | None, int | None]: As `get_music_track_list`.
+    """
+    music_track_list = (await db.execute(select_music_track_list(offset, limit, get_all))).all()
+    total_music_tracks = await count_music_tracks_async(db) if with_total else None
+    music_track_list_json, last_music_track_row = music_track_rows_to_page(
+        music_track_list, base_url, None if get_all else limit,
+    )
+    next_offset = None if last_music_track_row is None else offset + limit
 
-        music_track_list_json.append({
-            "id": music_track.id,
-            "title": music_track.title,
-            "artist": music_track.artist,
-            "url": f"{base_url}{URL_MUSIC_STREAM}{music_track.id}",
-            "cover_url": music_track_cover_url,
-            "duration": music_track.duration,
-            "mime_type": mime_type,
-        })
+    return music_track_list_json, total_music_tracks, next_offset
+
+
+def get_music_track_page(
+        db: SessionLocal,
+        base_url: str,
+        cursor: str | None = None,
+        limit: int = 100,
+        with_total: bool = True,
+) -> tuple[list[dict[str, str | int]], int | None, str | None]:
+    """
+    Retrieves a page of music tracks using keyset pagination.
+
+    Unlike `get_music_track_list`, the page is located by seeking on the
+    `(created_at, id)` index, so deep pages are as cheap as the first one.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        base_url (str): The base URL used to generate absolute URLs for audio and cover files.
+        cursor (str | None, optional): `next_cursor` of the previous page; None for the first page.
+        limit (int, optional): Maximum number of items to return. Defaults to 100.
+        with_total (bool, optional): If False, skips counting the tracks. Defaults to True.
 
-    return music_track_list_json, total_music_tracks
+    Returns:
+        tuple[list[dict[str, str | int]], int | None, str | None]:
+            - A list of dictionaries representing music tracks.
+            - The total number of tracks in the database, or None if `with_total` is False.
+            - The cursor of the next page, or None on the last page.
+
+    Raises:
+        InvalidCursor: If `cursor` is malformed.
+    """
+    music_track_list = db.execute(select_music_track_page(cursor, limit)).all()
+    total_music_tracks = count_music_tracks(db) if with_total else None
+    music_track_list_json, last_music_track_row = music_track_rows_to_page(music_track_list, base_url, limit)
+    next_cursor = None if last_music_track_row is None else encode_cursor(last_music_track_row)
+
+    return music_track_list_json, total_music_tracks, next_cursor
+
+
+async def get_music_track_page_async(
+        db: AsyncSession,
+        base_url: str,
+        cursor: str | None = None,
+        limit: int = 100,
+        with_total: bool = True,
+) -> tuple[list[dict[str, str | int]], int | None, str | None]:
+    """
+    Async variant of `get_music_track_page`.
+
+    Args:
+        db (AsyncSession): The active SQLAlchemy async database session.
+        base_url (str): The base URL used to generate absolute URLs for audio and cover files.
+        cursor (str | None, optional): `next_cursor` of the previous page; None for the first page.
+        limit (int, optional): Maximum number of items to return. Defaults to 100.
+        with_total (bool, optional): If False, skips counting the tracks. Defaults to True.
+
+    Returns:
+        tuple[list[dict[str, str | int]], int | None, str | None]: As `get_music_track_page`.
+
+    Raises:
+        InvalidCursor: If `cursor` is malformed.
+    """
+    music_track_list = (await db.execute(select_music_track_page(cursor, limit))).all()
+    total_music_tracks = await count_music_tracks_async(db) if with_total else None
+    music_track_list_json, last_music_track_row = music_track_rows_to_page(music_track_list, base_url, limit)
+    next_cursor = None if last_music_track_row is None else encode_cursor(last_music_track_row)
+
+    return music_track_list_json, total_music_tracks, next_cursor
 
 
 def get_music_track(track_id: str, db: SessionLocal) -> Track | None:
@@ -89,47 +561,391 @@ def get_music_track(track_id: str, db: SessionLocal) -> Track | None:
     return music_track
 
 
-def save_music_track(
+def find_music_track_by_sha256(db: SessionLocal, music_track_sha256: str) -> Track | None:
+    """
+    Finds a track whose audio has the given content hash.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        music_track_sha256 (str): Hex SHA-256 digest of the audio.
+
+    Returns:
+        Track | None: The oldest such track, or None if the content is not in the library.
+    """
+    return (
+        db.query(Track)
+        .filter(Track.sha256 == music_track_sha256)
+        .order_by(Track.created_at, Track.id)
+        .first()
+    )
+
+
+def release_music_track_files(
         db: SessionLocal,
-        music_track_binary: bytes,
+        music_track_path: str,
+        music_track_cover_path: str | None = None,
+        music_track_cover_sizes: str | None = None,
+        variant_paths: Iterable[str] = (),
+        hls_path: str | None = None,
+) -> None:
+    """
+    Deletes the stored files of a track that no Track row references any more.
+
+    Files are content-addressed and shared between tracks with the same audio or
+    cover; the rows referencing a path are its reference count.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        music_track_path (str): `Track.path` of the audio.
+        music_track_cover_path (str | None, optional): `Track.cover_path`.
+        music_track_cover_sizes (str | None, optional): `Track.cover_sizes`.
+        variant_paths (Iterable[str], optional): `TrackVariant.path` of the track's variants.
+        hls_path (str | None, optional): `Track.hls_path`.
+    """
+    if not db.query(Track.id).filter(Track.path == music_track_path).first():
+        release_content_path(DIR_DATA / music_track_path, DIR_MUSIC)
+
+        # Variants and HLS renditions are derived from the audio, so they go with it.
+        for variant_path in variant_paths:
+            release_content_path(DIR_DATA / variant_path, DIR_MUSIC_VARIANT)
+
+        if hls_path:
+            release_content_path((DIR_DATA / hls_path).parent, DIR_MUSIC_HLS)
+
+    if music_track_cover_path and not db.query(Track.id).filter(Track.cover_path == music_track_cover_path).first():
+        if music_track_cover_sizes:
+            music_track_cover_sha256 = get_music_track_cover_sha256(music_track_cover_path)
+
+            for size in music_track_cover_sizes.split(","):
+                for cover_format in COVER_FORMATS:
+                    release_content_path(
+                        get_music_track_cover_path(music_track_cover_sha256, size, cover_format), DIR_MUSIC_COVER,
+                    )
+
+        else:
+            release_content_path(DIR_DATA / music_track_cover_path, DIR_MUSIC_COVER)
+
+
+def delete_music_track(db: SessionLocal, track_id: str) -> bool:
+    """
+    Deletes a track, and the files no other track references.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        track_id (str): The UUID of the track.
+
+    Returns:
+        bool: False if the track does not exist.
+    """
+    music_track = get_music_track(track_id, db)
+    if music_track is None:
+        return False
+
+    variant_paths = [path for path, in db.query(TrackVariant.path).filter(TrackVariant.track_id == track_id)]
+
+    db.query(TrackVariant).filter(TrackVariant.track_id == track_id).delete()
+    db.query(TrackFingerprintHash).filter(TrackFingerprintHash.track_id == track_id).delete()
+    db.query(TrackFingerprint).filter(TrackFingerprint.track_id == track_id).delete()
+    db.delete(music_track)
+    db.commit()
+    bump_library_version()
+    invalidate_music_track_file(track_id)
+    music_track_cover_cache.discard_prefix(f"{track_id}-")
+
+    release_music_track_files(
+        db,
+        music_track_path=music_track.path,
+        music_track_cover_path=music_track.cover_path,
+        music_track_cover_sizes=music_track.cover_sizes,
+        variant_paths=variant_paths,
+        hls_path=music_track.hls_path,
+    )
+
+    return True
+
+
+async def get_music_track_async(track_id: str, db: AsyncSession) -> Track | None:
+    """
+    Async variant of `get_music_track`.
+
+    Args:
+        track_id (str): The UUID of the track.
+        db (AsyncSession): The active SQLAlchemy async database session.
+
+    Returns:
+        Track | None: The Track object if found, otherwise None.
+    """
+    return await db.get(Track, track_id)
+
+
+async def get_music_track_waveform_async(track_id: str, db: AsyncSession) -> dict[str, Any] | None:
+    """
+    Retrieves the analysis of a track, waveform included.
+
+    Args:
+        track_id (str): The UUID of the track.
+        db (AsyncSession): The active SQLAlchemy async database session.
+
+    Returns:
+        dict[str, Any] | None: The track's `duration`, `loudness`, `peak`, `waveform`, `etag`
+            and `created_at`, or None if the track does not exist or was not analyzed.
+    """
+    row = (await db.execute(
+        select(Track.duration, Track.loudness, Track.peak, Track.waveform, Track.etag, Track.created_at)
+        .where(Track.id == track_id)
+    )).first()
+
+    if row is None or row.waveform is None:
+        return None
+
+    return row._asdict()
+
+
+async def get_music_track_file(track_id: str, db: AsyncSession) -> MusicTrackFile | None:
+    """
+    Resolves the audio file of a track for streaming, from cache when possible.
+
+    A player seeking through a track sends a burst of range requests for it;
+    only the first one queries the database. Sizes and media types are stored
+    with the track and its variants, so the files are not touched; only a track
+    uploaded before sizes were stored, and not yet backfilled, is stat-ed.
+    The track's variants are resolved along with it.
+
+    Entries are kept with the library version they were resolved at, so a track
+    deleted or re-ingested by another process isn't served from stale details
+    once that process bumped the version (see `bump_library_version`).
+
+    Args:
+        track_id (str): The UUID of the track.
+        db (AsyncSession): The active SQLAlchemy async database session.
+
+    Returns:
+        MusicTrackFile | None: The resolved file, or None if the track or its file does not exist.
+    """
+    library_version = await music_track_list_cache.get_version_async("library")
+    cached = music_track_file_cache.get(track_id)
+
+    if cached is not None and cached[0] == library_version:
+        music_track_file = cached[1]
+
+    else:
+        music_track = await get_music_track_async(track_id, db)
+        if music_track is None:
+            return None
+
+        path_to_music_track = DIR_DATA / music_track.path
+
+        if music_track.size is not None:
+            music_track_size = music_track.size
+
+        else:
+            # Not backfilled yet (see `backfill_tracks.py`).
+            try:
+                music_track_size = (await to_thread.run_sync(os.stat, path_to_music_track)).st_size
+
+            except FileNotFoundError:
+                return None
+
+        music_track_variants = tuple(
+            MusicTrackFile(
+                path=DIR_DATA / variant.path,
+                size=variant.size,
+                media_type=variant.media_type,
+                etag=variant.etag,
+                created_at=variant.created_at,
+                quality=variant.quality,
+                codec=variant.codec,
+            )
+            for variant in await db.scalars(select(TrackVariant).where(TrackVariant.track_id == track_id))
+        )
+
+        music_track_file = MusicTrackFile(
+            path=path_to_music_track,
+            size=music_track_size,
+            media_type=music_track.mime_type or "audio/mpeg",
+            etag=music_track.etag,
+            created_at=music_track.created_at,
+            variants=music_track_variants,
+        )
+        music_track_file_cache.set(track_id, (library_version, music_track_file))
+
+    return music_track_file
+
+
+def invalidate_music_track_file(track_id: str) -> None:
+    """Drops the cached file details of a track; call when its file or row changes, or its file is gone."""
+    music_track_file_cache.invalidate(track_id)
+
+
+def ingest_music_track_file(
+        music_track_id: str,
+        path_to_music_track_file: Path,
+        music_track_sha256: str,
         music_track_title: str | None = None,
         music_track_artist: str | None = None,
         music_track_cover_binary: bytes | None = None,
-):
-    path_to_track_music = DIR_MUSIC / (str(uuid4()) + ".mp3")
-    path_to_track_music_cover = DIR_MUSIC_COVER / (str(uuid4()) + ".jpg")
+) -> dict[str, Any]:
+    """
+    Moves an uploaded audio file into the library and extracts the data for its Track row.
+
+    Does no database work and takes only picklable arguments, so it can run in the
+    ingestion process pool. The audio and cover files are content-addressed (see
+    `get_content_path`): content already in the library is not stored again, and
+    re-running an interrupted ingestion is safe.
+
+    Args:
+        music_track_id (str): The UUID of the new track.
+        path_to_music_track_file (Path): The uploaded audio, on the same filesystem as `DIR_MUSIC`.
+        music_track_sha256 (str): Hex SHA-256 digest of the audio.
+        music_track_title (str | None, optional): Title overriding the ID3 tag.
+        music_track_artist (str | None, optional): Artist overriding the ID3 tag.
+        music_track_cover_binary (bytes | None, optional): Cover overriding the embedded one.
+
+    Returns:
+        dict[str, Any]: Column values for the new `Track`.
+    """
+    # Imported here: mutagen and NumPy are only needed once a track is ingested.
+    from .metadata import MusicTrackMetadata
+
+    path_to_track_music = get_content_path(DIR_MUSIC, music_track_sha256, ".mp3")
 
-    with open(path_to_track_music, "wb") as file:
-        file.write(music_track_binary)
+    if not path_to_music_track_file.exists() and path_to_track_music.exists():
+        # An interrupted earlier attempt already moved the file into place.
+        path_to_music_track_file = path_to_track_music
 
     music_track_metadata = MusicTrackMetadata(
-        path_to_music_track=path_to_track_music,
+        path_to_music_track=path_to_music_track_file,
         music_track_title=music_track_title,
         music_track_artist=music_track_artist,
         music_track_cover_binary=music_track_cover_binary,
+        analyze_audio=True,
     )
 
     if music_track_metadata["cover_bytes"]:
-        with open(path_to_track_music_cover, "wb") as file:
-            file.write(music_track_metadata["cover_bytes"])
+        music_track_cover_sha256 = hashlib.sha256(music_track_metadata["cover_bytes"]).hexdigest()
+        music_track_cover_sizes = make_music_track_covers(music_track_cover_sha256, music_track_metadata["cover_bytes"])
+
+    else:
+        music_track_cover_sizes = []
+
+    if music_track_cover_sizes:
+        # The largest JPEG, for clients that only know `cover_url`.
+        path_to_track_music_cover = get_music_track_cover_path(
+            music_track_cover_sha256, music_track_cover_sizes[0], "jpeg",
+        )
 
     else:
         path_to_track_music_cover = None
 
+    if path_to_music_track_file != path_to_track_music:
+        store_content_file(path_to_music_track_file, path_to_track_music)
+
     # Convert to relative paths for database storage
     path_to_track_music = get_relative_path(path_to_track_music)
 
     if path_to_track_music_cover is not None:
+        music_track_cover_name = path_to_track_music_cover.relative_to(DIR_MUSIC_COVER).as_posix()
         path_to_track_music_cover = get_relative_path(path_to_track_music_cover)
 
-    # Create Track object
-    music = Track(
-        title=music_track_metadata["title"],
-        artist=music_track_metadata["artist"],
-        path=path_to_track_music,
-        cover_path=path_to_track_music_cover,
-        duration=music_track_metadata["audio_duration"],
+    else:
+        music_track_cover_name = None
+
+    return {
+        "id": music_track_id,
+        "title": music_track_metadata["title"],
+        "artist": music_track_metadata["artist"],
+        "path": path_to_track_music,
+        "cover_path": path_to_track_music_cover,
+        "cover_sizes": ",".join(map(str, music_track_cover_sizes)) or None,
+        "cover_name": music_track_cover_name,
+        "duration": music_track_metadata["audio_duration"],
+        "etag": f"{music_track_id}-{music_track_sha256[:16]}",
+        "sha256": music_track_sha256,
+        "loudness": music_track_metadata["loudness"],
+        "peak": music_track_metadata["peak"],
+        "waveform": music_track_metadata["waveform"],
+        "mime_type": music_track_metadata["mime_type"],
+        "size": music_track_metadata["size"],
+        "bitrate": music_track_metadata["bitrate"],
+        "sample_rate": music_track_metadata["sample_rate"],
+        "codec": music_track_metadata["codec"],
+    }
+
+
+def save_music_track(
+        db: SessionLocal,
+        music_track_file: StreamedFile,
+        music_track_title: str | None = None,
+        music_track_artist: str | None = None,
+        music_track_cover_binary: bytes | None = None,
+) -> Track:
+    """
+    Stores an uploaded music track and creates its database record, synchronously.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        music_track_file (StreamedFile): The uploaded audio, fully written and closed.
+        music_track_title (str | None, optional): Title overriding the ID3 tag.
+        music_track_artist (str | None, optional): Artist overriding the ID3 tag.
+        music_track_cover_binary (bytes | None, optional): Cover overriding the embedded one.
+
+    Returns:
+        Track: The created track.
+    """
+    music_track_fields = ingest_music_track_file(
+        music_track_id=str(uuid4()),
+        path_to_music_track_file=music_track_file.path,
+        music_track_sha256=music_track_file.sha256,
+        music_track_title=music_track_title,
+        music_track_artist=music_track_artist,
+        music_track_cover_binary=music_track_cover_binary,
     )
 
+    # Create Track object
+    music = Track(**music_track_fields)
+
     db.add(music)
     db.commit()
+    bump_library_version()
+    invalidate_music_track_file(music.id)
+
+    return music
+
+
+async def save_music_track_async(
+        db: AsyncSession,
+        music_track_file: StreamedFile,
+        music_track_title: str | None = None,
+        music_track_artist: str | None = None,
+        music_track_cover_binary: bytes | None = None,
+) -> Track:
+    """
+    Async variant of `save_music_track`. The file work runs in a worker thread.
+
+    Args:
+        db (AsyncSession): The active SQLAlchemy async database session.
+        music_track_file (StreamedFile): The uploaded audio, fully written and closed.
+        music_track_title (str | None, optional): Title overriding the ID3 tag.
+        music_track_artist (str | None, optional): Artist overriding the ID3 tag.
+        music_track_cover_binary (bytes | None, optional): Cover overriding the embedded one.
+
+    Returns:
+        Track: The created track.
+    """
+    music_track_fields = await to_thread.run_sync(lambda: ingest_music_track_file(
+        music_track_id=str(uuid4()),
+        path_to_music_track_file=music_track_file.path,
+        music_track_sha256=music_track_file.sha256,
+        music_track_title=music_track_title,
+        music_track_artist=music_track_artist,
+        music_track_cover_binary=music_track_cover_binary,
+    ))
+
+    music = Track(**music_track_fields)
+
+    db.add(music)
+    await db.commit()
+    await to_thread.run_sync(bump_library_version)
+    invalidate_music_track_file(music.id)
+
+    return music
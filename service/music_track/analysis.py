@@ -0,0 +1,208 @@
+"""
+Loudness and waveform analysis of tracks, computed once at ingestion.
+
+The audio is decoded by ffmpeg to 24 kHz stereo PCM and consumed in blocks, so
+memory use doesn't depend on the track length. For every 100 ms of audio the
+analysis keeps the K-weighted energy of each channel, and for every 10 ms the
+peak amplitude:
+
+    - the integrated loudness follows ITU-R BS.1770: 400 ms blocks every 100 ms,
+      gated at -70 LUFS and then 10 LU under the mean. The K-weighting filter is
+      applied in the frequency domain (one FFT per 100 ms, per channel), so the
+      whole analysis is a handful of NumPy operations per block;
+    - the waveform is the peak of each of `WAVEFORM_BUCKETS` equal spans of the
+      track, quantized to one byte.
+
+Without ffmpeg, tracks are simply not analyzed.
+"""
+
+from pathlib import Path
+from typing import Any
+import subprocess
+import threading
+
+import numpy as np
+
+from common.constants import FFMPEG_TIMEOUT, WAVEFORM_BUCKETS
+from .transcode import get_ffmpeg_binary
+
+
+SAMPLE_RATE = 24000
+CHANNELS = 2
+SUBBLOCK_SIZE = 2400  # 100 ms: the hop of the 400 ms gating blocks
+SUBBLOCKS_PER_BLOCK = 4
+PEAK_SIZE = 240  # 10 ms: the finest waveform resolution
+CHUNK_SIZE = SUBBLOCK_SIZE * 100  # 10 s decoded at a time
+
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+# The two biquads of the K-weighting filter (high shelf, then high-pass), as specified at 48 kHz.
+K_WEIGHTING_STAGES = (
+    ((1.53512485958697, -2.69169618940638, 1.19839281085285), (1.0, -1.69065929318241, 0.73248077421585)),
+    ((1.0, -2.0, 1.0), (1.0, -1.99004745483398, 0.99007225036621)),
+)
+
+
+def get_energy_weights() -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: Weights turning the `rfft` power spectrum of a 100 ms subblock into the
+            mean square of its K-weighted samples (Parseval).
+    """
+    frequencies = np.fft.rfftfreq(SUBBLOCK_SIZE, 1 / SAMPLE_RATE)
+    z = np.exp(-2j * np.pi * frequencies / 48000)[:, None] ** np.arange(3)
+
+    power_response = np.ones(len(frequencies))
+    for numerator, denominator in K_WEIGHTING_STAGES:
+        power_response *= np.abs((z @ numerator) / (z @ denominator)) ** 2
+
+    # Every bin but DC and Nyquist stands for a pair of conjugate bins.
+    bin_counts = np.full(len(frequencies), 2.0)
+    bin_counts[[0, -1]] = 1.0
+
+    return power_response * bin_counts / SUBBLOCK_SIZE ** 2
+
+
+ENERGY_WEIGHTS = get_energy_weights()
+
+
+def loudness(energy: np.ndarray | float) -> np.ndarray | float:
+    """Converts the summed channel mean squares of a block to LUFS."""
+    with np.errstate(divide="ignore"):
+        return -0.691 + 10 * np.log10(energy)
+
+
+class AudioAnalyzer:
+    """
+    Accumulates the loudness and waveform of PCM fed in blocks.
+
+    Every block but the last must hold a whole number of subblocks; the energy of
+    a trailing partial subblock is ignored, as BS.1770 ignores partial blocks.
+    """
+
+    def __init__(self):
+        self._energies: list[np.ndarray] = []
+        self._peaks: list[np.ndarray] = []
+
+    def add(self, samples: np.ndarray) -> None:
+        """
+        Args:
+            samples (np.ndarray): Interleaved stereo samples (`int16`) at `SAMPLE_RATE`.
+        """
+        samples = samples[:len(samples) - len(samples) % CHANNELS]
+
+        subblock_count = len(samples) // (SUBBLOCK_SIZE * CHANNELS)
+        if subblock_count:
+            # Channels first and contiguous: the FFT runs over the last axis.
+            subblocks = np.ascontiguousarray(
+                samples[:subblock_count * SUBBLOCK_SIZE * CHANNELS]
+                .reshape(subblock_count, SUBBLOCK_SIZE, CHANNELS)
+                .transpose(0, 2, 1),
+                dtype=np.float64,
+            ) / 32768
+            power = np.abs(np.fft.rfft(subblocks, axis=-1)) ** 2
+            self._energies.append(power @ ENERGY_WEIGHTS)
+
+        # Interleaved samples of both channels, one row per 10 ms; min and max avoid abs(-32768) overflowing.
+        padding = -len(samples) % (PEAK_SIZE * CHANNELS)
+        rows = np.pad(samples, (0, padding)).reshape(-1, PEAK_SIZE * CHANNELS)
+        amplitudes = np.maximum(rows.max(axis=1).astype(np.int32), -rows.min(axis=1).astype(np.int32))
+        self._peaks.append(amplitudes / 32768)
+
+    def integrated_loudness(self) -> float | None:
+        """
+        Returns:
+            float | None: Gated integrated loudness in LUFS, or None for silence or under 400 ms.
+        """
+        if not self._energies:
+            return None
+
+        energies = np.concatenate(self._energies)
+        if len(energies) < SUBBLOCKS_PER_BLOCK:
+            return None
+
+        block_energies = (
+            np.lib.stride_tricks.sliding_window_view(energies, SUBBLOCKS_PER_BLOCK, axis=0)
+            .mean(axis=-1)
+            .sum(axis=1)
+        )
+
+        block_energies = block_energies[loudness(block_energies) > ABSOLUTE_GATE]
+        if not len(block_energies):
+            return None
+
+        relative_gate = loudness(block_energies.mean()) + RELATIVE_GATE
+        block_energies = block_energies[loudness(block_energies) > relative_gate]
+
+        return float(loudness(block_energies.mean()))
+
+    def waveform(self) -> bytes:
+        """
+        Returns:
+            bytes: Up to `WAVEFORM_BUCKETS` peaks, 0-255 for 0 dBFS; fewer for very short tracks.
+        """
+        peaks = np.concatenate(self._peaks) if self._peaks else np.empty(0)
+        if not len(peaks):
+            return b""
+
+        bucket_starts = np.linspace(0, len(peaks), min(WAVEFORM_BUCKETS, len(peaks)), endpoint=False).astype(int)
+        bucket_peaks = np.maximum.reduceat(peaks, bucket_starts)
+
+        return np.round(np.clip(bucket_peaks, 0.0, 1.0) * 255).astype(np.uint8).tobytes()
+
+    def peak(self) -> float:
+        """
+        Returns:
+            float: The highest sample amplitude, 1.0 for 0 dBFS.
+        """
+        return float(max((peaks.max(initial=0.0) for peaks in self._peaks), default=0.0))
+
+
+def analyze_music_track_file(path_to_music_track_file: Path) -> dict[str, Any] | None:
+    """
+    Measures the loudness and waveform of an audio file.
+
+    Does no database work, so it can run in the ingestion process pool.
+
+    Args:
+        path_to_music_track_file (Path): The audio file.
+
+    Returns:
+        dict[str, Any] | None: `loudness` (LUFS, None for silence), `peak` and `waveform`,
+            or None without ffmpeg or if the file can't be decoded.
+    """
+    ffmpeg_binary = get_ffmpeg_binary()
+    if ffmpeg_binary is None:
+        return None
+
+    command = [
+        ffmpeg_binary, "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", str(path_to_music_track_file),
+        "-map", "0:a:0", "-ac", str(CHANNELS), "-ar", str(SAMPLE_RATE), "-f", "s16le", "-",
+    ]
+    analyzer = AudioAnalyzer()
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    timer = threading.Timer(FFMPEG_TIMEOUT, process.kill)
+    timer.start()
+
+    try:
+        while chunk := process.stdout.read(CHUNK_SIZE * CHANNELS * 2):
+            analyzer.add(np.frombuffer(chunk[:len(chunk) - len(chunk) % 2], dtype="<i2"))
+
+    finally:
+        timer.cancel()
+        process.stdout.close()
+        process.wait()
+
+    if process.returncode != 0:
+        return None
+
+    music_track_loudness = analyzer.integrated_loudness()
+
+    return {
+        "loudness": round(music_track_loudness, 2) if music_track_loudness is not None else None,
+        "peak": round(analyzer.peak(), 4),
+        "waveform": analyzer.waveform(),
+    }
@@ -0,0 +1,159 @@
+"""
+Cover thumbnails, rendered once at ingestion.
+
+Every cover is stored in each size of `TRACK_COVER_SIZES` (longest side, in
+pixels; never upscaled), as WebP and as a JPEG fallback, so the track list can
+show 64px thumbnails without downloading full-size artwork. Other widths are
+rendered on request from the largest stored cover.
+
+Thumbnails are content-addressed by the SHA-256 of the source image: the tracks
+of an album sharing one embedded cover share one set of files, rendered once.
+"""
+
+from pathlib import Path
+from typing import Any
+import io
+import os
+
+from ten_utils.log import Logger
+
+from common.constants import DIR_MUSIC_COVER, TRACK_COVER_QUALITY, TRACK_COVER_SIZES
+from common.metrics import INGEST_STAGE_DURATION
+from .storage import get_content_path
+
+
+logger = Logger(__name__)
+
+# Format name mapped to its file extension and Pillow save options.
+COVER_FORMATS: dict[str, dict[str, Any]] = {
+    "webp": {
+        "extension": ".webp",
+        "options": {"format": "WEBP", "quality": TRACK_COVER_QUALITY, "method": 4},
+    },
+    "jpeg": {
+        "extension": ".jpg",
+        "options": {"format": "JPEG", "quality": TRACK_COVER_QUALITY, "optimize": True, "progressive": True},
+    },
+}
+
+# Resize in two steps: a fast integer `reduce()` to within 3x of the target, then a filtered resample.
+REDUCING_GAP = 3.0
+
+
+def get_music_track_cover_path(cover_sha256: str, size: int, cover_format: str) -> Path:
+    """
+    Args:
+        cover_sha256 (str): Hex SHA-256 digest of the source image.
+        size (int): A size of `TRACK_COVER_SIZES`.
+        cover_format (str): A key of `COVER_FORMATS`.
+
+    Returns:
+        Path: Where the cover of that size and format is stored.
+    """
+    return get_content_path(DIR_MUSIC_COVER, cover_sha256, f"-{size}{COVER_FORMATS[cover_format]['extension']}")
+
+
+def get_music_track_cover_sha256(cover_path: str) -> str:
+    """
+    Args:
+        cover_path (str): `Track.cover_path` of a track with thumbnails (`cover_sizes` set).
+
+    Returns:
+        str: The digest its thumbnails are stored under.
+    """
+    return Path(cover_path).name.rsplit("-", 1)[0]
+
+
+def make_music_track_covers(cover_sha256: str, cover_bytes: bytes) -> list[int]:
+    """
+    Renders a cover in every size and format, unless these thumbnails already exist.
+
+    The image is decoded once, with JPEG's DCT scaling (`draft`) when the largest
+    size allows it, and each size is then shrunk from the previous, larger one.
+    Does no database work, so it can run in the ingestion process pool.
+
+    Args:
+        cover_sha256 (str): Hex SHA-256 digest of `cover_bytes`.
+        cover_bytes (bytes): The source image, in any format Pillow reads.
+
+    Returns:
+        list[int]: The sizes available, largest first; empty if the image can't be decoded.
+    """
+    if all(
+            get_music_track_cover_path(cover_sha256, size, cover_format).exists()
+            for size in TRACK_COVER_SIZES
+            for cover_format in COVER_FORMATS
+    ):
+        return list(TRACK_COVER_SIZES)
+
+    with INGEST_STAGE_DURATION.labels("cover").time():
+        return render_music_track_covers(cover_sha256, cover_bytes)
+
+
+def render_music_track_covers(cover_sha256: str, cover_bytes: bytes) -> list[int]:
+    """The rendering part of `make_music_track_covers`, run whether or not the thumbnails exist."""
+    # Imported here: Pillow is only needed once a cover is rendered.
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        image = Image.open(io.BytesIO(cover_bytes))
+        image.draft("RGB", (TRACK_COVER_SIZES[0], TRACK_COVER_SIZES[0]))
+        image = image.convert("RGB")
+
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        # Past twice `Image.MAX_IMAGE_PIXELS`, Pillow refuses to decode the image at all.
+        logger.warning(f"Failed to decode cover {cover_sha256}: {exc}")
+        return []
+
+    get_content_path(DIR_MUSIC_COVER, cover_sha256).parent.mkdir(parents=True, exist_ok=True)
+
+    for size in TRACK_COVER_SIZES:
+        image.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+        for cover_format, cover_format_options in COVER_FORMATS.items():
+            path_to_cover = get_music_track_cover_path(cover_sha256, size, cover_format)
+            # Two jobs may render the same cover at once, so the scratch file is per process.
+            path_to_partial_cover = path_to_cover.with_name(f".{path_to_cover.name}.{os.getpid()}.part")
+
+            image.save(path_to_partial_cover, **cover_format_options["options"])
+            os.replace(path_to_partial_cover, path_to_cover)
+
+    return list(TRACK_COVER_SIZES)
+
+
+def resize_music_track_cover(path_to_source: Path, path_to_cover: Path, width: int, cover_format: str) -> bool:
+    """
+    Renders a cover at `width` pixels wide (never upscaled), atomically replacing `path_to_cover`.
+
+    Takes only picklable arguments, so it can run in a process pool.
+
+    Args:
+        path_to_source (Path): The cover to resize.
+        path_to_cover (Path): Where to write the result.
+        width (int): Target width in pixels; the height follows the aspect ratio.
+        cover_format (str): A key of `COVER_FORMATS`.
+
+    Returns:
+        bool: False if the source can't be decoded; nothing is written then.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(path_to_source) as image:
+            # A height of 1 leaves the DCT scale to the width alone.
+            image.draft("RGB", (width, 1))
+            image = image.convert("RGB")
+
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        # Tracks ingested before thumbnails were rendered have their full-size cover as the source.
+        logger.warning(f"Failed to decode cover {path_to_source.name}: {exc}")
+        return False
+
+    image.thumbnail((width, image.height), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+    # API workers share the cache directory, so the scratch file is per process.
+    path_to_partial_cover = path_to_cover.with_name(f".{path_to_cover.name}.{os.getpid()}.part")
+    image.save(path_to_partial_cover, **COVER_FORMATS[cover_format]["options"])
+    os.replace(path_to_partial_cover, path_to_cover)
+
+    return True
@@ -0,0 +1,220 @@
+"""
+Acoustic fingerprints, to spot re-encodes of tracks already in the library.
+
+A fingerprint follows Haitsma & Kalker: the audio is decoded to 11 kHz mono
+PCM, cut into overlapping frames, and every frame becomes a 32-bit word whose
+bits say whether the energy difference between adjacent bands (300-2000 Hz)
+grew or shrank since the previous frame. Re-encoding flips a minority of bits,
+so two encodes of a song have a low bit error rate (BER), unrelated songs ~0.5.
+
+Lookups use locality-sensitive hashing instead of comparing every pair: each
+fingerprint is summarised by `MINHASH_COUNT` MinHash values over the set of its
+(24-bit) words, stored as `TrackFingerprintHash` rows. Tracks sharing any of
+them are candidates, which are then confirmed by their BER.
+"""
+
+from typing import Any
+import subprocess
+
+import numpy as np
+from sqlalchemy import func
+
+from common.constants import FFMPEG_TIMEOUT, FINGERPRINT_MATCH_BER, FINGERPRINT_MAX_SECONDS
+from common.metrics import INGEST_STAGE_DURATION
+from database.models import TrackFingerprint, TrackFingerprintHash
+from database.config import SessionLocal
+from .transcode import get_ffmpeg_binary
+
+
+SAMPLE_RATE = 11025
+FRAME_SIZE = 2048  # 186 ms
+HOP_SIZE = 512  # 46 ms
+BAND_EDGES = np.geomspace(300, 2000, 34)  # 33 bands, 32 adjacent differences
+SILENCE_RATIO = 1e-6
+
+# Words keep their 24 lowest-band bits for hashing: exact matches survive re-encoding more often.
+HASH_WORD_MASK = (1 << 24) - 1
+MINHASH_COUNT = 64
+MIN_FINGERPRINT_WORDS = 32
+MAX_CANDIDATES = 20
+MAX_ALIGNMENT_OFFSET = 16
+
+# Multiply-shift hash functions of the MinHash, fixed so stored values stay comparable.
+MINHASH_MULTIPLIERS = np.random.default_rng(0x5EED).integers(1, 2 ** 63, MINHASH_COUNT, dtype=np.uint64) | np.uint64(1)
+
+# Band of every FFT bin, -1 outside 300-2000 Hz.
+FREQUENCY_BANDS = np.searchsorted(BAND_EDGES, np.fft.rfftfreq(FRAME_SIZE, 1 / SAMPLE_RATE)) - 1
+FREQUENCY_BANDS[FREQUENCY_BANDS >= len(BAND_EDGES) - 1] = -1
+
+
+def decode_pcm(path_to_music_track_file: str) -> np.ndarray | None:
+    """
+    Decodes the first `FINGERPRINT_MAX_SECONDS` of a file to mono float PCM at `SAMPLE_RATE`.
+
+    Args:
+        path_to_music_track_file (str): The audio file.
+
+    Returns:
+        np.ndarray | None: The samples in [-1, 1], or None without ffmpeg or on a decoding error.
+    """
+    ffmpeg_binary = get_ffmpeg_binary()
+    if ffmpeg_binary is None:
+        return None
+
+    command = [
+        ffmpeg_binary, "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", str(path_to_music_track_file),
+        "-map", "0:a:0", "-t", str(FINGERPRINT_MAX_SECONDS),
+        "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-",
+    ]
+
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, timeout=FFMPEG_TIMEOUT)
+
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return None
+
+    return np.frombuffer(result.stdout, dtype="<i2").astype(np.float32) / 32768
+
+
+def compute_fingerprint(samples: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        samples (np.ndarray): Mono PCM at `SAMPLE_RATE`.
+
+    Returns:
+        np.ndarray: One `uint32` word per non-silent frame (empty for clips under two frames).
+    """
+    frame_count = 1 + (len(samples) - FRAME_SIZE) // HOP_SIZE
+    if frame_count < 2:
+        return np.empty(0, dtype=np.uint32)
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_SIZE)[::HOP_SIZE][:frame_count]
+    power = np.abs(np.fft.rfft(frames * np.hanning(FRAME_SIZE), axis=1)) ** 2
+
+    in_band = FREQUENCY_BANDS >= 0
+    energy = np.zeros((frame_count, len(BAND_EDGES) - 1))
+    np.add.at(energy.T, FREQUENCY_BANDS[in_band], power[:, in_band].T)
+
+    band_differences = energy[:, :-1] - energy[:, 1:]
+    bits = (band_differences[1:] - band_differences[:-1]) > 0
+    words = (bits.astype(np.uint64) << np.arange(32, dtype=np.uint64)).sum(axis=1).astype(np.uint32)
+
+    frame_energy = power.sum(axis=1)[1:]
+    return words[frame_energy > frame_energy.max(initial=0.0) * SILENCE_RATIO]
+
+
+def compute_fingerprint_hashes(fingerprint: np.ndarray) -> list[int]:
+    """
+    Computes the LSH keys of a fingerprint: one MinHash per hash function, tagged with its index.
+
+    Args:
+        fingerprint (np.ndarray): Words from `compute_fingerprint`.
+
+    Returns:
+        list[int]: `MINHASH_COUNT` keys below 2 ** 30.
+    """
+    words = np.unique(fingerprint & np.uint32(HASH_WORD_MASK)).astype(np.uint64)
+    hashed = (words[None, :] * MINHASH_MULTIPLIERS[:, None]) >> np.uint64(40)
+
+    return [(index << 24) | int(value) for index, value in enumerate(hashed.min(axis=1))]
+
+
+def bit_error_rate(fingerprint: np.ndarray, other_fingerprint: np.ndarray) -> float:
+    """
+    Returns the lowest share of differing bits over alignments of up to `MAX_ALIGNMENT_OFFSET` frames.
+    """
+    best = 1.0
+
+    for offset in range(-MAX_ALIGNMENT_OFFSET, MAX_ALIGNMENT_OFFSET + 1):
+        left = fingerprint[max(offset, 0):]
+        right = other_fingerprint[max(-offset, 0):]
+        length = min(len(left), len(right))
+
+        if length >= MIN_FINGERPRINT_WORDS:
+            best = min(best, float(np.bitwise_count(left[:length] ^ right[:length]).sum()) / (32 * length))
+
+    return best
+
+
+def make_music_track_fingerprint(path_to_music_track_file: str) -> dict[str, Any] | None:
+    """
+    Fingerprints an audio file. Does no database work, so it can run in the ingestion process pool.
+
+    Args:
+        path_to_music_track_file (str): The audio file.
+
+    Returns:
+        dict[str, Any] | None: `fingerprint` (bytes) and `hashes` (list[int]), or None if
+            the file can't be decoded or is too short.
+    """
+    with INGEST_STAGE_DURATION.labels("fingerprint").time():
+        samples = decode_pcm(path_to_music_track_file)
+        if samples is None:
+            return None
+
+        fingerprint = compute_fingerprint(samples)
+        if len(fingerprint) < MIN_FINGERPRINT_WORDS:
+            return None
+
+        return {
+            "fingerprint": fingerprint.astype("<u4").tobytes(),
+            "hashes": compute_fingerprint_hashes(fingerprint),
+        }
+
+
+def find_near_duplicate(db: SessionLocal, music_track_fingerprint: dict[str, Any]) -> str | None:
+    """
+    Finds a track whose audio matches a fingerprint, e.g. another encode of the same song.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        music_track_fingerprint (dict[str, Any]): A result of `make_music_track_fingerprint`.
+
+    Returns:
+        str | None: Id of the closest track under `FINGERPRINT_MATCH_BER`, or None.
+    """
+    shared_hashes = func.count(TrackFingerprintHash.hash)
+    candidate_ids = [
+        track_id
+        for track_id, in (
+            db.query(TrackFingerprintHash.track_id)
+            .filter(TrackFingerprintHash.hash.in_(music_track_fingerprint["hashes"]))
+            .group_by(TrackFingerprintHash.track_id)
+            .order_by(shared_hashes.desc())
+            .limit(MAX_CANDIDATES)
+        )
+    ]
+    if not candidate_ids:
+        return None
+
+    fingerprint = np.frombuffer(music_track_fingerprint["fingerprint"], dtype="<u4")
+    best_track_id, best_bit_error_rate = None, FINGERPRINT_MATCH_BER
+
+    for track_id, candidate_fingerprint in (
+            db.query(TrackFingerprint.track_id, TrackFingerprint.fingerprint)
+            .filter(TrackFingerprint.track_id.in_(candidate_ids))
+    ):
+        candidate_bit_error_rate = bit_error_rate(fingerprint, np.frombuffer(candidate_fingerprint, dtype="<u4"))
+
+        if candidate_bit_error_rate < best_bit_error_rate:
+            best_track_id, best_bit_error_rate = track_id, candidate_bit_error_rate
+
+    return best_track_id
+
+
+def add_music_track_fingerprint(db: SessionLocal, track_id: str, music_track_fingerprint: dict[str, Any]) -> None:
+    """
+    Stores a track's fingerprint and LSH keys. The caller commits.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        track_id (str): The UUID of the track.
+        music_track_fingerprint (dict[str, Any]): A result of `make_music_track_fingerprint`.
+    """
+    db.merge(TrackFingerprint(track_id=track_id, fingerprint=music_track_fingerprint["fingerprint"]))
+    db.query(TrackFingerprintHash).filter(TrackFingerprintHash.track_id == track_id).delete()
+    db.add_all(
+        TrackFingerprintHash(hash=hash_value, track_id=track_id)
+        for hash_value in set(music_track_fingerprint["hashes"])
+    )
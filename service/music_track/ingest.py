@@ -0,0 +1,708 @@
+"""
+Background ingestion of uploaded music tracks.
+
+An upload is staged under `DIR_INGEST` and recorded as an `IngestJob` row, so the
+queue survives restarts. `IngestWorker` claims queued jobs and runs the CPU-heavy
+part (mutagen parsing and loudness analysis in `MusicTrackMetadata`, cover
+thumbnails, encoding, fingerprinting) in a process pool, keeping it off the event loop and out of the
+API process's GIL.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+from uuid import uuid4
+import asyncio
+import multiprocessing
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from ten_utils.log import Logger
+
+from common.constants import (
+    DIR_DATA,
+    DIR_INGEST,
+    DIR_MUSIC,
+    DIR_MUSIC_HLS,
+    INGEST_WORKERS,
+    INGEST_POLL_INTERVAL,
+    INGEST_JOB_TIMEOUT,
+    TRACK_VARIANT_CODECS,
+    TRACK_VARIANT_QUALITIES,
+)
+from common.helpers import get_relative_path
+from common.metrics import INGEST_JOBS, INGEST_STAGE_DURATION, capture_observations, replay_observations
+from database.models import IngestJob, Track, TrackFingerprint, TrackFingerprintHash, TrackVariant
+from database.config import SessionLocal
+from . import (
+    bump_library_version,
+    find_music_track_by_sha256,
+    ingest_music_track_file,
+    invalidate_music_track_file,
+    release_music_track_files,
+)
+from .storage import StreamedFile, get_content_path
+from .transcode import VARIANT_CODECS, get_music_track_variant_path, make_music_track_hls, make_music_track_variants
+
+
+logger = Logger(__name__)
+
+
+class IngestClaimLost(Exception):
+    """Raised in a job's worker once the job has been requeued, to stop working on it."""
+
+
+class IngestError(Exception):
+    """
+    Raised by `run_ingest_job` when a stage fails after the audio was stored.
+
+    Args:
+        error (str): Failure reason reported to the client.
+        music_track_fields (dict[str, Any]): Column values of the track, as far as they were made,
+            so the files already stored can be released.
+    """
+
+    def __init__(self, error: str, music_track_fields: dict[str, Any]):
+        # Both go in `args`, which is what survives pickling back from the process pool.
+        super().__init__(error, music_track_fields)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_ingest_job(
+        db: SessionLocal,
+        music_track_file: StreamedFile,
+        music_track_title: str | None = None,
+        music_track_artist: str | None = None,
+        music_track_cover_binary: bytes | None = None,
+) -> IngestJob:
+    """
+    Stages an uploaded track under `DIR_INGEST` and queues it for ingestion.
+
+    Audio already in the library (same SHA-256), uploaded without a cover of its
+    own, skips the queue: the new track shares the stored files and encodings and
+    the job is created done.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        music_track_file (StreamedFile): The uploaded audio, fully written and closed.
+        music_track_title (str | None, optional): Title overriding the ID3 tag.
+        music_track_artist (str | None, optional): Artist overriding the ID3 tag.
+        music_track_cover_binary (bytes | None, optional): Cover overriding the embedded one.
+
+    Returns:
+        IngestJob: The queued job.
+    """
+    if not music_track_cover_binary:
+        music_track = find_music_track_by_sha256(db, music_track_file.sha256)
+
+        if music_track is not None and (DIR_DATA / music_track.path).exists():
+            music_track_file.discard()
+            return complete_duplicate_ingest_job(db, music_track, music_track_title, music_track_artist)
+
+    job_id = str(uuid4())
+    DIR_INGEST.mkdir(exist_ok=True)
+
+    path_to_upload = DIR_INGEST / f"{job_id}.upload"
+    music_track_file.commit(path_to_upload)
+
+    if music_track_cover_binary:
+        path_to_cover_upload = DIR_INGEST / f"{job_id}.cover"
+        with open(path_to_cover_upload, "wb") as file:
+            file.write(music_track_cover_binary)
+
+    else:
+        path_to_cover_upload = None
+
+    job = IngestJob(
+        id=job_id,
+        status="queued",
+        progress=0,
+        upload_path=get_relative_path(path_to_upload),
+        upload_sha256=music_track_file.sha256,
+        cover_upload_path=get_relative_path(path_to_cover_upload) if path_to_cover_upload else None,
+        title=music_track_title,
+        artist=music_track_artist,
+    )
+
+    db.add(job)
+    db.commit()
+
+    return job
+
+
+def complete_duplicate_ingest_job(
+        db: SessionLocal,
+        music_track: Track,
+        music_track_title: str | None = None,
+        music_track_artist: str | None = None,
+) -> IngestJob:
+    """
+    Creates a track sharing the files of `music_track`, with a job that is already done.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        music_track (Track): A track with the same audio content.
+        music_track_title (str | None, optional): Title overriding the ID3 tag.
+        music_track_artist (str | None, optional): Artist overriding the ID3 tag.
+
+    Returns:
+        IngestJob: The completed job; its id is the new track's.
+    """
+    # Imported here, as in the functions below: mutagen and NumPy are only needed
+    # once a track is ingested, so the API process starts without them.
+    from .fingerprint import add_music_track_fingerprint
+    from .metadata import MusicTrackMetadata
+
+    job_id = str(uuid4())
+
+    if music_track_title is None or music_track_artist is None:
+        # The stored track may have been renamed by its uploader; the tags are this upload's defaults.
+        music_track_metadata = MusicTrackMetadata(path_to_music_track=DIR_DATA / music_track.path)
+        music_track_title = music_track_title or music_track_metadata["title"]
+        music_track_artist = music_track_artist or music_track_metadata["artist"]
+
+    db.add(Track(
+        id=job_id,
+        title=music_track_title,
+        artist=music_track_artist,
+        path=music_track.path,
+        cover_path=music_track.cover_path,
+        cover_sizes=music_track.cover_sizes,
+        cover_name=music_track.cover_name,
+        duration=music_track.duration,
+        etag=f"{job_id}-{music_track.sha256[:16]}",
+        sha256=music_track.sha256,
+        hls_path=music_track.hls_path,
+        loudness=music_track.loudness,
+        peak=music_track.peak,
+        waveform=music_track.waveform,
+        mime_type=music_track.mime_type,
+        size=music_track.size,
+        bitrate=music_track.bitrate,
+        sample_rate=music_track.sample_rate,
+        codec=music_track.codec,
+    ))
+    db.flush()
+
+    for variant in db.query(TrackVariant).filter(TrackVariant.track_id == music_track.id):
+        db.add(TrackVariant(
+            track_id=job_id,
+            quality=variant.quality,
+            codec=variant.codec,
+            bitrate=variant.bitrate,
+            media_type=variant.media_type,
+            path=variant.path,
+            size=variant.size,
+            etag=f"{job_id}-{variant.etag.rsplit('-', 1)[-1]}",
+        ))
+
+    music_track_fingerprint = db.get(TrackFingerprint, music_track.id)
+    if music_track_fingerprint is not None:
+        add_music_track_fingerprint(db, job_id, {
+            "fingerprint": music_track_fingerprint.fingerprint,
+            "hashes": [
+                hash_value
+                for hash_value, in db.query(TrackFingerprintHash.hash).filter(
+                    TrackFingerprintHash.track_id == music_track.id
+                )
+            ],
+        })
+
+    job = IngestJob(
+        id=job_id,
+        status="done",
+        progress=100,
+        upload_path=music_track.path,
+        upload_sha256=music_track.sha256,
+        title=music_track_title,
+        artist=music_track_artist,
+        track_id=job_id,
+        duplicate_of=music_track.id,
+    )
+    db.add(job)
+    db.commit()
+    bump_library_version()
+
+    return job
+
+
+def get_ingest_job(job_id: str, db: SessionLocal) -> IngestJob | None:
+    """
+    Retrieves an ingestion job by its ID.
+
+    Args:
+        job_id (str): The UUID of the job.
+        db (SessionLocal): The active SQLAlchemy database session.
+
+    Returns:
+        IngestJob | None: The job if found, otherwise None.
+    """
+    return db.query(IngestJob).filter(IngestJob.id == job_id).first()
+
+
+def requeue_stale_ingest_jobs(db: SessionLocal, timeout: float = INGEST_JOB_TIMEOUT) -> int:
+    """
+    Puts back jobs in `processing` that reported no progress for `timeout` seconds.
+
+    This recovers jobs whose worker died, e.g. on a restart. A job reports progress
+    between its ffmpeg runs, so `timeout` must exceed the longest of them (see
+    `INGEST_JOB_TIMEOUT`). A worker that is merely slow loses its claim: it stops at
+    its next progress report, and `complete_ingest_job` and `fail_ingest_job` ignore
+    its results. The files it already stored are content-addressed, so the next run
+    reuses them.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        timeout (float, optional): Seconds after which a processing job counts as stale.
+
+    Returns:
+        int: Number of jobs requeued.
+    """
+    result = db.execute(
+        update(IngestJob)
+        .where(IngestJob.status == "processing")
+        .where(IngestJob.updated_at < utcnow() - timedelta(seconds=timeout))
+        .values(status="queued", progress=0, claim_token=None, updated_at=utcnow())
+    )
+    db.commit()
+
+    return result.rowcount
+
+
+def claim_ingest_jobs(db: SessionLocal, limit: int) -> list[dict[str, Any]]:
+    """
+    Atomically moves up to `limit` queued jobs to `processing`.
+
+    Each job is claimed with a conditional UPDATE, so several API processes can
+    share one queue without processing a job twice. The claim token it sets goes in
+    the payload; the job's progress, completion and failure are only recorded under it.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        limit (int): Maximum number of jobs to claim.
+
+    Returns:
+        list[dict[str, Any]]: Picklable payloads for `run_ingest_job`.
+    """
+    queued_jobs = (
+        db.query(IngestJob)
+        .filter(IngestJob.status == "queued")
+        .order_by(IngestJob.created_at)
+        .limit(limit)
+        .all()
+    )
+    payloads = []
+
+    for job in queued_jobs:
+        claim_token = str(uuid4())
+        result = db.execute(
+            update(IngestJob)
+            .where(IngestJob.id == job.id)
+            .where(IngestJob.status == "queued")
+            .values(status="processing", progress=10, claim_token=claim_token, updated_at=utcnow())
+        )
+        db.commit()
+
+        if result.rowcount != 1:
+            continue
+
+        payloads.append({
+            "id": job.id,
+            "claim_token": claim_token,
+            "upload_path": str(DIR_DATA / job.upload_path),
+            "upload_sha256": job.upload_sha256,
+            "cover_upload_path": str(DIR_DATA / job.cover_upload_path) if job.cover_upload_path else None,
+            "title": job.title,
+            "artist": job.artist,
+        })
+
+    return payloads
+
+
+def update_ingest_job_progress(db: SessionLocal, job_id: str, claim_token: str, progress: int | None = None) -> bool:
+    """
+    Records that a job is still being worked on, so it isn't requeued as stale.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        job_id (str): The UUID of the job.
+        claim_token (str): The token the job was claimed under.
+        progress (int | None, optional): New completion percentage; None keeps it.
+
+    Returns:
+        bool: False if the job is no longer processing under this claim.
+    """
+    values = {"updated_at": utcnow()}
+    if progress is not None:
+        values["progress"] = progress
+
+    result = db.execute(
+        update(IngestJob)
+        .where(IngestJob.id == job_id)
+        .where(IngestJob.status == "processing")
+        .where(IngestJob.claim_token == claim_token)
+        .values(**values)
+    )
+    db.commit()
+
+    return result.rowcount == 1
+
+
+def complete_ingest_job(
+        db: SessionLocal,
+        job_id: str,
+        claim_token: str,
+        music_track_fields: dict[str, Any],
+        music_track_variant_fields: list[dict[str, Any]] = (),
+        music_track_fingerprint: dict[str, Any] | None = None,
+) -> bool:
+    """
+    Creates the Track (and its variants) produced by a job and marks the job done.
+
+    A track whose fingerprint matches one already in the library is still created;
+    the match is reported as the job's `duplicate_of`.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        job_id (str): The UUID of the job.
+        claim_token (str): The token the job was claimed under.
+        music_track_fields (dict[str, Any]): Track column values returned by `run_ingest_job`.
+        music_track_variant_fields (list[dict[str, Any]], optional): TrackVariant column values
+            returned by `run_ingest_job`.
+        music_track_fingerprint (dict[str, Any] | None, optional): The fingerprint returned by
+            `run_ingest_job`, if the audio could be decoded.
+
+    Returns:
+        bool: False if the job was requeued since it was claimed; nothing is recorded then.
+    """
+    from .fingerprint import add_music_track_fingerprint, find_near_duplicate
+
+    # Marked done first, in the same transaction, so a lost claim leaves no Track behind.
+    result = db.execute(
+        update(IngestJob)
+        .where(IngestJob.id == job_id)
+        .where(IngestJob.status == "processing")
+        .where(IngestJob.claim_token == claim_token)
+        .values(
+            status="done",
+            progress=100,
+            track_id=music_track_fields["id"],
+            claim_token=None,
+            updated_at=utcnow(),
+        )
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        return False
+
+    duplicate_of = None
+
+    if db.get(Track, music_track_fields["id"]) is None:
+        if music_track_fingerprint is not None:
+            duplicate_of = find_near_duplicate(db, music_track_fingerprint)
+
+        db.add(Track(**music_track_fields))
+        db.flush()
+
+    if music_track_fingerprint is not None:
+        add_music_track_fingerprint(db, music_track_fields["id"], music_track_fingerprint)
+
+    existing_variants = set(
+        db.query(TrackVariant.quality, TrackVariant.codec)
+        .filter(TrackVariant.track_id == music_track_fields["id"])
+        .all()
+    )
+    for variant_fields in music_track_variant_fields:
+        if (variant_fields["quality"], variant_fields["codec"]) not in existing_variants:
+            db.add(TrackVariant(**variant_fields))
+
+    if duplicate_of is not None:
+        db.execute(update(IngestJob).where(IngestJob.id == job_id).values(duplicate_of=duplicate_of))
+
+    db.commit()
+    bump_library_version()
+    invalidate_music_track_file(music_track_fields["id"])
+
+    if duplicate_of is not None:
+        logger.info(f"Track {music_track_fields['id']} sounds like track {duplicate_of}")
+
+    return True
+
+
+def fail_ingest_job(
+        db: SessionLocal,
+        job_id: str,
+        claim_token: str,
+        error: str,
+        music_track_fields: dict[str, Any] | None = None,
+) -> bool:
+    """
+    Marks a job failed and removes its staged files, and the files it stored that no track references.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        job_id (str): The UUID of the job.
+        claim_token (str): The token the job was claimed under.
+        error (str): Failure reason reported to the client.
+        music_track_fields (dict[str, Any] | None, optional): Column values of the track, if
+            the failure came after the audio was stored (see `IngestError`).
+
+    Returns:
+        bool: False if the job was requeued since it was claimed; nothing is changed then.
+    """
+    result = db.execute(
+        update(IngestJob)
+        .where(IngestJob.id == job_id)
+        .where(IngestJob.status == "processing")
+        .where(IngestJob.claim_token == claim_token)
+        .values(status="failed", progress=100, error=error, claim_token=None, updated_at=utcnow())
+    )
+    db.commit()
+
+    if result.rowcount != 1:
+        return False
+
+    job = get_ingest_job(job_id, db)
+
+    for relative_path in (job.upload_path, job.cover_upload_path):
+        if relative_path:
+            (DIR_DATA / relative_path).unlink(missing_ok=True)
+
+    if music_track_fields is None:
+        return True
+
+    # Another upload of the same audio may be ingesting into the same content address.
+    if db.query(IngestJob.id).filter(
+            IngestJob.upload_sha256 == job.upload_sha256,
+            IngestJob.status.in_(("queued", "processing")),
+    ).first():
+        return True
+
+    # The variants and HLS rendition made before the failure aren't in `music_track_fields`,
+    # but their content addresses follow from the audio's.
+    release_music_track_files(
+        db,
+        music_track_path=get_relative_path(get_content_path(DIR_MUSIC, job.upload_sha256, ".mp3")),
+        music_track_cover_path=music_track_fields["cover_path"],
+        music_track_cover_sizes=music_track_fields["cover_sizes"],
+        variant_paths=[
+            get_relative_path(get_music_track_variant_path(job.upload_sha256, quality, codec))
+            for quality in TRACK_VARIANT_QUALITIES
+            for codec in TRACK_VARIANT_CODECS
+            if codec in VARIANT_CODECS
+        ],
+        hls_path=get_relative_path(get_content_path(DIR_MUSIC_HLS, job.upload_sha256) / "index.m3u8"),
+    )
+
+    return True
+
+
+def run_ingest_job(
+        payload: dict[str, Any],
+) -> tuple[dict[str, Any], list[dict[str, Any]], dict[str, Any] | None, list[tuple]]:
+    """
+    Process pool entry point: ingests the staged files of one job, encodes its variants
+    and fingerprints its audio.
+
+    Args:
+        payload (dict[str, Any]): A payload from `claim_ingest_jobs`.
+
+    Returns:
+        tuple[dict[str, Any], list[dict[str, Any]], dict[str, Any] | None, list[tuple]]: Column
+            values for the new `Track` and for its `TrackVariant` rows, its fingerprint, and
+            the timings of each step, for `replay_observations` in the API process.
+    """
+    with capture_observations() as observations:
+        music_track_fields, music_track_variant_fields, music_track_fingerprint = ingest_staged_files(payload)
+
+    return music_track_fields, music_track_variant_fields, music_track_fingerprint, observations
+
+
+def ingest_staged_files(
+        payload: dict[str, Any],
+) -> tuple[dict[str, Any], list[dict[str, Any]], dict[str, Any] | None]:
+    """The work of `run_ingest_job`, without the metrics."""
+    from .fingerprint import make_music_track_fingerprint
+
+    def report_progress(progress: int | None = None) -> None:
+        if not run_in_session(update_ingest_job_progress, payload["id"], payload["claim_token"], progress):
+            raise IngestClaimLost(f"Ingest job {payload['id']} was requeued")
+
+    music_track_cover_binary = None
+
+    if payload["cover_upload_path"]:
+        path_to_cover_upload = Path(payload["cover_upload_path"])
+        if path_to_cover_upload.exists():
+            music_track_cover_binary = path_to_cover_upload.read_bytes()
+
+    music_track_fields = ingest_music_track_file(
+        music_track_id=payload["id"],
+        path_to_music_track_file=Path(payload["upload_path"]),
+        music_track_sha256=payload["upload_sha256"],
+        music_track_title=payload["title"],
+        music_track_artist=payload["artist"],
+        music_track_cover_binary=music_track_cover_binary,
+    )
+
+    try:
+        report_progress(40)
+
+        if payload["cover_upload_path"]:
+            Path(payload["cover_upload_path"]).unlink(missing_ok=True)
+
+        music_track_variant_fields = make_music_track_variants(
+            music_track_id=payload["id"],
+            path_to_music_track_file=DIR_DATA / music_track_fields["path"],
+            music_track_sha256=payload["upload_sha256"],
+            on_variant=report_progress,
+        )
+        report_progress(70)
+
+        music_track_fields["hls_path"] = make_music_track_hls(
+            music_track_sha256=payload["upload_sha256"],
+            path_to_music_track_file=DIR_DATA / music_track_fields["path"],
+        )
+        report_progress(85)
+
+        music_track_fingerprint = make_music_track_fingerprint(str(DIR_DATA / music_track_fields["path"]))
+
+    except Exception as exc:
+        raise IngestError(repr(exc), music_track_fields) from exc
+
+    return music_track_fields, music_track_variant_fields, music_track_fingerprint
+
+
+def run_in_session(func: Callable[..., Any], *args: Any) -> Any:
+    with SessionLocal() as db:
+        return func(db, *args)
+
+
+class IngestWorker:
+    """
+    Runs queued ingestion jobs in a process pool.
+
+    The worker polls the `ingest_jobs` table every `poll_interval` seconds, and
+    immediately after `notify` is called for a job queued by this process.
+
+    Attributes:
+        max_workers (int): Size of the process pool, i.e. jobs processed at once.
+        poll_interval (float): Seconds between polls of the queue.
+    """
+
+    def __init__(self, max_workers: int = INGEST_WORKERS, poll_interval: float = INGEST_POLL_INTERVAL):
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._running: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        # "spawn" keeps the children free of the API process's threads and open connections.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop claiming jobs. Jobs in flight are requeued by the next start once stale."""
+        for task in (self._task, *self._running):
+            if task is not None:
+                task.cancel()
+
+        with suppress(asyncio.CancelledError):
+            if self._task is not None:
+                await self._task
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def busy_workers(self) -> int:
+        """Number of jobs being processed."""
+        return len(self._running)
+
+    def notify(self) -> None:
+        """Wake the worker up because a job was just queued."""
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(run_in_session, requeue_stale_ingest_jobs)
+
+                free_slots = self.max_workers - len(self._running)
+                if free_slots > 0:
+                    for payload in await run_in_threadpool(run_in_session, claim_ingest_jobs, free_slots):
+                        task = asyncio.create_task(self.process(payload))
+                        self._running.add(task)
+                        task.add_done_callback(self._on_job_done)
+
+            except Exception as exc:
+                logger.error(f"Failed to poll the ingest queue: {exc!r}")
+
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+
+            self._wakeup.clear()
+
+    def _on_job_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def process(self, payload: dict[str, Any]) -> None:
+        loop = asyncio.get_running_loop()
+
+        try:
+            with INGEST_STAGE_DURATION.labels("job").time():
+                (
+                    music_track_fields,
+                    music_track_variant_fields,
+                    music_track_fingerprint,
+                    observations,
+                ) = await loop.run_in_executor(self._executor, run_ingest_job, payload)
+
+        except Exception as exc:
+            if isinstance(exc, IngestError):
+                error, music_track_fields = exc.args
+
+            else:
+                error, music_track_fields = repr(exc), None
+
+            failed = await run_in_threadpool(
+                run_in_session, fail_ingest_job, payload["id"], payload["claim_token"], error, music_track_fields,
+            )
+
+            if failed:
+                logger.error(f"Ingest job {payload['id']} failed: {error}")
+                INGEST_JOBS.labels("failed").inc()
+
+            else:
+                logger.warning(f"Ingest job {payload['id']} was requeued while running; dropped its failure")
+
+            return
+
+        replay_observations(observations)
+
+        completed = await run_in_threadpool(
+            run_in_session,
+            complete_ingest_job,
+            payload["id"],
+            payload["claim_token"],
+            music_track_fields,
+            music_track_variant_fields,
+            music_track_fingerprint,
+        )
+
+        if completed:
+            INGEST_JOBS.labels("done").inc()
+
+        else:
+            logger.warning(f"Ingest job {payload['id']} was requeued while running; dropped its results")
@@ -1,10 +1,12 @@
 from pathlib import Path
-import io
 from typing import Any
+import os
 
 from mutagen.id3 import ID3, APIC, TIT2, TPE1
 from mutagen.mp3 import MP3, HeaderNotFoundError
-from PIL import Image
+
+from common.metrics import INGEST_STAGE_DURATION
+from .analysis import analyze_music_track_file
 
 
 class MusicTrackMetadata:
@@ -14,7 +16,26 @@ class MusicTrackMetadata:
             music_track_title: str | None = None,
             music_track_artist: str | None = None,
             music_track_cover_binary: bytes | None = None,
+            analyze_audio: bool = False,
     ):
+        with INGEST_STAGE_DURATION.labels("metadata").time():
+            self.read_metadata(path_to_music_track, music_track_title, music_track_artist, music_track_cover_binary)
+
+        if analyze_audio:
+            # Decoding the whole track is the slow part, so it only happens when asked for.
+            with INGEST_STAGE_DURATION.labels("analysis").time():
+                self.audio_analysis = analyze_music_track_file(path_to_music_track)
+
+        else:
+            self.audio_analysis = None
+
+    def read_metadata(
+            self,
+            path_to_music_track: Path,
+            music_track_title: str | None,
+            music_track_artist: str | None,
+            music_track_cover_binary: bytes | None,
+    ) -> None:
         try:
             self.audio_obj: MP3 | None = MP3(str(path_to_music_track), ID3=ID3)
             self.audio_duration = int(self.audio_obj.info.length)
@@ -23,6 +44,19 @@ class MusicTrackMetadata:
             self.audio_obj = None
             self.audio_duration = 0
 
+        # Stored with the track, so serving it needs neither a stat nor a MIME lookup.
+        # Only MPEG audio is read here (mutagen's first MIME type for it is the nonstandard `audio/mp3`).
+        self.size = os.stat(path_to_music_track).st_size
+        self.mime_type = "audio/mpeg"
+
+        if self.audio_obj:
+            self.bitrate = self.audio_obj.info.bitrate // 1000 or None
+            self.sample_rate = self.audio_obj.info.sample_rate or None
+            self.codec = f"mp{self.audio_obj.info.layer}"
+
+        else:
+            self.bitrate = self.sample_rate = self.codec = None
+
         if music_track_title:
             self.title = music_track_title
 
@@ -50,6 +84,14 @@ class MusicTrackMetadata:
             "title": instance.title,
             "artist": instance.artist,
             "cover_bytes": instance.cover_bytes,
+            "mime_type": instance.mime_type,
+            "size": instance.size,
+            "bitrate": instance.bitrate,
+            "sample_rate": instance.sample_rate,
+            "codec": instance.codec,
+            "loudness": instance.audio_analysis["loudness"] if instance.audio_analysis else None,
+            "peak": instance.audio_analysis["peak"] if instance.audio_analysis else None,
+            "waveform": instance.audio_analysis["waveform"] if instance.audio_analysis else None,
         }
 
         return music_track_metadata
@@ -74,48 +116,21 @@ class MusicTrackMetadata:
 
         return audio_artist
 
-    def get_mp3_cover_bytes(
-            self,
-            output_quality: int = 50,
-    ) -> bytes | None:
+    def get_mp3_cover_bytes(self) -> bytes | None:
         """
-        Extract and compress the embedded album cover from an MP3 file.
+        Extract the embedded album cover from an MP3 file.
 
-        This function attempts to extract the album artwork from the given MP3 file using Mutagen,
-        compress it using Pillow, and return the resulting JPEG image as bytes.
-
-        Args:
-            output_quality (int): The quality of the output JPEG image (1–100).
-                Lower values mean more compression. Defaults to 50.
+        The image is returned as stored; thumbnails are rendered from it by
+        `make_music_track_covers`, which decodes it only once.
 
         Returns:
-            bytes | None: A bytes object containing the JPEG image data if a cover is found,
-            otherwise `None`.
-
-        Example:
-            ```python
-            from mutagen.mp3 import MP3
-            from utils import get_mp3_cover_bytes
-
-            mp3 = MP3("song.mp3")
-            cover_bytes = get_mp3_cover_bytes(mp3)
-            if cover_bytes:
-                with open("cover.jpg", "wb") as f:
-                    f.write(cover_bytes)
-            ```
+            bytes | None: The raw image data if a cover is found, otherwise `None`.
         """
-        if not self.audio_obj.tags:
+        if not self.audio_obj or not self.audio_obj.tags:
             return None
 
         for tag in self.audio_obj.tags.values():
             if isinstance(tag, APIC):
-                image_data = tag.data  # Extract raw image bytes
-
-                # Open and compress image using Pillow
-                image = Image.open(io.BytesIO(image_data))
-                output_io = io.BytesIO()
-                image.convert("RGB").save(output_io, format="JPEG", quality=output_quality)
-
-                return output_io.getvalue()
+                return tag.data
 
         return None  # No cover found
@@ -0,0 +1,57 @@
+"""
+Opaque cursors for keyset pagination of the track list.
+
+Tracks are listed in `(created_at, id)` order, which the `ix_tracks_created_at_id`
+index covers. A cursor holds the sort key of the last track of a page; the next
+page seeks past it in the index instead of skipping rows, so every page costs
+the same however deep it is.
+"""
+
+from datetime import datetime
+import base64
+import binascii
+import json
+
+from sqlalchemy import Row
+
+from database.models import Track
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor was not produced by `encode_cursor`."""
+
+
+def encode_cursor(music_track: Track | Row) -> str:
+    """
+    Encodes the sort key of a track as an opaque, URL-safe cursor.
+
+    Args:
+        music_track (Track | Row): The last track of a page, or a row with its `created_at` and `id`.
+
+    Returns:
+        str: Cursor pointing just past `music_track`.
+    """
+    sort_key = json.dumps([music_track.created_at.isoformat(), music_track.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(sort_key.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor.
+
+    Returns:
+        tuple[datetime, str]: The `(created_at, id)` sort key it points past.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        sort_key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at, music_track_id = sort_key
+        return datetime.fromisoformat(created_at), str(music_track_id)
+
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from exc
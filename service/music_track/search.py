@@ -0,0 +1,119 @@
+"""
+Full-text search over track titles and artists.
+
+The index is chosen by dialect, matching the track search index migration:
+    - MySQL: a FULLTEXT index on (title, artist), queried in boolean mode;
+    - SQLite: the `tracks_fts` FTS5 table, kept in sync with `tracks` by triggers;
+    - otherwise (or if the index is missing): LIKE over both columns, unindexed.
+
+Every query word is matched as a prefix, so results appear while the user types.
+"""
+
+import re
+import time
+
+from sqlalchemy import and_, inspect, or_, text
+from sqlalchemy.dialects.mysql import match
+
+from database.models import Track
+from database.config import SessionLocal
+
+
+SEARCH_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+MAX_SEARCH_WORDS = 8
+
+# Seconds before a database found without a search index is probed again, so an
+# index created by a migration while the server runs is picked up.
+SEARCH_BACKEND_RETRY_INTERVAL = 60.0
+
+# Search backend found on each database URL, with the time it was probed at.
+search_backends: dict[str, tuple[str, float]] = {}
+
+
+def get_search_backend(db: SessionLocal) -> str:
+    """
+    Detects which search index the database has.
+
+    A found index is remembered for the life of the process; its absence only for
+    `SEARCH_BACKEND_RETRY_INTERVAL` seconds.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+
+    Returns:
+        str: `fulltext` (MySQL), `fts5` (SQLite) or `like`.
+    """
+    bind = db.get_bind()
+    # Keyed by URL rather than engine identity: an id can be reused once an engine is disposed of.
+    key = bind.url.render_as_string(hide_password=True)
+    backend, probed_at = search_backends.get(key, (None, 0.0))
+
+    if backend is None or (backend == "like" and time.monotonic() - probed_at > SEARCH_BACKEND_RETRY_INTERVAL):
+        inspector = inspect(bind)
+
+        if bind.dialect.name == "mysql" and any(
+                index["name"] == "ix_tracks_title_artist_ft" for index in inspector.get_indexes("tracks")
+        ):
+            backend = "fulltext"
+
+        elif bind.dialect.name == "sqlite" and inspector.has_table("tracks_fts"):
+            backend = "fts5"
+
+        else:
+            backend = "like"
+
+        search_backends[key] = (backend, time.monotonic())
+
+    return backend
+
+
+def search_music_tracks(db: SessionLocal, query: str, limit: int = 20) -> list[Track]:
+    """
+    Finds tracks whose title or artist contain every word of `query`, best matches first.
+
+    Args:
+        db (SessionLocal): The active SQLAlchemy database session.
+        query (str): The search text. Each word is matched as a prefix.
+        limit (int, optional): Maximum number of tracks to return. Defaults to 20.
+
+    Returns:
+        list[Track]: The matching tracks.
+    """
+    words = SEARCH_WORD_PATTERN.findall(query)[:MAX_SEARCH_WORDS]
+    if not words:
+        return []
+
+    backend = get_search_backend(db)
+
+    if backend == "fts5":
+        music_track_ids = db.execute(
+            text(
+                "SELECT track_id FROM tracks_fts WHERE tracks_fts MATCH :match "
+                "ORDER BY bm25(tracks_fts) LIMIT :limit"
+            ),
+            {"match": " ".join(f'"{word}"*' for word in words), "limit": limit},
+        ).scalars().all()
+
+        music_tracks = {
+            music_track.id: music_track
+            for music_track in db.query(Track).filter(Track.id.in_(music_track_ids))
+        }
+        return [music_tracks[track_id] for track_id in music_track_ids if track_id in music_tracks]
+
+    if backend == "fulltext":
+        relevance = match(
+            Track.title,
+            Track.artist,
+            against=" ".join(f"+{word}*" for word in words),
+        ).in_boolean_mode()
+        return db.query(Track).filter(relevance).order_by(relevance.desc()).limit(limit).all()
+
+    conditions = []
+    for word in words:
+        pattern = "%" + word.replace("_", "\\_") + "%"
+        conditions.append(or_(
+            Track.title.ilike(pattern, escape="\\"),
+            Track.artist.ilike(pattern, escape="\\"),
+        ))
+
+    return db.query(Track).filter(and_(*conditions)).order_by(Track.title, Track.id).limit(limit).all()
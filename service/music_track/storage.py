@@ -0,0 +1,185 @@
+from pathlib import Path
+import hashlib
+import os
+import shutil
+import tempfile
+
+import anyio
+
+from common.constants import UPLOAD_CHUNK_SIZE
+
+
+# Content-addressed files are spread over two levels of 256 directories, by the
+# first hex digits of their digest, so no directory grows past a few thousand entries.
+CONTENT_SHARD_LEVELS = 2
+CONTENT_SHARD_WIDTH = 2
+
+
+class FileTooLarge(Exception):
+    """
+    Raised when a streamed file grows past its size limit.
+
+    Attributes:
+        max_size (int): The limit that was exceeded, in bytes.
+    """
+
+    def __init__(self, max_size: int):
+        super().__init__(f"File exceeds the maximum size of {max_size} bytes")
+        self.max_size = max_size
+
+
+class StreamedFile:
+    """
+    A file written chunk by chunk to a temporary path, hashed on the way.
+
+    Data is buffered up to `UPLOAD_CHUNK_SIZE` and then written (and hashed)
+    in a worker thread, so memory use stays constant however large the file is
+    and the event loop is never blocked on disk I/O. The temporary file lives
+    in the destination directory, so `commit` is an atomic rename.
+
+    Attributes:
+        path (Path): Current location of the file.
+        size (int): Number of bytes received so far.
+        max_size (int): Size limit, enforced while the data streams in.
+    """
+
+    def __init__(self, directory: Path, max_size: int):
+        """
+        Args:
+            directory (Path): Directory to create the temporary file in.
+            max_size (int): Maximum number of bytes accepted.
+        """
+        fd, path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+
+        self.path = Path(path)
+        self.size = 0
+        self.max_size = max_size
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+        self._buffer = bytearray()
+        self._committed = False
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 digest of the data written so far (complete after `close`)."""
+        return self._hash.hexdigest()
+
+    async def write(self, data: bytes) -> None:
+        """
+        Append data to the file.
+
+        Raises:
+            FileTooLarge: If the file would grow past `max_size`.
+        """
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise FileTooLarge(self.max_size)
+
+        self._buffer += data
+        if len(self._buffer) >= UPLOAD_CHUNK_SIZE:
+            await self.flush()
+
+    async def flush(self) -> None:
+        block, self._buffer = self._buffer, bytearray()
+
+        if block:
+            await anyio.to_thread.run_sync(self._write_block, block)
+
+    async def close(self) -> None:
+        await self.flush()
+        await anyio.to_thread.run_sync(self._file.close)
+
+    def _write_block(self, block: bytearray) -> None:
+        self._hash.update(block)
+        self._file.write(block)
+
+    def commit(self, destination: Path) -> None:
+        """
+        Atomically move the finished file to its final location.
+
+        Args:
+            destination (Path): Final path, on the same filesystem as the temporary file.
+        """
+        os.replace(self.path, destination)
+
+        self.path = destination
+        self._committed = True
+
+    def discard(self) -> None:
+        """Close and delete the temporary file, unless it has been committed."""
+        self._file.close()
+
+        if not self._committed:
+            self.path.unlink(missing_ok=True)
+
+
+def get_content_path(directory: Path, digest: str, suffix: str = "") -> Path:
+    """
+    Returns the content address of a file: its digest, sharded by prefix.
+
+    Args:
+        directory (Path): Root of the content-addressed tree.
+        digest (str): Hex digest of the content (or of the content it is derived from).
+        suffix (str, optional): Appended to the file name, e.g. `.mp3` or `-64.webp`.
+
+    Returns:
+        Path: `directory/ab/cd/abcd...<suffix>`.
+
+    Example:
+        >>> get_content_path(Path("music"), "abcdef", ".mp3")
+        PosixPath('music/ab/cd/abcdef.mp3')
+    """
+    shards = [
+        digest[level * CONTENT_SHARD_WIDTH:(level + 1) * CONTENT_SHARD_WIDTH]
+        for level in range(CONTENT_SHARD_LEVELS)
+    ]
+
+    return directory.joinpath(*shards, digest + suffix)
+
+
+def store_content_file(path_to_file: Path, path_to_content: Path) -> bool:
+    """
+    Moves a file to its content address, unless that content is already stored.
+
+    Args:
+        path_to_file (Path): The file to store, on the same filesystem as `path_to_content`.
+        path_to_content (Path): Its content address, from `get_content_path`.
+
+    Returns:
+        bool: True if the file was moved, False if it was a duplicate and has been deleted.
+    """
+    if path_to_content.exists():
+        path_to_file.unlink(missing_ok=True)
+        return False
+
+    path_to_content.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(path_to_file, path_to_content)
+
+    return True
+
+
+def release_content_path(path_to_content: Path, root: Path) -> None:
+    """
+    Deletes a file (or directory tree) no longer referenced, and its emptied shard directories.
+
+    Args:
+        path_to_content (Path): The file or directory to delete.
+        root (Path): Root of the content-addressed tree; never removed.
+    """
+    if path_to_content.is_dir():
+        shutil.rmtree(path_to_content, ignore_errors=True)
+
+    else:
+        path_to_content.unlink(missing_ok=True)
+
+    directory = path_to_content.parent
+
+    while directory != root and root in directory.parents:
+        try:
+            directory.rmdir()
+
+        except OSError:
+            # Not empty: other content lives in this shard.
+            break
+
+        directory = directory.parent
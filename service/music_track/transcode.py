@@ -0,0 +1,271 @@
+"""
+Lower-bitrate variants and HLS renditions of tracks, encoded with a local ffmpeg binary.
+
+Every track gets one variant per quality in `TRACK_VARIANT_QUALITIES` and codec
+in `TRACK_VARIANT_CODECS`, and, with `HLS_ENABLED`, a segmented HLS rendition.
+Encoding runs in the ingestion process pool, next to the metadata extraction.
+Without ffmpeg, tracks are simply served as uploaded.
+
+Encodings are content-addressed by the SHA-256 of the source audio, so a track
+uploaded again reuses them instead of being encoded twice.
+"""
+
+from pathlib import Path
+from typing import Any, Callable
+import hashlib
+import os
+import shutil
+import subprocess
+
+from ten_utils.log import Logger
+
+from common.constants import (
+    DIR_MUSIC_HLS,
+    DIR_MUSIC_VARIANT,
+    FFMPEG_BINARY,
+    FFMPEG_TIMEOUT,
+    HLS_BITRATE,
+    HLS_ENABLED,
+    HLS_SEGMENT_DURATION,
+    TRACK_VARIANT_CODECS,
+    TRACK_VARIANT_QUALITIES,
+)
+from common.helpers import get_relative_path
+from common.metrics import INGEST_STAGE_DURATION
+from .storage import get_content_path
+
+
+logger = Logger(__name__)
+
+# Codec name mapped to its file extension, content type, the `Accept` media types
+# it satisfies and its ffmpeg output options.
+VARIANT_CODECS: dict[str, dict[str, Any]] = {
+    "opus": {
+        "extension": ".opus",
+        "media_type": "audio/ogg",
+        "accept_types": ("audio/ogg", "audio/opus", "application/ogg"),
+        "options": ["-c:a", "libopus", "-vbr", "on", "-f", "ogg"],
+    },
+    "aac": {
+        "extension": ".m4a",
+        "media_type": "audio/mp4",
+        "accept_types": ("audio/mp4", "audio/aac", "audio/x-m4a", "audio/m4a"),
+        # The index goes first, so playback can start before the whole file arrives.
+        "options": ["-c:a", "aac", "-movflags", "+faststart", "-f", "mp4"],
+    },
+}
+
+
+class TranscodeError(Exception):
+    """Raised when ffmpeg fails to encode a variant."""
+
+
+def get_ffmpeg_binary() -> str | None:
+    """
+    Returns:
+        str | None: Path of the ffmpeg binary, or None if it is not installed.
+    """
+    return shutil.which(FFMPEG_BINARY)
+
+
+def get_music_track_variant_path(music_track_sha256: str, quality: str, codec: str) -> Path:
+    """
+    Args:
+        music_track_sha256 (str): Hex SHA-256 digest of the source audio.
+        quality (str): A key of `TRACK_VARIANT_QUALITIES`.
+        codec (str): A key of `VARIANT_CODECS`.
+
+    Returns:
+        Path: Where the variant of that quality and codec is stored.
+    """
+    return get_content_path(
+        DIR_MUSIC_VARIANT, music_track_sha256, f"-{quality}-{codec}{VARIANT_CODECS[codec]['extension']}",
+    )
+
+
+def transcode_music_track_file(
+        path_to_music_track_file: Path,
+        path_to_variant_file: Path,
+        codec: str,
+        bitrate: int,
+        ffmpeg_binary: str,
+) -> None:
+    """
+    Encodes an audio file with ffmpeg, atomically replacing `path_to_variant_file`.
+
+    Args:
+        path_to_music_track_file (Path): The source audio.
+        path_to_variant_file (Path): Where to write the variant.
+        codec (str): A key of `VARIANT_CODECS`.
+        bitrate (int): Target bitrate in kbit/s.
+        ffmpeg_binary (str): Path of the ffmpeg binary.
+
+    Raises:
+        TranscodeError: If ffmpeg fails or times out.
+    """
+    path_to_partial_file = path_to_variant_file.with_name(f".{path_to_variant_file.name}.part")
+
+    try:
+        run_ffmpeg(ffmpeg_binary, path_to_music_track_file, [
+            "-b:a", f"{bitrate}k",
+            *VARIANT_CODECS[codec]["options"],
+            str(path_to_partial_file),
+        ])
+
+    except TranscodeError:
+        path_to_partial_file.unlink(missing_ok=True)
+        raise
+
+    os.replace(path_to_partial_file, path_to_variant_file)
+
+
+def run_ffmpeg(ffmpeg_binary: str, path_to_music_track_file: Path, output_options: list[str]) -> None:
+    """
+    Runs ffmpeg on the first audio stream of a file, dropping its tags and cover.
+
+    Args:
+        ffmpeg_binary (str): Path of the ffmpeg binary.
+        path_to_music_track_file (Path): The source audio.
+        output_options (list[str]): Output options, ending with the output path.
+
+    Raises:
+        TranscodeError: If ffmpeg fails or times out.
+    """
+    command = [
+        ffmpeg_binary, "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", str(path_to_music_track_file),
+        "-map", "0:a:0", "-map_metadata", "-1", "-vn", "-ac", "2",
+        *output_options,
+    ]
+
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=FFMPEG_TIMEOUT)
+
+    except subprocess.CalledProcessError as exc:
+        raise TranscodeError(exc.stderr.decode(errors="replace").strip()) from exc
+
+    except subprocess.TimeoutExpired as exc:
+        raise TranscodeError(f"ffmpeg timed out after {FFMPEG_TIMEOUT}s") from exc
+
+
+def make_music_track_variants(
+        music_track_id: str,
+        path_to_music_track_file: Path,
+        music_track_sha256: str,
+        on_variant: Callable[[], None] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Encodes every configured variant of a track, reusing those already encoded.
+
+    Does no database work and takes only picklable arguments, so it can run in the
+    ingestion process pool. A variant that fails to encode is logged and skipped:
+    the original stays playable.
+
+    Args:
+        music_track_id (str): The UUID of the track.
+        path_to_music_track_file (Path): The track's audio file in the library.
+        music_track_sha256 (str): Hex SHA-256 digest of the audio.
+        on_variant (Callable[[], None] | None, optional): Called after each variant is
+            encoded, e.g. to report progress.
+
+    Returns:
+        list[dict[str, Any]]: Column values for the new `TrackVariant` rows.
+    """
+    ffmpeg_binary = get_ffmpeg_binary()
+    if ffmpeg_binary is None or not TRACK_VARIANT_QUALITIES:
+        return []
+
+    music_track_variants = []
+
+    for quality, bitrate in TRACK_VARIANT_QUALITIES.items():
+        for codec in TRACK_VARIANT_CODECS:
+            if codec not in VARIANT_CODECS:
+                logger.warning(f"Unknown variant codec {codec!r} in TRACK_VARIANT_CODECS")
+                continue
+
+            variant_name = f"{music_track_sha256}-{quality}-{codec}"
+            path_to_variant_file = get_music_track_variant_path(music_track_sha256, quality, codec)
+
+            if not path_to_variant_file.exists():
+                path_to_variant_file.parent.mkdir(parents=True, exist_ok=True)
+
+                try:
+                    with INGEST_STAGE_DURATION.labels("variant").time():
+                        transcode_music_track_file(
+                            path_to_music_track_file, path_to_variant_file, codec, bitrate, ffmpeg_binary,
+                        )
+
+                except TranscodeError as exc:
+                    logger.warning(f"Failed to encode {variant_name}: {exc}")
+                    continue
+
+                finally:
+                    if on_variant is not None:
+                        on_variant()
+
+            with open(path_to_variant_file, "rb") as file:
+                variant_sha256 = hashlib.file_digest(file, "sha256").hexdigest()
+
+            music_track_variants.append({
+                "track_id": music_track_id,
+                "quality": quality,
+                "codec": codec,
+                "bitrate": bitrate,
+                "media_type": VARIANT_CODECS[codec]["media_type"],
+                "path": get_relative_path(path_to_variant_file),
+                "size": path_to_variant_file.stat().st_size,
+                "etag": f"{music_track_id}-{variant_sha256[:16]}",
+            })
+
+    return music_track_variants
+
+
+def make_music_track_hls(music_track_sha256: str, path_to_music_track_file: Path) -> str | None:
+    """
+    Cuts a track into `HLS_SEGMENT_DURATION`-second AAC segments plus a VOD playlist.
+
+    The rendition is written to a scratch directory and moved into place as a
+    whole, so a half-written playlist is never served. An existing rendition of
+    the same audio is reused.
+
+    Args:
+        music_track_sha256 (str): Hex SHA-256 digest of the audio.
+        path_to_music_track_file (Path): The track's audio file in the library.
+
+    Returns:
+        str | None: Relative path of the playlist, or None if HLS is disabled,
+            ffmpeg is missing or encoding failed.
+    """
+    ffmpeg_binary = get_ffmpeg_binary()
+    if not HLS_ENABLED or ffmpeg_binary is None:
+        return None
+
+    path_to_hls_dir = get_content_path(DIR_MUSIC_HLS, music_track_sha256)
+    if (path_to_hls_dir / "index.m3u8").exists():
+        return get_relative_path(path_to_hls_dir / "index.m3u8")
+
+    path_to_partial_dir = path_to_hls_dir.with_name(f".{music_track_sha256}.{os.getpid()}.part")
+
+    shutil.rmtree(path_to_partial_dir, ignore_errors=True)
+    path_to_partial_dir.mkdir(parents=True)
+
+    try:
+        with INGEST_STAGE_DURATION.labels("hls").time():
+            run_ffmpeg(ffmpeg_binary, path_to_music_track_file, [
+                "-c:a", "aac", "-b:a", f"{HLS_BITRATE}k",
+                "-f", "hls",
+                "-hls_time", str(HLS_SEGMENT_DURATION),
+                "-hls_playlist_type", "vod",
+                "-hls_segment_filename", str(path_to_partial_dir / "segment_%05d.ts"),
+                str(path_to_partial_dir / "index.m3u8"),
+            ])
+
+    except TranscodeError as exc:
+        logger.warning(f"Failed to segment {music_track_sha256}: {exc}")
+        shutil.rmtree(path_to_partial_dir, ignore_errors=True)
+        return None
+
+    shutil.rmtree(path_to_hls_dir, ignore_errors=True)
+    os.replace(path_to_partial_dir, path_to_hls_dir)
+
+    return get_relative_path(path_to_hls_dir / "index.m3u8")
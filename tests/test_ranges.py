@@ -0,0 +1,188 @@
+import pytest
+
+from api.ranges import (
+    MAX_RANGES,
+    MalformedRangeHeader,
+    RangeNotSatisfiable,
+    if_range_matches,
+    parse_range_header,
+    range_file_response,
+)
+from api.responses import FileRangeResponse, MultipartFileRangeResponse
+
+
+ETAG = '"abc123"'
+LAST_MODIFIED = "Sun, 18 Oct 2026 10:00:00 GMT"
+
+
+@pytest.mark.parametrize(
+    ("range_header", "file_size", "expected"),
+    [
+        ("bytes=0-9", 100, [(0, 10)]),
+        ("bytes=90-", 100, [(90, 100)]),
+        ("bytes=-10", 100, [(90, 100)]),
+        ("bytes=50-500", 100, [(50, 100)]),
+        ("bytes=0-9,200-300", 100, [(0, 10)]),
+        ("BYTES = 0-9", 100, [(0, 10)]),
+    ],
+)
+def test_parse_range_header(range_header, file_size, expected):
+    assert parse_range_header(range_header, file_size) == expected
+
+
+@pytest.mark.parametrize("range_header", ["bytes=-500", "bytes=-100"])
+def test_suffix_range_longer_than_file_covers_whole_file(range_header):
+    assert parse_range_header(range_header, 100) == [(0, 100)]
+
+
+@pytest.mark.parametrize("range_header", ["bytes=-1", "bytes=-500", "bytes=0-", "bytes=0-0"])
+def test_any_range_of_empty_file_is_not_satisfiable(range_header):
+    with pytest.raises(RangeNotSatisfiable) as exc_info:
+        parse_range_header(range_header, 0)
+
+    assert exc_info.value.file_size == 0
+
+
+def test_zero_length_suffix_range_is_not_satisfiable():
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header("bytes=-0", 100)
+
+
+def test_range_starting_past_end_is_not_satisfiable():
+    with pytest.raises(RangeNotSatisfiable) as exc_info:
+        parse_range_header("bytes=100-200", 100)
+
+    assert exc_info.value.file_size == 100
+
+
+@pytest.mark.parametrize(
+    ("range_header", "expected"),
+    [
+        # Overlapping.
+        ("bytes=0-9,5-19", [(0, 20)]),
+        # Adjacent.
+        ("bytes=0-9,10-19", [(0, 20)]),
+        # Contained.
+        ("bytes=0-49,10-19", [(0, 50)]),
+        # Out of order, with a gap kept.
+        ("bytes=40-49,0-9,5-14", [(0, 15), (40, 50)]),
+        # A suffix range merged with an explicit one.
+        ("bytes=80-89,-15", [(80, 100)]),
+    ],
+)
+def test_ranges_are_sorted_and_coalesced(range_header, expected):
+    assert parse_range_header(range_header, 100) == expected
+
+
+@pytest.mark.parametrize(
+    "range_header",
+    ["items=0-9", "bytes=", "bytes=abc", "bytes=-", "bytes=9-0", "bytes=0-9,x"],
+)
+def test_malformed_range_header(range_header):
+    with pytest.raises(MalformedRangeHeader):
+        parse_range_header(range_header, 100)
+
+
+@pytest.mark.parametrize(
+    ("if_range", "etag", "last_modified", "expected"),
+    [
+        (ETAG, ETAG, LAST_MODIFIED, True),
+        ('"other"', ETAG, LAST_MODIFIED, False),
+        # Weak tags never match, on either side.
+        (f"W/{ETAG}", ETAG, LAST_MODIFIED, False),
+        (f"W/{ETAG}", f"W/{ETAG}", LAST_MODIFIED, False),
+        (ETAG, None, LAST_MODIFIED, False),
+        (LAST_MODIFIED, ETAG, LAST_MODIFIED, True),
+        ("Sun, 18 Oct 2026 10:00:01 GMT", ETAG, LAST_MODIFIED, False),
+        (LAST_MODIFIED, ETAG, None, False),
+        ("not a date", ETAG, LAST_MODIFIED, False),
+    ],
+)
+def test_if_range_matches(if_range, etag, last_modified, expected):
+    assert if_range_matches(if_range, etag=etag, last_modified=last_modified) is expected
+
+
+def make_response(request_headers, method="GET", file_size=100):
+    return range_file_response(
+        request_headers,
+        method=method,
+        path="track.mp3",
+        file_size=file_size,
+        media_type="audio/mpeg",
+        headers={"etag": ETAG, "last-modified": LAST_MODIFIED},
+    )
+
+
+def test_single_range_is_partial_content():
+    response = make_response({"range": "bytes=10-19"})
+
+    assert isinstance(response, FileRangeResponse)
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 10-19/100"
+    assert response.headers["content-length"] == "10"
+
+
+def test_several_ranges_are_multipart():
+    response = make_response({"range": "bytes=0-9,50-59"})
+
+    assert isinstance(response, MultipartFileRangeResponse)
+    assert response.status_code == 206
+    assert response.headers["content-type"].startswith("multipart/byteranges; boundary=")
+
+
+def test_more_than_max_ranges_serves_whole_file():
+    range_set = ",".join(f"{start}-{start}" for start in range(0, 2 * (MAX_RANGES + 1), 2))
+    response = make_response({"range": f"bytes={range_set}"})
+
+    assert isinstance(response, FileRangeResponse)
+    assert response.status_code == 200
+    assert "content-range" not in response.headers
+    assert response.headers["content-length"] == "100"
+
+
+def test_max_ranges_is_counted_after_coalescing():
+    # Adjacent single-byte ranges merge into one.
+    range_set = ",".join(f"{start}-{start}" for start in range(MAX_RANGES + 1))
+    response = make_response({"range": f"bytes={range_set}"})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 0-{MAX_RANGES}/100"
+
+
+@pytest.mark.parametrize("if_range", ['"stale"', "Sat, 17 Oct 2026 10:00:00 GMT"])
+def test_if_range_mismatch_serves_whole_file(if_range):
+    response = make_response({"range": "bytes=0-9", "if-range": if_range})
+
+    assert response.status_code == 200
+    assert "content-range" not in response.headers
+    assert response.headers["etag"] == ETAG
+
+
+def test_if_range_match_serves_range():
+    response = make_response({"range": "bytes=0-9", "if-range": ETAG})
+
+    assert response.status_code == 206
+
+
+@pytest.mark.parametrize(("range_header", "file_size"), [("bytes=100-", 100), ("bytes=-5", 0)])
+def test_unsatisfiable_range_is_416(range_header, file_size):
+    response = make_response({"range": range_header}, file_size=file_size)
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{file_size}"
+    # A 416 must not be cached as the resource.
+    assert "etag" not in response.headers
+    assert "last-modified" not in response.headers
+
+
+def test_malformed_range_serves_whole_file():
+    response = make_response({"range": "bytes=9-0"})
+
+    assert response.status_code == 200
+
+
+def test_range_ignored_for_head():
+    response = make_response({"range": "bytes=0-9"}, method="HEAD")
+
+    assert response.status_code == 200
+    assert response.headers["content-length"] == "100"
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import re
+
+import pytest
+
+from api.responses import ZERO_COPY_SEND_EXTENSION, FileRangeResponse, MultipartFileRangeResponse
+
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def path_to_file(tmp_path):
+    path = tmp_path / "track.mp3"
+    path.write_bytes(CONTENT)
+    return path
+
+
+def run_response(response, method="GET", zero_copy=False):
+    """
+    Runs an ASGI response against a fake server.
+
+    Returns:
+        tuple[dict, bytes]: The `http.response.start` message and the body sent.
+    """
+    scope = {"type": "http", "method": method, "extensions": {ZERO_COPY_SEND_EXTENSION: {}} if zero_copy else {}}
+    messages = []
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+        if message["type"] == ZERO_COPY_SEND_EXTENSION:
+            body.extend(os.pread(message["file"], message["count"], message["offset"]))
+
+        elif message["type"] == "http.response.body":
+            body.extend(message["body"])
+
+    asyncio.run(response(scope, receive, send))
+
+    assert messages[-1].get("more_body", False) is False
+    return messages[0], bytes(body)
+
+
+def get_headers(start_message):
+    return {name.decode(): value.decode() for name, value in start_message["headers"]}
+
+
+def parse_multipart(body, boundary):
+    """Splits a `multipart/byteranges` body into `(headers, data)` parts."""
+    assert body.endswith(f"--{boundary}--\r\n".encode())
+
+    parts = []
+    for chunk in body.split(f"--{boundary}".encode())[1:-1]:
+        head, _, data = chunk.removeprefix(b"\r\n").partition(b"\r\n\r\n")
+        assert data.endswith(b"\r\n")
+
+        headers = dict(line.split(": ", 1) for line in head.decode().split("\r\n"))
+        parts.append((headers, data[:-2]))
+
+    return parts
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+@pytest.mark.parametrize(
+    "ranges",
+    [
+        [(0, 10), (100, 150)],
+        [(0, 1), (500, 700), (1000, 1024)],
+        # Multi-digit offsets change the length of the part headers.
+        [(5, 6), (999, 1000)],
+    ],
+)
+def test_multipart_content_length_is_exact(path_to_file, ranges, zero_copy):
+    response = MultipartFileRangeResponse(path_to_file, file_size=len(CONTENT), ranges=ranges, media_type="audio/mpeg")
+    start_message, body = run_response(response, zero_copy=zero_copy)
+    headers = get_headers(start_message)
+
+    assert start_message["status"] == 206
+    assert int(headers["content-length"]) == len(body)
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_multipart_parts(path_to_file, zero_copy):
+    ranges = [(0, 10), (100, 150), (1000, 1024)]
+    response = MultipartFileRangeResponse(path_to_file, file_size=len(CONTENT), ranges=ranges, media_type="audio/mpeg")
+    start_message, body = run_response(response, zero_copy=zero_copy)
+
+    boundary = re.fullmatch(r"multipart/byteranges; boundary=(\w+)", get_headers(start_message)["content-type"])[1]
+    parts = parse_multipart(body, boundary)
+
+    assert len(parts) == len(ranges)
+
+    for (part_headers, data), (start, end) in zip(parts, ranges):
+        assert part_headers["Content-Type"] == "audio/mpeg"
+        assert part_headers["Content-Range"] == f"bytes {start}-{end - 1}/{len(CONTENT)}"
+        assert data == CONTENT[start:end]
+
+
+def test_multipart_head_has_length_but_no_body(path_to_file):
+    ranges = [(0, 10), (100, 150)]
+    get_length = get_headers(run_response(
+        MultipartFileRangeResponse(path_to_file, file_size=len(CONTENT), ranges=ranges),
+    )[0])["content-length"]
+
+    start_message, body = run_response(
+        MultipartFileRangeResponse(path_to_file, file_size=len(CONTENT), ranges=ranges),
+        method="HEAD",
+    )
+
+    assert body == b""
+    # The boundary is random, but always the same length.
+    assert get_headers(start_message)["content-length"] == get_length
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_file_range_response_sends_range(path_to_file, zero_copy):
+    response = FileRangeResponse(path_to_file, file_size=len(CONTENT), start=300, end=812, status_code=206)
+    start_message, body = run_response(response, zero_copy=zero_copy)
+    headers = get_headers(start_message)
+
+    assert start_message["status"] == 206
+    assert headers["content-range"] == f"bytes 300-811/{len(CONTENT)}"
+    assert int(headers["content-length"]) == len(body) == 512
+    assert body == CONTENT[300:812]
+
+
+@pytest.mark.parametrize(
+    "response_class, options",
+    [(FileRangeResponse, {}), (MultipartFileRangeResponse, {"ranges": [(0, 1), (5, 6)]})],
+)
+def test_missing_file_is_404(tmp_path, response_class, options):
+    missing = []
+    response = response_class(
+        tmp_path / "deleted.mp3", file_size=len(CONTENT), on_missing=lambda: missing.append(True), **options,
+    )
+    start_message, body = run_response(response)
+
+    assert start_message["status"] == 404
+    assert missing == [True]